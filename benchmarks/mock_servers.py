@@ -0,0 +1,358 @@
+# benchmarks/mock_servers.py
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+ENDPOINTS = ('cse', 'hunter', 'openai', 'sheets')
+
+# Domain suffix of the synthetic companies returned by the search stand-in
+COMPANY_DOMAIN = 'bench.test'
+
+
+class EndpointProfile:
+    """
+    Behaviour of one stand-in API: response latency, injected errors and quota
+    """
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 quota: Optional[int] = None,
+                 quota_window: float = 60.0):
+        """
+        :param latency: Base response latency in seconds
+        :param jitter: Extra uniformly distributed latency in seconds
+        :param error_rate: Fraction of requests answered with HTTP 500
+        :param quota: Requests allowed per quota window, unlimited when None
+        :param quota_window: Quota window in seconds
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota = quota
+        self.quota_window = quota_window
+
+    @classmethod
+    def parse(cls, spec: str, base: 'EndpointProfile' = None) -> 'EndpointProfile':
+        """
+        Build a profile from 'latency=0.05,error_rate=0.01,quota=100' style text
+
+        :param spec: Comma separated key=value pairs
+        :param base: Profile providing the values that are not mentioned
+        :return: EndpointProfile
+        """
+        values = dict(vars(base)) if base else {}
+        for pair in filter(None, (part.strip() for part in spec.split(','))):
+            name, _, value = pair.partition('=')
+            name = name.strip()
+            if name not in ('latency', 'jitter', 'error_rate', 'quota', 'quota_window'):
+                raise ValueError(f"Unknown endpoint setting: {name}")
+            values[name] = int(value) if name == 'quota' else float(value)
+        return cls(**values)
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+class EndpointState:
+    """
+    Request counters and quota window of one endpoint
+    """
+
+    def __init__(self, profile: EndpointProfile):
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._window = deque()
+
+    def admit(self, rng: random.Random) -> int:
+        """
+        Decide how a request is answered
+
+        :return: HTTP status to send: 200, 429 or 500
+        """
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            if self.profile.quota is not None:
+                while self._window and now - self._window[0] >= self.profile.quota_window:
+                    self._window.popleft()
+                if len(self._window) >= self.profile.quota:
+                    self.throttled += 1
+                    return 429
+                self._window.append(now)
+            if self.profile.error_rate and rng.random() < self.profile.error_rate:
+                self.errors += 1
+                return 500
+        return 200
+
+    def delay(self, rng: random.Random) -> float:
+        return self.profile.latency + (rng.uniform(0, self.profile.jitter) if self.profile.jitter else 0.0)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'requests': self.requests, 'errors': self.errors, 'throttled': self.throttled}
+
+
+def company_domain(index: int) -> str:
+    """
+    :param index: Zero-based company position
+    :return: Domain of a synthetic company
+    """
+    return f"company{index}.{COMPANY_DOMAIN}"
+
+
+def company_result(index: int, tag: str = '') -> Dict:
+    """
+    Custom Search item of a synthetic company
+
+    :param index: Zero-based company position
+    :param tag: Suffix making company names unique per query, so runs do not share cache entries
+    :return: Search result item
+    """
+    return {
+        'title': f"Company{index}{tag} Software",
+        'link': f"https://{company_domain(index)}/",
+        'displayLink': company_domain(index),
+        'snippet': f"Company {index} builds software for small businesses."
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'MockApiServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method: str):
+        parts = urlsplit(self.path)
+        body = self._read_body()
+        route = self.server.route(method, parts.path)
+        if route is None:
+            self._send_json(404, {'error': {'code': 404, 'message': f'No route for {method} {parts.path}'}})
+            return
+        endpoint, handler = route
+        state = self.server.states[endpoint]
+        rng = self.server.rng()
+        time.sleep(state.delay(rng))
+        status = state.admit(rng)
+        if status == 429:
+            self._send_json(429, {'error': {'code': 429, 'message': 'Quota exceeded', 'status': 'RESOURCE_EXHAUSTED'}})
+        elif status == 500:
+            self._send_json(500, {'error': {'code': 500, 'message': 'Injected failure', 'status': 'INTERNAL'}})
+        else:
+            self._send_json(200, handler(parts, parse_qs(parts.query), body))
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+
+class MockApiServer(ThreadingHTTPServer):
+    """
+    Local stand-in for Custom Search, Hunter.io, OpenAI chat completions and
+    the Sheets/Drive APIs, answering with deterministic synthetic data.
+
+    Every endpoint has its own EndpointProfile, so latency, error rate and
+    quota can be tuned independently. Point the pipeline at it with env().
+    """
+
+    daemon_threads = True
+    # The pipeline opens many connections at once
+    request_queue_size = 256
+
+    def __init__(self,
+                 profiles: Dict[str, EndpointProfile] = None,
+                 results_per_query: int = 100,
+                 seed: int = 0):
+        """
+        :param profiles: Endpoint name ('cse', 'hunter', 'openai', 'sheets') to profile
+        :param results_per_query: Total Custom Search results available for a query
+        :param seed: Seed for injected errors and latency jitter
+        """
+        super().__init__(('127.0.0.1', 0), _Handler)
+        profiles = profiles or {}
+        self.states = {name: EndpointState(profiles.get(name) or EndpointProfile()) for name in ENDPOINTS}
+        self.results_per_query = results_per_query
+        self.seed = seed
+        self._local = threading.local()
+        self._spreadsheets = 0
+        self._sheet_rows = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._routes = [
+            ('GET', re.compile(r'^/customsearch/v1$'), 'cse', self._custom_search),
+            ('GET', re.compile(r'^/v2/email-verifier$'), 'hunter', self._hunter),
+            ('POST', re.compile(r'^/v1/chat/completions$'), 'openai', self._chat_completion),
+            ('POST', re.compile(r'^/v4/spreadsheets$'), 'sheets', self._create_spreadsheet),
+            ('POST', re.compile(r'^/v4/spreadsheets/[^/]+/values/[^/]+:append$'), 'sheets', self._append_values),
+            ('PUT', re.compile(r'^/v4/spreadsheets/[^/]+/values/[^/]+$'), 'sheets', self._update_values),
+            ('GET', re.compile(r'^/v4/spreadsheets/[^/]+/values/[^/]+$'), 'sheets', self._get_values),
+            ('POST', re.compile(r'^/files/[^/]+/permissions$'), 'sheets', self._permission),
+        ]
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """
+        :return: Environment variables pointing every client at this server
+        """
+        return {
+            'GOOGLE_SEARCH_ENDPOINT': f"{self.url}/customsearch/v1",
+            'HUNTER_API_URL': f"{self.url}/v2/email-verifier",
+            'OPENAI_BASE_URL': f"{self.url}/v1",
+            'GOOGLE_SHEETS_ENDPOINT': f"{self.url}/",
+            'GOOGLE_DRIVE_ENDPOINT': f"{self.url}/",
+            'GOOGLE_SEARCH_API_KEY': 'bench-key',
+            'GOOGLE_SEARCH_CX': 'bench-cx',
+            'HUNTER_IO_API_KEY': 'bench-key',
+            'OPENAI_API_KEY': 'bench-key',
+            'NO_PROXY': '127.0.0.1,localhost'
+        }
+
+    def start(self) -> 'MockApiServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='mock-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def rng(self) -> random.Random:
+        # One generator per handler thread keeps runs repeatable without a shared lock
+        if not hasattr(self._local, 'rng'):
+            self._local.rng = random.Random(hash((self.seed, threading.get_ident())))
+        return self._local.rng
+
+    def route(self, method: str, path: str):
+        for route_method, pattern, endpoint, handler in self._routes:
+            if route_method == method and pattern.match(path):
+                return endpoint, handler
+        return None
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        :return: Request, error and throttle counts per endpoint
+        """
+        return {name: state.stats() for name, state in self.states.items()}
+
+    # Endpoint handlers
+
+    def _custom_search(self, parts, query: Dict, body: bytes) -> Dict:
+        q = query.get('q', [''])[0]
+        start = int(query.get('start', ['1'])[0])
+        num = int(query.get('num', ['10'])[0])
+        if 'site:linkedin.com' in q:
+            slug = re.sub(r'[^a-z0-9]+', '-', q.split('site:linkedin.com/in', 1)[-1].lower()).strip('-')
+            items = [{
+                'title': f"Person {i} - {slug}",
+                'link': f"https://www.linkedin.com/in/person-{i}-{slug}"[:120],
+                'snippet': f"Engineer at {slug}"
+            } for i in range(num)]
+            return {'items': items}
+        end = min(start - 1 + num, self.results_per_query)
+        tag = f"-{zlib.crc32(q.encode('utf-8')):08x}"[:7]
+        return {'items': [company_result(index, tag) for index in range(start - 1, end)]}
+
+    def _hunter(self, parts, query: Dict, body: bytes) -> Dict:
+        email = query.get('email', [''])[0]
+        # Deterministic mix of outcomes
+        score = sum(email.encode('utf-8')) % 100
+        status = 'valid' if score >= 40 else 'accept_all' if score >= 20 else 'invalid'
+        return {'data': {'email': email, 'status': status, 'score': score}}
+
+    def _chat_completion(self, parts, query: Dict, body: bytes) -> Dict:
+        request = json.loads(body or b'{}')
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+        _, _, listing = prompt.partition('\n')
+        try:
+            companies = json.loads(listing)
+        except ValueError:
+            companies = []
+        if '"descriptions"' in prompt:
+            payload = {'descriptions': [
+                {'id': company['id'], 'description': f"{company.get('company', '')} is a software vendor."}
+                for company in companies
+            ]}
+        else:
+            payload = {'companies': [
+                {'id': company['id'], 'names': ['Alex Morgan', 'Sam Taylor', 'Jordan Lee']}
+                for company in companies
+            ]}
+        content = json.dumps(payload)
+        return {
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'gpt-3.5-turbo'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4,
+                      'total_tokens': (len(prompt) + len(content)) // 4}
+        }
+
+    def _create_spreadsheet(self, parts, query: Dict, body: bytes) -> Dict:
+        with self._lock:
+            self._spreadsheets += 1
+            return {'spreadsheetId': f"bench-sheet-{self._spreadsheets}"}
+
+    def _update_values(self, parts, query: Dict, body: bytes) -> Dict:
+        rows = len(json.loads(body or b'{}').get('values', []))
+        return {'updates': {'updatedRows': rows}}
+
+    def _append_values(self, parts, query: Dict, body: bytes) -> Dict:
+        # Only the row count is kept, so streams can check whether a failed append landed
+        spreadsheet_id = parts.path.split('/')[3]
+        rows = len(json.loads(body or b'{}').get('values', []))
+        with self._lock:
+            self._sheet_rows[spreadsheet_id] = self._sheet_rows.get(spreadsheet_id, 0) + rows
+        return {'updates': {'updatedRows': rows}}
+
+    def _get_values(self, parts, query: Dict, body: bytes) -> Dict:
+        with self._lock:
+            rows = self._sheet_rows.get(parts.path.split('/')[3], 0)
+        return {'values': [['']] * rows}
+
+    def _permission(self, parts, query: Dict, body: bytes) -> Dict:
+        return {'id': 'bench-permission'}
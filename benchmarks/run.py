@@ -0,0 +1,435 @@
+# benchmarks/run.py
+"""
+Scale benchmarks for the lead pipeline against local stand-in APIs.
+
+    python -m benchmarks.run --scales 5,50,500,5000
+    python -m benchmarks.run --endpoint openai:latency=0.4,error_rate=0.02 --endpoint sheets:quota=60
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+
+Every scenario runs against a fresh data directory, so caches start cold.
+Results are compared with the stored baseline when one exists.
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from benchmarks.mock_servers import ENDPOINTS, EndpointProfile, MockApiServer, company_domain, company_result
+
+# Conditional import, peak RSS falls back to getrusage without it
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Rough production latencies of the real APIs, in seconds
+DEFAULT_PROFILES = {
+    'cse': EndpointProfile(latency=0.15, jitter=0.1),
+    'hunter': EndpointProfile(latency=0.2, jitter=0.15),
+    'openai': EndpointProfile(latency=0.8, jitter=0.6),
+    'sheets': EndpointProfile(latency=0.25, jitter=0.1)
+}
+
+SCENARIOS = ('search', 'verification', 'export', 'pipeline', 'generate_leads')
+
+# The Custom Search API never serves more than 100 results for a query
+SEARCH_LIMIT = 100
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile
+
+    :param values: Samples
+    :param pct: Percentile between 0 and 100
+    :return: Percentile value, 0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class PeakRSS:
+    """
+    Samples the resident set size of the process while a scenario runs
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current() -> int:
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        # Process-wide high-water mark; kilobytes on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._thread = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+class BenchContext:
+    """
+    Shared state of one benchmark session
+    """
+
+    def __init__(self, server: MockApiServer, workdir: str, workers: int):
+        self.server = server
+        self.workdir = workdir
+        self.workers = workers
+        self.runs = 0
+
+    def fresh_data_dir(self, label: str) -> str:
+        """
+        Point every cache and store at an empty directory
+
+        :param label: Scenario label, used in the directory name
+        :return: Data directory
+        """
+        self.runs += 1
+        data_dir = os.path.join(self.workdir, f"{self.runs:03d}-{label}")
+        os.makedirs(data_dir)
+        os.environ['COHESIVE_DATA_DIR'] = data_dir
+        return data_dir
+
+    def query(self, label: str) -> str:
+        # A distinct query per run keeps the process-wide search cache cold
+        return f"software companies {label} run{self.runs}"
+
+
+def _timed(func: Callable, latencies: List[float]):
+    start = time.perf_counter()
+    try:
+        return func()
+    finally:
+        latencies.append(time.perf_counter() - start)
+
+
+def bench_search(ctx: BenchContext, scale: int) -> Dict:
+    from src.scrapers.google_search_scraper import GoogleSearchScraper
+
+    ctx.fresh_data_dir(f"search-{scale}")
+    scraper = GoogleSearchScraper()
+    query = ctx.query(f"search {scale}")
+    latencies = []
+    # Time to each result, as seen by a consumer of the stream
+    start = time.perf_counter()
+    results = 0
+    for _ in scraper.iter_search(query, num_results=scale):
+        results += 1
+        latencies.append(time.perf_counter() - start)
+    return {'items': results, 'latencies': latencies}
+
+
+def bench_verification(ctx: BenchContext, scale: int) -> Dict:
+    from src.generators.email_generator import EmailGenerator
+
+    ctx.fresh_data_dir(f"verification-{scale}")
+    generator = EmailGenerator()
+    emails = [f"person{index}@{company_domain(index % 1000)}" for index in range(scale)]
+    latencies = []
+    with ThreadPoolExecutor(max_workers=ctx.workers) as executor:
+        outcomes = list(executor.map(
+            lambda email: _timed(lambda: generator.advanced_email_verification(email), latencies),
+            emails
+        ))
+    # Failed or throttled Hunter calls come back as 'unknown' or 'error'
+    errors = sum(1 for outcome in outcomes if str(outcome.get('status')).lower() in ('error', 'unknown'))
+    return {'items': len(outcomes), 'latencies': latencies, 'failed': errors}
+
+
+def bench_export(ctx: BenchContext, scale: int) -> Dict:
+    from src.exporters.google_sheets_exporter import LeadExporter
+
+    ctx.fresh_data_dir(f"export-{scale}")
+    leads = []
+    for index in range(scale):
+        result = company_result(index)
+        leads.append({
+            'company_name': result['title'],
+            'website': result['link'],
+            'description': result['snippet'],
+            'emails': [{'email': f"alex.morgan@{company_domain(index)}"}],
+            'linkedin_profiles': [f"https://www.linkedin.com/in/alex-morgan-{index}"],
+            'verification_status': 'Initial',
+            'timestamp': '2024-01-01 00:00:00'
+        })
+    latencies = []
+    _timed(lambda: LeadExporter().export_leads(leads), latencies)
+    return {'items': len(leads), 'latencies': latencies}
+
+
+def bench_pipeline(ctx: BenchContext, scale: int) -> Dict:
+    from src.generators.description_enricher import DescriptionEnricher
+    from src.generators.email_generator import EmailGenerator
+    from src.pipeline import LeadPipeline
+    from src.scrapers.linkedin_scraper import LinkedInProfileScraper
+    from src.utils.domain_index import DomainIndex
+    from src.utils.job_store import CompanyCheckpoint, JobStore
+
+    ctx.fresh_data_dir(f"pipeline-{scale}")
+    job_store = JobStore()
+    job_id = job_store.create_job({'search_query': 'bench', 'business_location': 'Remote',
+                                   'num_results': scale})
+    tag = f"-r{ctx.runs}"
+    results = []
+    for index in range(scale):
+        result = company_result(index, tag)
+        result['domain'] = company_domain(index)
+        results.append(result)
+
+    latencies = []
+    start = time.perf_counter()
+    pipeline = LeadPipeline(
+        'Remote', '2024-01-01 00:00:00',
+        LinkedInProfileScraper(), EmailGenerator(), DescriptionEnricher(),
+        max_workers=ctx.workers,
+        on_lead=lambda lead, checkpoint: latencies.append(time.perf_counter() - start),
+        domain_index=DomainIndex()
+    )
+    leads = pipeline.run((result, CompanyCheckpoint(job_store, job_id, index))
+                         for index, result in enumerate(results))
+    return {'items': len(leads), 'latencies': latencies}
+
+
+def bench_generate_leads(ctx: BenchContext, scale: int) -> Dict:
+    from src.pipeline import generate_leads
+
+    ctx.fresh_data_dir(f"generate_leads-{scale}")
+    latencies = []
+    leads, spreadsheet_id = _timed(
+        lambda: generate_leads(ctx.query(f"leads {scale}"), 'Remote', scale, max_workers=ctx.workers),
+        latencies
+    )
+    return {'items': len(leads), 'latencies': latencies, 'failed': 0 if spreadsheet_id else 1}
+
+
+BENCHMARKS = {
+    'search': bench_search,
+    'verification': bench_verification,
+    'export': bench_export,
+    'pipeline': bench_pipeline,
+    'generate_leads': bench_generate_leads
+}
+
+# Modules the scenarios import; loading them up front keeps their import time
+# out of whichever scenario happens to run first
+SCENARIO_MODULES = (
+    'src.scrapers.google_search_scraper',
+    'src.generators.email_generator',
+    'src.generators.description_enricher',
+    'src.exporters.google_sheets_exporter',
+    'src.scrapers.linkedin_scraper',
+    'src.pipeline'
+)
+
+
+def run_scenario(ctx: BenchContext, scenario: str, scale: int) -> Dict:
+    """
+    Run one scenario at one scale and summarise it
+
+    :param ctx: Benchmark session
+    :param scenario: Scenario name
+    :param scale: Number of companies, results or emails
+    :return: Result row
+    """
+    requests_before = ctx.server.stats()
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        outcome = BENCHMARKS[scenario](ctx, scale)
+        elapsed = time.perf_counter() - start
+    requests_after = ctx.server.stats()
+    latencies = outcome['latencies']
+    return {
+        'scenario': scenario,
+        'scale': scale,
+        'items': outcome['items'],
+        'failed': outcome.get('failed', 0),
+        'seconds': round(elapsed, 3),
+        'throughput': round(outcome['items'] / elapsed, 3) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'peak_rss_mb': round(rss.peak / 2 ** 20, 1),
+        'api_calls': {
+            name: {field: requests_after[name][field] - requests_before[name][field]
+                   for field in requests_after[name]}
+            for name in requests_after
+        }
+    }
+
+
+def compare(rows: List[Dict], baseline: Dict, max_regression: float) -> List[str]:
+    """
+    Compare rows with a stored baseline
+
+    :param rows: Result rows of this run
+    :param baseline: Baseline document
+    :param max_regression: Allowed fractional throughput drop
+    :return: Descriptions of the regressions found
+    """
+    reference = {(row['scenario'], row['scale']): row for row in baseline.get('results', [])}
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('created_at', 'unknown date')}:")
+    for row in rows:
+        base = reference.get((row['scenario'], row['scale']))
+        if not base or not base['throughput']:
+            continue
+        change = row['throughput'] / base['throughput'] - 1
+        p99_change = row['p99_ms'] / base['p99_ms'] - 1 if base['p99_ms'] else 0.0
+        print(f"  {row['scenario']:<15} {row['scale']:>6}  throughput {change:+7.1%}  p99 {p99_change:+7.1%}")
+        if change < -max_regression:
+            regressions.append(f"{row['scenario']}@{row['scale']}: throughput {change:+.1%}")
+    return regressions
+
+
+def print_table(rows: List[Dict]):
+    print(f"{'scenario':<15} {'scale':>6} {'items':>6} {'failed':>6} {'seconds':>9} "
+          f"{'items/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'rss MB':>8}  api calls (requests/errors/throttled)")
+    for row in rows:
+        calls = ' '.join(
+            f"{name}={stats['requests']}/{stats['errors']}/{stats['throttled']}"
+            for name, stats in row['api_calls'].items() if stats['requests']
+        )
+        print(f"{row['scenario']:<15} {row['scale']:>6} {row['items']:>6} {row['failed']:>6} "
+              f"{row['seconds']:>9.2f} {row['throughput']:>9.2f} {row['p50_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['peak_rss_mb']:>8.1f}  {calls}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='5,50',
+                        help='Comma separated scales; search and generate_leads stop at 100 results')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--endpoint', action='append', default=[], metavar='NAME:SETTINGS',
+                        help="Endpoint profile override, e.g. 'hunter:latency=0.05,error_rate=0.01,quota=100'; "
+                             "'all:' applies to every endpoint")
+    parser.add_argument('--workers', type=int, default=8, help='Companies or emails processed at once')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for injected errors and jitter')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline to compare against')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a new baseline')
+    parser.add_argument('--output', metavar='PATH', help='Write the results as JSON')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Fail when throughput drops by more than this fraction of the baseline')
+    parser.add_argument('--verbose', action='store_true', help='Keep pipeline logging enabled')
+    return parser.parse_args(argv)
+
+
+def build_profiles(overrides: List[str]) -> Dict[str, EndpointProfile]:
+    profiles = dict(DEFAULT_PROFILES)
+    for override in overrides:
+        name, _, spec = override.partition(':')
+        names = ENDPOINTS if name == 'all' else [name]
+        for endpoint in names:
+            if endpoint not in ENDPOINTS:
+                raise ValueError(f"Unknown endpoint: {endpoint}")
+            profiles[endpoint] = EndpointProfile.parse(spec, profiles[endpoint])
+    return profiles
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    scales = sorted({int(scale) for scale in args.scales.split(',') if scale.strip()})
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(',') if scenario.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    profiles = build_profiles(args.endpoint)
+
+    if not args.verbose:
+        # Injected failures are counted per endpoint instead of logged
+        logging.disable(logging.CRITICAL)
+
+    workdir = tempfile.mkdtemp(prefix='cohesive-bench-')
+    server = MockApiServer(profiles, results_per_query=SEARCH_LIMIT, seed=args.seed).start()
+    # Environment first: endpoint overrides are read when the modules are imported
+    os.environ.update(server.env())
+    os.environ.update({
+        'HTTP_TRANSPORT_MODE': 'live',
+        'EXPORT_STREAMING': 'true',
+        # The stand-in enforces its own quota
+        'EXPORT_MIN_WRITE_INTERVAL': '0'
+    })
+    # Log files are written to the working directory
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    try:
+        from google.auth.credentials import AnonymousCredentials
+        from src.exporters import google_clients
+        from src.utils.dns_cache import mx_cache
+
+        google_clients.set_credentials(AnonymousCredentials())
+        for module in SCENARIO_MODULES:
+            importlib.import_module(module)
+        # Synthetic domains do not exist, so their MX answers are seeded up front
+        for index in range(max(scales)):
+            mx_cache.store(company_domain(index), [f"mx.{company_domain(index)}"], ttl=86400)
+
+        ctx = BenchContext(server, workdir, args.workers)
+        rows = []
+        for scenario in scenarios:
+            capped = scenario in ('search', 'generate_leads')
+            for scale in sorted({min(scale, SEARCH_LIMIT) if capped else scale for scale in scales}):
+                print(f"Running {scenario} at scale {scale}...", file=sys.stderr, flush=True)
+                rows.append(run_scenario(ctx, scenario, scale))
+    finally:
+        os.chdir(previous_cwd)
+        server.stop()
+
+    print_table(rows)
+    document = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'workers': args.workers,
+        'profiles': {name: profile.to_dict() for name, profile in profiles.items()},
+        'results': rows
+    }
+
+    regressions = []
+    if args.baseline and os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(rows, json.load(baseline_file), args.max_regression)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as output_file:
+            json.dump(document, output_file, indent=2)
+        print(f"Results written to {path}")
+
+    if regressions:
+        print("Throughput regressions:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# src/exporters/google_clients.py
+import os
+import logging
+import threading
+from typing import List
+
+import httplib2
+from google.auth.credentials import AnonymousCredentials
+from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+from src.utils.metrics import metrics
+from src.utils.transport import get_transport
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'  # Drive scope is needed for sharing
+]
+
+# httplib2 connections are not thread-safe, so every request on the shared
+# services is executed under this lock
+_execute_lock = threading.RLock()
+_factory_lock = threading.Lock()
+_credentials = {}
+_services = {}
+
+# Optional API endpoint overrides, e.g. a local stand-in server for benchmarks
+ENDPOINT_ENV = {
+    'sheets': 'GOOGLE_SHEETS_ENDPOINT',
+    'drive': 'GOOGLE_DRIVE_ENDPOINT'
+}
+
+
+def credential_paths(credentials_filename: str) -> List[str]:
+    """
+    Candidate locations of the service account credentials file
+
+    :param credentials_filename: Credentials file name
+    :return: Paths in lookup order
+    """
+    return [
+        # Explicit full paths for your specific system
+        r'D:\cohesive\cohesive\src\credentials\google_sheets_credentials.json',
+        r'D:\cohesive\cohesive\credentials\google_sheets_credentials.json',
+
+        # Current project structure
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'credentials', credentials_filename),
+
+        # Alternative path
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'credentials', credentials_filename),
+
+        # Absolute path fallback
+        os.path.join(os.path.expanduser('~'), 'cohesive', 'credentials', credentials_filename),
+
+        # Relative to current working directory
+        os.path.join(os.getcwd(), 'credentials', credentials_filename)
+    ]
+
+
+def get_credentials(credentials_filename: str = 'google_sheets_credentials.json'):
+    """
+    Resolve and load service account credentials once per process
+
+    :param credentials_filename: Credentials file name
+    :return: Service account credentials
+    :raises FileNotFoundError: If no credentials file exists
+    """
+    with _factory_lock:
+        if credentials_filename in _credentials:
+            return _credentials[credentials_filename]
+
+        possible_paths = credential_paths(credentials_filename)
+
+        # Find the first existing credentials file
+        credentials_path = next((path for path in possible_paths if os.path.exists(path)), None)
+
+        if not credentials_path and get_transport().mode == 'replay':
+            # Replayed runs never reach Google, so no real key is needed
+            _credentials[credentials_filename] = AnonymousCredentials()
+            return _credentials[credentials_filename]
+
+        if not credentials_path:
+            error_msg = f"Google Sheets credentials not found. Checked paths:\n" + "\n".join(possible_paths)
+            logging.error(error_msg)
+            raise FileNotFoundError(error_msg)
+
+        logging.info(f"Using credentials from: {credentials_path}")
+
+        credentials = service_account.Credentials.from_service_account_file(
+            credentials_path,
+            scopes=SCOPES
+        )
+        _credentials[credentials_filename] = credentials
+        return credentials
+
+
+def set_credentials(credentials, credentials_filename: str = 'google_sheets_credentials.json'):
+    """
+    Use the given credentials instead of loading the key file, e.g.
+    AnonymousCredentials against a local stand-in server
+
+    :param credentials: google.auth credentials
+    :param credentials_filename: Credentials file name the override applies to
+    """
+    with _factory_lock:
+        _credentials[credentials_filename] = credentials
+        for key in [key for key in _services if key[-1] == credentials_filename]:
+            del _services[key]
+
+
+def get_service(service_name: str,
+                version: str,
+                credentials_filename: str = 'google_sheets_credentials.json'):
+    """
+    Return a cached Google API service built from the bundled discovery document
+
+    Services share one authorized HTTP connection per credentials file, so
+    repeated exports reuse both the parsed discovery document and the
+    open connection.
+
+    :param service_name: API name, e.g. 'sheets'
+    :param version: API version, e.g. 'v4'
+    :param credentials_filename: Credentials file name
+    :return: googleapiclient Resource
+    """
+    credentials = get_credentials(credentials_filename)
+    key = (service_name, version, credentials_filename)
+    with _factory_lock:
+        if key not in _services:
+            http_key = ('http', credentials_filename)
+            if http_key not in _services:
+                transport = get_transport()
+                http = None
+                if transport.mode != 'replay':
+                    http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=60))
+                # Record/replay modes route Google API traffic through the shared transport
+                _services[http_key] = transport.wrap_httplib2(http)
+            endpoint = os.getenv(ENDPOINT_ENV.get(service_name, ''), '')
+            _services[key] = build(
+                service_name,
+                version,
+                http=_services[http_key],
+                static_discovery=True,
+                cache_discovery=False,
+                client_options={'api_endpoint': endpoint} if endpoint else None
+            )
+        return _services[key]
+
+
+def get_sheets_service(credentials_filename: str = 'google_sheets_credentials.json'):
+    """
+    :return: Shared Sheets v4 service
+    """
+    return get_service('sheets', 'v4', credentials_filename)
+
+
+def get_drive_service(credentials_filename: str = 'google_sheets_credentials.json'):
+    """
+    :return: Shared Drive v3 service
+    """
+    return get_service('drive', 'v3', credentials_filename)
+
+
+def execute(request):
+    """
+    Execute a request on a shared service
+
+    :param request: googleapiclient HttpRequest
+    :return: Decoded response
+    """
+    # Timed per API, e.g. 'sheets' or 'drive', from the method ID 'sheets.spreadsheets.create'
+    endpoint = (getattr(request, 'methodId', None) or 'google').split('.')[0]
+    with _execute_lock, metrics.time_call(endpoint):
+        return request.execute()
+
+
+def reset_clients():
+    """
+    Drop cached credentials and services, e.g. after rotating the key file
+    """
+    with _factory_lock:
+        _credentials.clear()
+        _services.clear()
@@ -1,54 +1,103 @@
 # src/exporters/google_sheets_exporter.py
-import os
+import time
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
-class LeadExporter:
-    def __init__(self, credentials_filename='google_sheets_credentials.json'):
-        # Enhanced path resolution strategies
-        possible_paths = [
-            # Explicit full paths for your specific system
-            r'D:\cohesive\cohesive\src\credentials\google_sheets_credentials.json',
-            r'D:\cohesive\cohesive\credentials\google_sheets_credentials.json',
-            
-            # Current project structure
-            os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'credentials', credentials_filename),
-            
-            # Alternative path
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'credentials', credentials_filename),
-            
-            # Absolute path fallback
-            os.path.join(os.path.expanduser('~'), 'cohesive', 'credentials', credentials_filename),
-            
-            # Relative to current working directory
-            os.path.join(os.getcwd(), 'credentials', credentials_filename)
-        ]
-
-        # Find the first existing credentials file
-        credentials_path = next((path for path in possible_paths if os.path.exists(path)), None)
+from src.exporters.google_clients import execute, get_credentials, get_drive_service, get_sheets_service
+from src.utils.config import get_env_float, get_env_int
 
-        if not credentials_path:
-            error_msg = f"Google Sheets credentials not found. Checked paths:\n" + "\n".join(possible_paths)
-            logging.error(error_msg)
-            raise FileNotFoundError(error_msg)
+# Column headers shared by batch and streaming exports
+HEADERS = [
+    'Company Name', 'Website', 'Description', 
+    'Emails', 'LinkedIn Profiles', 'Verification Status'
+]
 
-        logging.info(f"Using credentials from: {credentials_path}")
+def lead_to_row(lead: Dict) -> List[str]:
+    """
+    Transform a lead dictionary into a spreadsheet row
+    
+    :param lead: Lead dictionary
+    :return: Row values in HEADERS order
+    """
+    return [
+        lead.get('company_name', ''),
+        lead.get('website', ''),
+        lead.get('description', ''),
+        ', '.join([e['email'] for e in lead.get('emails', [])]),
+        ', '.join(lead.get('linkedin_profiles', [])),
+        lead.get('verification_status', '')
+    ]
 
+class LeadExporter:
+    def __init__(self, credentials_filename='google_sheets_credentials.json'):
         try:
-            # Use service account credentials
-            self.credentials = service_account.Credentials.from_service_account_file(
-                credentials_path, 
-                scopes=['https://www.googleapis.com/auth/spreadsheets', 
-                        'https://www.googleapis.com/auth/drive']  # Added drive scope for sharing
-            )
-            self.sheets_service = build('sheets', 'v4', credentials=self.credentials)
+            # Credentials and services are resolved once per process and shared
+            self.credentials = get_credentials(credentials_filename)
+            self.sheets_service = get_sheets_service(credentials_filename)
+            self.credentials_filename = credentials_filename
         except Exception as e:
             logging.error(f"Failed to initialize Google Sheets service: {e}")
             raise
 
+    def create_spreadsheet(self) -> str:
+        """
+        Create a new, empty lead export spreadsheet
+        
+        :return: Spreadsheet ID
+        """
+        spreadsheet = {
+            'properties': {
+                'title': f'Lead Export - {datetime.now().strftime("%Y-%m-%d %H:%M")}'
+            }
+        }
+        spreadsheet = execute(self.sheets_service.spreadsheets().create(
+            body=spreadsheet, 
+            fields='spreadsheetId'
+        ))
+        return spreadsheet['spreadsheetId']
+
+    def start_stream(self,
+                     batch_size: int = None,
+                     flush_interval: float = None,
+                     min_write_interval: float = None) -> 'LeadExportStream':
+        """
+        Create a spreadsheet up front and return a stream that appends leads as they complete
+        
+        :param batch_size: Number of buffered rows that triggers a write
+        :param flush_interval: Maximum seconds a row waits in the buffer
+        :param min_write_interval: Minimum seconds between two write requests
+        :return: Open LeadExportStream
+        """
+        try:
+            spreadsheet_id = self.create_spreadsheet()
+            stream = LeadExportStream(self, spreadsheet_id, batch_size,
+                                      flush_interval, min_write_interval, existing_rows=0)
+            stream.append_rows([HEADERS])
+            return stream
+        except Exception as e:
+            logging.error(f"Failed to start lead export stream: {e}")
+            raise
+
+    def resume_stream(self,
+                      spreadsheet_id: str,
+                      batch_size: int = None,
+                      flush_interval: float = None,
+                      min_write_interval: float = None) -> 'LeadExportStream':
+        """
+        Continue appending leads to a spreadsheet created by an earlier stream
+        
+        :param spreadsheet_id: Spreadsheet to append to
+        :param batch_size: Number of buffered rows that triggers a write
+        :param flush_interval: Maximum seconds a row waits in the buffer
+        :param min_write_interval: Minimum seconds between two write requests
+        :return: Open LeadExportStream
+        """
+        return LeadExportStream(self, spreadsheet_id, batch_size,
+                                flush_interval, min_write_interval)
+
     def export_leads(self, leads: List[Dict], share_email: str = None) -> str:
         """
         Export leads to a new Google Sheets spreadsheet
@@ -59,47 +108,19 @@ class LeadExporter:
         """
         try:
             # Create a new spreadsheet
-            spreadsheet = {
-                'properties': {
-                    'title': f'Lead Export - {datetime.now().strftime("%Y-%m-%d %H:%M")}'
-                }
-            }
-            spreadsheet = self.sheets_service.spreadsheets().create(
-                body=spreadsheet, 
-                fields='spreadsheetId'
-            ).execute()
-            spreadsheet_id = spreadsheet['spreadsheetId']
-
-            # Prepare headers and data
-            headers = [
-                'Company Name', 'Website', 'Description', 
-                'Emails', 'LinkedIn Profiles', 'Verification Status'
-            ]
-            
-            # Transform leads into rows
-            rows = []
-            for lead in leads:
-                row = [
-                    lead.get('company_name', ''),
-                    lead.get('website', ''),
-                    lead.get('description', ''),
-                    ', '.join([e['email'] for e in lead.get('emails', [])]),
-                    ', '.join(lead.get('linkedin_profiles', [])),
-                    lead.get('verification_status', '')
-                ]
-                rows.append(row)
+            spreadsheet_id = self.create_spreadsheet()
 
             # Combine headers and data
-            values = [headers] + rows
+            values = [HEADERS] + [lead_to_row(lead) for lead in leads]
 
             # Write data to the sheet
             body = {'values': values}
-            result = self.sheets_service.spreadsheets().values().update(
+            result = execute(self.sheets_service.spreadsheets().values().update(
                 spreadsheetId=spreadsheet_id, 
                 range='Sheet1!A1', 
                 valueInputOption='RAW', 
                 body=body
-            ).execute()
+            ))
 
             # Optional sharing
             if share_email:
@@ -119,8 +140,8 @@ class LeadExporter:
         :param email: Email to share with
         """
         try:
-            # Drive API for sharing
-            drive_service = build('drive', 'v3', credentials=self.credentials)
+            # Drive API for sharing, reusing the shared client
+            drive_service = get_drive_service(self.credentials_filename)
             
             # Define permission
             permission = {
@@ -130,13 +151,222 @@ class LeadExporter:
             }
             
             # Execute sharing
-            drive_service.permissions().create(
+            execute(drive_service.permissions().create(
                 fileId=spreadsheet_id, 
                 body=permission
-            ).execute()
+            ))
             
             logging.info(f"Spreadsheet {spreadsheet_id} shared with {email}")
         
         except Exception as e:
             logging.error(f"Failed to share spreadsheet: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+class LeadExportStream:
+    """
+    Incrementally appends lead rows to an existing spreadsheet.
+
+    Rows are buffered and written through values().append once the buffer
+    reaches batch_size rows or its oldest row has waited flush_interval
+    seconds. Writes are spaced at least min_write_interval seconds apart to
+    stay within the Sheets per-minute write quota.
+
+    Appends are not idempotent, so a failed write is only retried when it
+    is known not to have landed: a 429 is rejected before anything is
+    written, while after a server error or timeout the stream counts the
+    rows in the sheet to find out whether the append went through.
+    """
+
+    SERVER_ERROR_STATUSES = {500, 502, 503, 504}
+
+    def __init__(self,
+                 exporter: LeadExporter,
+                 spreadsheet_id: str,
+                 batch_size: int = None,
+                 flush_interval: float = None,
+                 min_write_interval: float = None,
+                 max_retries: int = 5,
+                 existing_rows: int = None):
+        """
+        :param exporter: LeadExporter owning the Sheets service
+        :param spreadsheet_id: Spreadsheet rows are appended to
+        :param batch_size: Number of buffered rows that triggers a write
+        :param flush_interval: Maximum seconds a row waits in the buffer
+        :param min_write_interval: Minimum seconds between two write requests
+        :param max_retries: Attempts per write before the rows are kept for the next flush
+        :param existing_rows: Rows already in the sheet, counted from the sheet when not given
+        
+        After every successful write, the optional on_written callback receives
+        the keys passed to add() for the rows that were written.
+        """
+        self.exporter = exporter
+        self.spreadsheet_id = spreadsheet_id
+        self.batch_size = max(1, batch_size or get_env_int('EXPORT_BATCH_SIZE', 20))
+        self.flush_interval = flush_interval or get_env_float('EXPORT_FLUSH_INTERVAL', 5.0)
+        self.min_write_interval = (min_write_interval if min_write_interval is not None
+                                   else get_env_float('EXPORT_MIN_WRITE_INTERVAL', 1.0))
+        self.max_retries = max_retries
+        self.rows_written = 0
+        self._rows_in_sheet = existing_rows
+        self._unconfirmed = 0
+        self.on_written = None
+        self._buffer = []
+        self._oldest_buffered_at = None
+        self._last_write_at = 0.0
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically,
+                                         name='sheets-flusher', daemon=True)
+        self._flusher.start()
+
+    def add(self, lead: Dict, key=None):
+        """
+        Buffer a completed lead for export
+        
+        :param lead: Lead dictionary
+        :param key: Optional value handed to on_written once the row is written
+        """
+        with self._buffer_lock:
+            if not self._buffer:
+                self._oldest_buffered_at = time.monotonic()
+            self._buffer.append((lead_to_row(lead), key))
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    @property
+    def pending_rows(self) -> int:
+        """
+        Number of buffered rows not written yet
+        """
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def flush(self) -> bool:
+        """
+        Write all buffered rows to the spreadsheet
+
+        :return: Whether the buffer was written; failed rows stay buffered
+        """
+        with self._write_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+                self._oldest_buffered_at = None
+            if not rows:
+                return True
+            try:
+                self.append_rows([row for row, _ in rows])
+            except Exception as e:
+                logging.error(f"Failed to append {len(rows)} rows, keeping them for the next flush: {e}")
+                with self._buffer_lock:
+                    self._buffer = rows + self._buffer
+                    self._oldest_buffered_at = time.monotonic()
+                return False
+            if self.on_written:
+                try:
+                    self.on_written([key for _, key in rows if key is not None])
+                except Exception as e:
+                    logging.error(f"Export write callback failed: {e}")
+        return True
+
+    def count_rows(self) -> int:
+        """
+        :return: Number of rows in the sheet up to the last one with data
+        """
+        result = execute(self.exporter.sheets_service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id,
+            range='Sheet1!A:F'
+        ))
+        return len(result.get('values', []))
+
+    def append_rows(self, rows: List[List[str]]):
+        """
+        Append rows below the existing data, respecting the write quota
+        
+        :param rows: Row values to append
+        :raises Exception: When the rows were not written, or it is unknown whether they were
+        """
+        rows = self._skip_landed(rows)
+        delay = 1.0
+        for attempt in range(self.max_retries):
+            if not rows:
+                return
+            wait = self._last_write_at + self.min_write_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self._last_write_at = time.monotonic()
+                execute(self.exporter.sheets_service.spreadsheets().values().append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range='Sheet1!A1',
+                    valueInputOption='RAW',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': rows}
+                ))
+            except (HttpError, OSError) as e:
+                status = e.resp.status if isinstance(e, HttpError) else None
+                if status is not None and status != 429 and status not in self.SERVER_ERROR_STATUSES:
+                    raise
+                if status != 429:
+                    # The append may have gone through before the error; find out before retrying
+                    self._unconfirmed = len(rows)
+                if attempt == self.max_retries - 1:
+                    raise
+                logging.warning(f"Sheets write failed ({status or e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+                rows = self._skip_landed(rows)
+            else:
+                self._wrote(len(rows))
+                return
+
+    def _skip_landed(self, rows: List[List[str]]) -> List[List[str]]:
+        """
+        Settle the sheet's row count, dropping the leading rows an unconfirmed write already added
+
+        :param rows: Rows about to be appended, starting with those of the unconfirmed write
+        :return: Rows still to append
+        """
+        if self._rows_in_sheet is None:
+            self._rows_in_sheet = self.count_rows()
+        if self._unconfirmed:
+            landed = self.count_rows() - self._rows_in_sheet
+            count, self._unconfirmed = self._unconfirmed, 0
+            if landed >= count:
+                logging.warning(f"A failed Sheets write had added its {count} rows, not writing them again")
+                self._wrote(count)
+                return rows[count:]
+            self._rows_in_sheet += landed
+        return rows
+
+    def _wrote(self, count: int):
+        self.rows_written += count
+        self._rows_in_sheet += count
+
+    def _flush_periodically(self):
+        while not self._closed.wait(min(self.flush_interval, 1.0)):
+            with self._buffer_lock:
+                due = (self._oldest_buffered_at is not None and
+                       time.monotonic() - self._oldest_buffered_at >= self.flush_interval)
+            if due:
+                self.flush()
+
+    def close(self) -> int:
+        """
+        Stop the background flusher and write any remaining rows
+
+        :return: Number of rows that could not be written
+        """
+        self._closed.set()
+        self._flusher.join()
+        if not self.flush():
+            logging.error(f"{self.pending_rows} rows were not exported to {self.spreadsheet_id}")
+        return self.pending_rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
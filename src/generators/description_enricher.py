@@ -0,0 +1,163 @@
+# src/generators/description_enricher.py
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+# Use absolute import for logger
+from src.utils.logger import setup_logger
+from src.utils.cache import PersistentCache, data_path
+from src.utils.config import get_env_int
+from src.utils.metrics import metrics
+from src.utils.transport import openai_client
+
+# Conditional OpenAI import to avoid global import
+try:
+    import openai
+except ImportError:
+    openai = None
+
+
+def company_key(result: Dict) -> str:
+    """
+    Memo key for a search result: its normalized domain, or the title when no link exists
+
+    :param result: Search result with 'link' and 'title'
+    :return: Normalized key
+    """
+    link = result.get('link', '') or ''
+    try:
+        domain = link.split('//')[1].split('/')[0]
+    except IndexError:
+        domain = ''
+    domain = domain.lower().split(':')[0]
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain or (result.get('title', '') or '').strip().lower()
+
+
+class DescriptionEnricher:
+    def __init__(self,
+                 openai_api_key: str = None,
+                 model: str = None,
+                 batch_size: int = None,
+                 max_concurrency: int = None,
+                 cache: PersistentCache = None):
+        """
+        Batched business description enrichment through chat completions
+
+        :param openai_api_key: OpenAI API key
+        :param model: Chat completions model
+        :param batch_size: Number of companies sent per request
+        :param max_concurrency: Maximum number of requests in flight
+        :param cache: Optional description memo, keyed by domain
+        """
+        self.logger = setup_logger('description_enricher')
+        self.model = model or os.getenv('ENRICHMENT_MODEL', 'gpt-3.5-turbo')
+        self.batch_size = max(1, batch_size or get_env_int('ENRICHMENT_BATCH_SIZE', 10))
+        self.max_concurrency = max(1, max_concurrency or get_env_int('ENRICHMENT_CONCURRENCY', 4))
+        self.cache = cache if cache is not None else PersistentCache(
+            os.getenv('ENRICHMENT_CACHE_PATH') or data_path('enrichment_cache.sqlite3'),
+            namespace='descriptions',
+            max_entries=get_env_int('ENRICHMENT_CACHE_MAX_ENTRIES', 50000)
+        )
+
+        api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
+        self.client = None
+        if openai and api_key:
+            try:
+                self.client = openai_client(api_key)
+            except Exception as e:
+                self.logger.error(f"OpenAI Client initialization failed: {e}")
+        elif not openai:
+            self.logger.warning("OpenAI library not installed")
+        else:
+            self.logger.warning("OpenAI API Key not found")
+
+    def enrich_many(self, results: List[Dict]) -> Dict[str, str]:
+        """
+        Enrich descriptions for many search results
+
+        Memoized companies are served from the cache; the rest are sent to the
+        model in batches. Companies the model could not describe fall back to
+        their search snippet and are not memoized.
+
+        :param results: Search results with 'title', 'link' and 'snippet'
+        :return: Mapping of company key to description
+        """
+        descriptions = {}
+        pending = {}
+        for result in results:
+            key = company_key(result)
+            if key in descriptions or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                descriptions[key] = cached
+            else:
+                pending[key] = result
+
+        if pending and self.client:
+            items = list(pending.items())
+            batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+            if len(batches) == 1:
+                descriptions.update(self._enrich_batch(batches[0]))
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(batches), self.max_concurrency),
+                                        thread_name_prefix='enrich') as executor:
+                    for batch_descriptions in executor.map(self._enrich_batch, batches):
+                        descriptions.update(batch_descriptions)
+
+        for key, result in pending.items():
+            descriptions.setdefault(key, result.get('snippet', ''))
+        return descriptions
+
+    def _enrich_batch(self, batch: List) -> Dict[str, str]:
+        companies = [
+            {
+                'id': index,
+                'company': result.get('title', ''),
+                'website': result.get('link', ''),
+                'context': result.get('snippet', '')
+            }
+            for index, (_, result) in enumerate(batch)
+        ]
+        try:
+            with metrics.time_call('openai'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You write professional, concise business descriptions. "
+                                       "Answer with JSON only."
+                        },
+                        {
+                            "role": "user",
+                            "content": "Describe each company below in at most 60 words, using its context. "
+                                       'Return {"descriptions": [{"id": <id>, "description": "<text>"}]} '
+                                       "with one entry per company.\n" + json.dumps(companies)
+                        }
+                    ],
+                    max_tokens=120 * len(batch) + 50
+                )
+            payload = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            self.logger.error(f"AI Description Generation Error: {e}")
+            return {}
+
+        descriptions = {}
+        for entry in payload.get('descriptions', []):
+            try:
+                index = int(entry['id'])
+                description = str(entry.get('description', '')).strip()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not 0 <= index < len(batch):
+                continue
+            key = batch[index][0]
+            if description:
+                descriptions[key] = description
+                self.cache.set(key, description)
+        return descriptions
@@ -0,0 +1,198 @@
+# src/generators/email_candidates.py
+import string
+from typing import Dict, Iterable, List, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+# Address patterns in the order candidates are tried. Fields: first, last,
+# and their initials f and l.
+EMAIL_PATTERNS: Dict[str, str] = {
+    'first.last': '{first}.{last}',
+    'firstlast': '{first}{last}',
+    'first_last': '{first}_{last}',
+    'flast': '{f}{last}',
+    'f.last': '{f}.{last}',
+    'first': '{first}'
+}
+
+_FIELDS = {'first', 'last', 'f', 'l'}
+
+
+def _compile(template: str):
+    """
+    Split a pattern into literal text and field names
+
+    :param template: Pattern such as '{first}.{last}'
+    :return: List of (is_field, text) parts
+    :raises ValueError: For unknown fields
+    """
+    parts = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        if literal:
+            parts.append((False, literal))
+        if field is not None:
+            if field not in _FIELDS:
+                raise ValueError(f"Unknown email pattern field '{field}' in {template!r}")
+            parts.append((True, field))
+    return parts
+
+
+def normalize_name_part(values: pd.Series) -> pd.Series:
+    """
+    Fold names to the ASCII characters used in addresses
+
+    Diacritics are removed (José -> jose) and everything except letters and
+    digits is dropped (O'Neil -> oneil, Jean-Luc -> jeanluc).
+
+    :param values: Series of name parts
+    :return: Lower-case ASCII Series, empty strings for missing values
+    """
+    return (values.fillna('').astype(str)
+            .str.normalize('NFKD')
+            .str.encode('ascii', errors='ignore')
+            .str.decode('ascii')
+            .str.lower()
+            .str.replace(r'[^a-z0-9]+', '', regex=True))
+
+
+def normalize_domains(values: pd.Series) -> pd.Series:
+    """
+    :param values: Series of domains or host names
+    :return: Lower-case domains without scheme, path, port or leading 'www.'
+    """
+    return (values.fillna('').astype(str).str.strip().str.lower()
+            .str.replace(r'^[a-z][a-z0-9+.-]*://', '', regex=True)
+            .str.replace(r'[/:?#].*$', '', regex=True)
+            .str.replace(r'^www\.', '', regex=True)
+            .str.rstrip('.'))
+
+
+def split_full_names(names: pd.Series) -> pd.DataFrame:
+    """
+    Split full names into first and last name
+
+    :param names: Series of names such as 'Emily Johnson'
+    :return: DataFrame with 'first' and 'last' columns; last is empty for single names
+    """
+    tokens = names.fillna('').astype(str).str.strip().str.split()
+    first = tokens.str[0].fillna('')
+    last = tokens.where(tokens.str.len() >= 2).str[-1].fillna('')
+    return pd.DataFrame({'first': first, 'last': last}, index=names.index)
+
+
+def generate_candidates(people: Union[pd.DataFrame, Mapping[str, Iterable]],
+                        patterns: Union[Iterable[str], Mapping[str, str]] = None,
+                        dedupe: bool = True) -> pd.DataFrame:
+    """
+    Build email candidates for many (name, domain) pairs at once
+
+    Input columns are either 'name' (full names) or 'first' and 'last',
+    plus 'domain'. Every pattern is applied to whole columns, so tens of
+    thousands of pairs are expanded without a Python loop per address.
+
+    :param people: DataFrame or mapping of columns
+    :param patterns: Pattern names from EMAIL_PATTERNS, or a mapping of name to
+        template with the fields first, last, f and l; defaults to all EMAIL_PATTERNS
+    :param dedupe: Drop repeated addresses, keeping the first occurrence
+    :return: DataFrame with columns 'row' (position in the input), 'pattern'
+        (categorical) and 'email', ordered by row and then pattern
+    :raises ValueError: For unknown patterns or missing columns
+    """
+    frame = people if isinstance(people, pd.DataFrame) else pd.DataFrame(dict(people))
+    if patterns is None:
+        patterns = EMAIL_PATTERNS
+    elif not isinstance(patterns, Mapping):
+        unknown = [name for name in patterns if name not in EMAIL_PATTERNS]
+        if unknown:
+            raise ValueError(f"Unknown email patterns: {unknown}")
+        patterns = {name: EMAIL_PATTERNS[name] for name in patterns}
+
+    if 'domain' not in frame:
+        raise ValueError("A 'domain' column is required")
+    if 'first' in frame:
+        names = pd.DataFrame({'first': frame['first'],
+                              'last': frame['last'] if 'last' in frame else ''}, index=frame.index)
+    elif 'name' in frame:
+        names = split_full_names(frame['name'])
+    else:
+        raise ValueError("Either a 'name' column or 'first'/'last' columns are required")
+
+    first = normalize_name_part(names['first'])
+    last = normalize_name_part(names['last'])
+    fields = {
+        'first': first.to_numpy(dtype=object),
+        'last': last.to_numpy(dtype=object),
+        'f': first.str[:1].to_numpy(dtype=object),
+        'l': last.str[:1].to_numpy(dtype=object)
+    }
+    domains = ('@' + normalize_domains(frame['domain'])).to_numpy(dtype=object)
+    has_domain = domains != '@'
+    rows = np.arange(len(frame), dtype=np.int32)
+
+    pattern_names = list(patterns)
+    emails, row_ids, pattern_codes = [], [], []
+    for code, name in enumerate(pattern_names):
+        parts = _compile(patterns[name])
+        email = np.full(len(frame), '', dtype=object)
+        usable = has_domain.copy()
+        for is_field, text in parts:
+            if is_field:
+                email = email + fields[text]
+                usable &= fields[text] != ''
+            else:
+                email = email + text
+        email = email + domains
+        emails.append(email[usable])
+        row_ids.append(rows[usable])
+        pattern_codes.append(np.full(int(usable.sum()), code, dtype=np.int16))
+
+    row_ids = np.concatenate(row_ids) if row_ids else np.array([], dtype=np.int32)
+    pattern_codes = np.concatenate(pattern_codes) if pattern_codes else np.array([], dtype=np.int16)
+    emails = np.concatenate(emails) if emails else np.array([], dtype=object)
+
+    # Row-major order: every pattern of the first person, then the next person
+    order = np.lexsort((pattern_codes, row_ids))
+    candidates = pd.DataFrame({
+        'row': row_ids[order],
+        'pattern': pd.Categorical.from_codes(pattern_codes[order], categories=pattern_names),
+        'email': emails[order]
+    })
+    if dedupe:
+        candidates = candidates.drop_duplicates('email', keep='first')
+    return candidates.reset_index(drop=True)
+
+
+def candidate_emails(names: List[str], domain: str, patterns=None) -> List[str]:
+    """
+    Candidates for a handful of names at one domain, as a plain list
+
+    :param names: Full names
+    :param domain: Email domain
+    :param patterns: Optional pattern selection, see generate_candidates
+    :return: Unique addresses in name-then-pattern order
+    """
+    if not names:
+        return []
+    candidates = generate_candidates({'name': list(names), 'domain': [domain] * len(names)},
+                                     patterns=patterns)
+    return candidates['email'].tolist()
+
+
+def match_pattern(email: str, names: List[str], patterns=None):
+    """
+    Find the pattern that produced an address from one of the given names
+
+    :param email: Address, e.g. a verified candidate
+    :param names: Full names the candidates were generated from
+    :param patterns: Optional pattern selection, see generate_candidates
+    :return: Pattern name, or None when no name and pattern produce the address
+    """
+    email = (email or '').strip().lower()
+    domain = email.rpartition('@')[2]
+    if not names or not domain:
+        return None
+    candidates = generate_candidates({'name': list(names), 'domain': [domain] * len(names)},
+                                     patterns=patterns, dedupe=False)
+    matches = candidates.loc[candidates['email'] == email, 'pattern']
+    return str(matches.iloc[0]) if len(matches) else None
@@ -1,13 +1,21 @@
 # src/generators/email_generator.py
 import re
-import random
-import requests
-import dns.resolver
+import json
 import os
 from typing import List, Dict
 
 # Use absolute import for logger
 from src.utils.logger import setup_logger
+from src.utils.dns_cache import mx_cache
+from src.utils.dns_bulk import BulkMXResolver, mx_for_domain
+from src.generators.email_candidates import EMAIL_PATTERNS, candidate_emails, generate_candidates, match_pattern
+from src.generators.pattern_store import DomainPatternStore
+from src.generators.smtp_verifier import SMTPVerifier
+from src.generators.email_validation import email_reason, validate_emails
+from src.utils.cache import PersistentCache, data_path
+from src.utils.config import get_env_float, get_env_int
+from src.utils.metrics import metrics
+from src.utils.transport import get_transport, openai_client
 
 # Conditional OpenAI import to avoid global import
 try:
@@ -15,23 +23,96 @@ try:
 except ImportError:
     openai = None
 
+HUNTER_VERIFY_URL = os.getenv('HUNTER_API_URL', 'https://api.hunter.io/v2/email-verifier')
+
+# How learned domain patterns shape the candidates: 'prune' keeps only the
+# learned pattern, 'rank' tries it first, 'off' ignores it. Except with 'off',
+# candidates are verified one pattern at a time until a pattern is confirmed
+PATTERN_LEARNING_MODES = ('prune', 'rank', 'off')
+
+# Hunter.io statuses that confirm the address exists; accept_all servers confirm nothing
+CONFIRMED_STATUSES = {'valid'}
+
+# SMTP answers that settle an address without asking Hunter.io
+CONCLUSIVE_SMTP_STATUSES = {'valid', 'invalid', 'accept_all'}
+
+
+def is_confirmed(entry: Dict) -> bool:
+    """
+    :param entry: Lead email entry with a 'verification_status' key
+    :return: Whether the verification confirmed the address exists
+    """
+    return bool(entry) and str(entry.get('verification_status', '')).lower() in CONFIRMED_STATUSES
+
+
 class EmailGenerator:
-    def __init__(self, openai_api_key: str = None):
+    # MX lookups are shared by every instance in the process
+    mx_cache = mx_cache
+
+    # Address patterns tried for every sample name, see EMAIL_PATTERNS
+    email_patterns = list(EMAIL_PATTERNS)
+
+    # Used whenever the model is unavailable or returns unusable names
+    FALLBACK_NAMES = [
+        "John Smith",
+        "Emily Johnson",
+        "Michael Brown"
+    ]
+
+    def __init__(self,
+                 openai_api_key: str = None,
+                 verification_cache: PersistentCache = None,
+                 names_cache: PersistentCache = None,
+                 pattern_store: DomainPatternStore = None,
+                 smtp_verifier: SMTPVerifier = None):
         """
         Initialize Email Generator with OpenAI integration and logging
         
         :param openai_api_key: OpenAI API key
+        :param verification_cache: Optional cache for Hunter.io results
+        :param names_cache: Optional memo of generated sample names per company
+        :param pattern_store: Optional store of the address pattern learned per domain
+        :param smtp_verifier: Optional SMTP verifier asked before Hunter.io, created when SMTP_VERIFY is set
         """
         # Setup logging
         self.logger = setup_logger('email_generator')
         
+        # Persistent Hunter.io result cache, keyed by normalized address
+        self.verification_cache = verification_cache if verification_cache is not None else PersistentCache(
+            os.getenv('HUNTER_CACHE_PATH') or data_path('verification_cache.sqlite3'),
+            namespace='hunter_verifications',
+            ttl=get_env_float('HUNTER_CACHE_MAX_AGE_DAYS', 30) * 86400,
+            max_entries=get_env_int('HUNTER_CACHE_MAX_ENTRIES', 100000)
+        )
+        
+        # Persistent memo of generated sample names, keyed by company
+        self.names_cache = names_cache if names_cache is not None else PersistentCache(
+            os.getenv('SAMPLE_NAMES_CACHE_PATH') or data_path('sample_names.sqlite3'),
+            namespace='sample_names',
+            max_entries=get_env_int('SAMPLE_NAMES_CACHE_MAX_ENTRIES', 50000)
+        )
+        self.names_batch_size = max(1, get_env_int('SAMPLE_NAMES_BATCH_SIZE', 20))
+        
+        # Address pattern confirmed per domain by earlier verifications
+        self.pattern_store = pattern_store or DomainPatternStore()
+        self.pattern_learning = os.getenv('EMAIL_PATTERN_LEARNING', 'rank').strip().lower()
+        if self.pattern_learning not in PATTERN_LEARNING_MODES:
+            self.logger.warning(f"Unknown EMAIL_PATTERN_LEARNING '{self.pattern_learning}', using 'rank'")
+            self.pattern_learning = 'rank'
+        
+        # Concurrent MX lookups for whole domain lists, filling the shared MX cache
+        self.mx_resolver = BulkMXResolver(cache=self.mx_cache)
+        
+        # Built-in RCPT TO checks against the domain's mail server
+        self.smtp_verifier = smtp_verifier or (SMTPVerifier() if SMTPVerifier.enabled() else None)
+        
         # OpenAI API Key setup
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         
         # Check OpenAI integration
         if openai and self.openai_api_key:
             try:
-                self.client = openai.OpenAI(api_key=self.openai_api_key)
+                self.client = openai_client(self.openai_api_key)
             except Exception as e:
                 self.logger.error(f"OpenAI Client initialization failed: {e}")
                 self.client = None
@@ -54,42 +135,115 @@ class EmailGenerator:
         :param sample_names: Optional list of sample names to use
         :return: List of potential email formats
         """
-        # Standard email format patterns
-        email_formats = [
-            "{first}.{last}@{domain}",
-            "{first}{last}@{domain}",
-            "{first}_{last}@{domain}",
-            "{first[0]}{last}@{domain}",
-            "{first[0]}.{last}@{domain}",
-            "{first}@{domain}"
-        ]
-        
         # If no sample names provided, generate some
         if not sample_names:
             sample_names = self._generate_sample_names(company_name)
         
-        # Generate potential emails
-        potential_emails = []
-        for name in sample_names:
-            for format_pattern in email_formats:
-                # Split name into first and last
-                name_parts = name.split()
-                if len(name_parts) >= 2:
-                    first, last = name_parts[0], name_parts[-1]
-                    
-                    try:
-                        email = format_pattern.format(
-                            first=first.lower(), 
-                            last=last.lower(), 
-                            first0=first[0].lower(), 
-                            domain=domain
-                        )
-                        potential_emails.append(email)
-                    except Exception as e:
-                        self.logger.warning(f"Error generating email: {e}")
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(potential_emails))
+        # Standard email format patterns, applied to every name; names without
+        # a last name only produce the patterns that do not need one
+        try:
+            return candidate_emails(sample_names, domain, patterns=self.patterns_for_domain(domain))
+        except Exception as e:
+            self.logger.warning(f"Error generating email: {e}")
+            return []
+
+    def generate_email_formats_by_pattern(self,
+                                          company_name: str,
+                                          domain: str,
+                                          sample_names: List[str] = None) -> List[List[str]]:
+        """
+        Generate potential email formats grouped by pattern, most promising pattern first,
+        so verification can stop as soon as one pattern is confirmed
+        
+        :param company_name: Name of the company
+        :param domain: Company's email domain
+        :param sample_names: Optional list of sample names to use
+        :return: One list of addresses per pattern, in the order of patterns_for_domain
+        """
+        if not sample_names:
+            sample_names = self._generate_sample_names(company_name)
+        
+        try:
+            patterns = self.patterns_for_domain(domain)
+            candidates = generate_candidates({'name': list(sample_names), 'domain': [domain] * len(sample_names)},
+                                             patterns=patterns)
+        except Exception as e:
+            self.logger.warning(f"Error generating email: {e}")
+            return []
+        
+        groups = {name: [] for name in patterns}
+        for pattern, email in zip(candidates['pattern'], candidates['email']):
+            groups[pattern].append(email)
+        return [emails for emails in groups.values() if emails]
+
+    @property
+    def stops_at_confirmed_pattern(self) -> bool:
+        """
+        :return: Whether candidates of further patterns are skipped once one pattern is confirmed
+        """
+        return self.pattern_learning != 'off'
+
+    def patterns_for_domain(self, domain: str) -> List[str]:
+        """
+        Patterns to try for a domain, given what earlier verifications confirmed
+        
+        :param domain: Company's email domain
+        :return: Pattern names, only the learned one when pruning
+        """
+        if self.pattern_learning == 'off':
+            return list(self.email_patterns)
+        try:
+            if self.pattern_learning == 'prune':
+                learned = self.pattern_store.learned_pattern(domain)
+                if learned in self.email_patterns:
+                    return [learned]
+                return list(self.email_patterns)
+            return self.pattern_store.rank(domain, list(self.email_patterns))
+        except Exception as e:
+            self.logger.warning(f"Learned pattern lookup failed for {domain}: {e}")
+            return list(self.email_patterns)
+
+    def learn_email_patterns(self,
+                             company_name: str,
+                             verifications: List[Dict],
+                             sample_names: List[str] = None) -> List[str]:
+        """
+        Record the pattern of every confirmed address for its domain
+        
+        :param company_name: Name of the company
+        :param verifications: Entries with 'email' and 'verification_status' keys
+        :param sample_names: Names the candidates were generated from
+        :return: Pattern names recorded
+        """
+        confirmed = [entry['email'] for entry in verifications if is_confirmed(entry)]
+        if not confirmed or self.pattern_learning == 'off':
+            return []
+        if not sample_names:
+            # Memoized, so these are the names the candidates came from
+            sample_names = self._generate_sample_names(company_name)
+
+        learned = []
+        for email in confirmed:
+            try:
+                pattern = match_pattern(email, sample_names, patterns=self.email_patterns)
+                if pattern:
+                    self.pattern_store.record(email.rpartition('@')[2], pattern)
+                    learned.append(pattern)
+            except Exception as e:
+                self.logger.warning(f"Could not record pattern of {email}: {e}")
+        return learned
+
+    def generate_email_formats_bulk(self, people, patterns=None, dedupe: bool = True):
+        """
+        Generate email candidates for many (name, domain) pairs, e.g. an imported CRM list
+        
+        :param people: DataFrame or mapping with a 'domain' column and either 'name'
+            or 'first'/'last' columns
+        :param patterns: Optional pattern names or {name: template} mapping
+        :param dedupe: Drop repeated addresses
+        :return: DataFrame with 'row', 'pattern' and 'email' columns
+        """
+        return generate_candidates(people, patterns=patterns or self.email_patterns, dedupe=dedupe)
 
     def _generate_sample_names(self, company_name: str, num_names: int = 3) -> List[str]:
         """
@@ -99,75 +253,146 @@ class EmailGenerator:
         :param num_names: Number of names to generate
         :return: List of generated names
         """
-        # Check if OpenAI client is available
-        if not self.client:
+        return self.generate_sample_names_bulk([company_name], num_names)[company_name]
+
+    def generate_sample_names_bulk(self,
+                                   company_names: List[str],
+                                   num_names: int = 3) -> Dict[str, List[str]]:
+        """
+        Generate sample professional names for many companies at once
+        
+        Names are memoized per company, so re-runs reuse the same names. Companies
+        that are not memoized are sent to the model in structured batches.
+        
+        :param company_names: Names of the companies
+        :param num_names: Number of names to generate per company
+        :return: Mapping of company name to generated names
+        """
+        names_by_company = {}
+        pending = {}
+        for company_name in company_names:
+            if company_name in names_by_company or company_name in pending:
+                continue
+            cache_key = f"{num_names}:{' '.join(company_name.lower().split())}"
+            cached = self.names_cache.get(cache_key)
+            if cached is not None:
+                names_by_company[company_name] = cached
+            else:
+                pending[company_name] = cache_key
+
+        if pending and not self.client:
             self.logger.warning("OpenAI client not available. Using fallback names.")
-            return [
-                "John Smith",
-                "Emily Johnson",
-                "Michael Brown"
-            ]
+        elif pending:
+            items = list(pending.items())
+            for i in range(0, len(items), self.names_batch_size):
+                batch = items[i:i + self.names_batch_size]
+                for company_name, names in self._request_sample_names(batch, num_names).items():
+                    names_by_company[company_name] = names
+                    self.names_cache.set(pending[company_name], names)
+
+        # Fallback to default names if AI generation fails
+        for company_name in pending:
+            names_by_company.setdefault(company_name, list(self.FALLBACK_NAMES))
+        return names_by_company
 
+    def _request_sample_names(self, batch: List, num_names: int) -> Dict[str, List[str]]:
+        companies = [{'id': index, 'company': company_name}
+                     for index, (company_name, _) in enumerate(batch)]
         try:
             # Prompt for generating professional names
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "Generate realistic professional names for employees at a tech company."
-                    },
-                    {
-                        "role": "user", 
-                        "content": f"Generate {num_names} professional names that could work at {company_name}. "
-                                   "Include first and last names. Format as: FirstName LastName"
-                    }
-                ],
-                max_tokens=100,
-                n=1
-            )
-            
-            # Extract and process names
-            names_text = response.choices[0].message.content
-            names = [name.strip() for name in names_text.split('\n') if name.strip()]
-            
-            return names
-        
+            with metrics.time_call('openai'):
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    response_format={"type": "json_object"},
+                    temperature=0,
+                    messages=[
+                        {
+                            "role": "system", 
+                            "content": "Generate realistic professional names for employees at tech companies. "
+                                       "Answer with JSON only."
+                        },
+                        {
+                            "role": "user", 
+                            "content": f"Generate {num_names} professional names that could work at each company below. "
+                                       "Include first and last names. "
+                                       'Return {"companies": [{"id": <id>, "names": ["FirstName LastName"]}]}.\n'
+                                       + json.dumps(companies)
+                        }
+                    ],
+                    max_tokens=20 * num_names * len(batch) + 50
+                )
+            payload = json.loads(response.choices[0].message.content)
         except Exception as e:
             self.logger.error(f"Error generating sample names: {e}")
-            
-            # Fallback to default names if AI generation fails
-            return [
-                "John Smith",
-                "Emily Johnson",
-                "Michael Brown"
-            ]
+            return {}
+
+        names_by_company = {}
+        for entry in payload.get('companies', []):
+            try:
+                index = int(entry['id'])
+                raw_names = list(entry.get('names', []))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not 0 <= index < len(batch):
+                continue
+            names = [name for name in (self._clean_name(raw) for raw in raw_names) if name]
+            if names:
+                names_by_company[batch[index][0]] = names[:num_names]
+        return names_by_company
+
+    @staticmethod
+    def _clean_name(raw_name) -> str:
+        """
+        Strip list numbering and bullets, keeping only "First Last" style names
+        """
+        name = re.sub(r'^\s*(?:\d+[.)]|[-*\u2022])\s*', '', str(raw_name)).strip()
+        return name if len(name.split()) >= 2 else ''
 
     def validate_email_format(self, email: str) -> bool:
         """
-        Validate email format using regex
+        Validate email format with the rules validate_emails applies to whole columns
         
         :param email: Email address to validate
         :return: Whether email format is valid
         """
-        email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(email_regex, email) is not None
+        return email_reason(email) is None
+
+    def validate_email_formats_bulk(self, emails, allow_idn: bool = False):
+        """
+        Validate a whole column of addresses, e.g. an uploaded list, before any DNS or API step
+        
+        :param emails: Series or iterable of addresses
+        :param allow_idn: Accept internationalized domains
+        :return: DataFrame with 'email', 'local', 'domain', 'valid' and 'reason' columns
+        """
+        return validate_emails(emails, allow_idn=allow_idn)
+
+    def resolve_mx_bulk(self, domains: List[str]) -> Dict[str, List[str]]:
+        """
+        Resolve the mail hosts of many domains concurrently, e.g. to pre-screen a domain list
+        
+        :param domains: Domains to resolve
+        :return: Mapping of domain to MX hosts, usable as mx_hosts of advanced_email_verification
+        """
+        try:
+            return self.mx_resolver.resolve(domains)
+        except Exception as e:
+            self.logger.error(f"Bulk MX resolution failed: {e}")
+            return {}
 
     def validate_domain(self, email: str) -> bool:
         """
-        Validate email domain using DNS lookup
+        Validate email domain using a cached DNS lookup
         
         :param email: Email address to validate domain for
         :return: Whether domain has valid MX records
         """
+        # Extract domain from email
+        domain = email.split('@')[-1]
         try:
-            # Extract domain from email
-            domain = email.split('@')[-1]
-            
-            # Perform MX record lookup
-            dns.resolver.resolve(domain, 'MX')
-            return True
-        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            # Perform MX record lookup, served from the shared cache when possible
+            if self.mx_cache.lookup(domain):
+                return True
             self.logger.warning(f"No MX records found for domain: {domain}")
             return False
         except Exception as e:
@@ -176,11 +401,17 @@ class EmailGenerator:
 
     def verify_email_existence(self, email: str) -> Dict:
         """
-        Use Hunter.io to verify email existence
+        Use Hunter.io to verify email existence, served from the local cache
+        when the address was verified within the freshness window
         
         :param email: Email to verify
         :return: Verification results
         """
+        cache_key = email.strip().lower()
+        cached = self.verification_cache.get(cache_key)
+        if cached is not None:
+            return {"status": cached['status'], "score": cached['score']}
+
         try:
             hunter_api_key = os.getenv('HUNTER_IO_API_KEY')
             if not hunter_api_key:
@@ -192,25 +423,38 @@ class EmailGenerator:
                 'api_key': hunter_api_key
             }
             
-            response = requests.get('https://api.hunter.io/v2/email-verifier', params=params)
+            with metrics.time_call('hunter') as call:
+                response = get_transport().get(HUNTER_VERIFY_URL, params=params, endpoint='hunter')
+                call.error = not response.ok
             result = response.json()
             
-            return {
+            verification = {
                 "status": result.get('data', {}).get('status', 'unknown'),
                 "score": result.get('data', {}).get('score', 0)
             }
+
+            # Only cache answers Hunter actually returned, not quota or auth errors
+            if response.ok and result.get('data'):
+                self.verification_cache.set(cache_key, verification)
+
+            return verification
         
         except Exception as e:
             self.logger.error(f"Email verification error: {e}")
             return {"status": "error"}
 
-    def advanced_email_verification(self, email: str) -> Dict:
+    def advanced_email_verification(self, email: str, mx_hosts: Dict[str, List[str]] = None) -> Dict:
         """
         Comprehensive email verification process
         
         :param email: Email address to verify
+        :param mx_hosts: Optional MX hosts per domain from resolve_mx_bulk; domains it
+            does not cover are looked up as usual
         :return: Verification results dictionary
         """
+        if self.smtp_verifier is not None:
+            return self.advanced_email_verification_bulk([email], mx_hosts)[email]
+
         # 1. Regex format check
         if not self.validate_email_format(email):
             return {
@@ -220,7 +464,8 @@ class EmailGenerator:
             }
     
         # 2. Domain validation
-        if not self.validate_domain(email):
+        known_hosts = mx_for_domain(mx_hosts, email.split('@')[-1])
+        if not (known_hosts if known_hosts is not None else self.validate_domain(email)):
             return {
                 'status': 'Invalid', 
                 'reason': 'Domain Error',
@@ -247,4 +492,72 @@ class EmailGenerator:
                 'status': 'Error',
                 'reason': 'Verification process failed',
                 'details': str(e)
-            }
\ No newline at end of file
+            }
+
+    def advanced_email_verification_bulk(self,
+                                         emails: List[str],
+                                         mx_hosts: Dict[str, List[str]] = None) -> Dict[str, Dict]:
+        """
+        Verify many addresses, checking them with the mail servers first
+        
+        Addresses are format-checked and their domains' MX hosts looked up once.
+        With an SMTP verifier, all addresses sharing an MX host are checked over
+        shared sessions; only addresses the servers leave undecided go to Hunter.io.
+        
+        :param emails: Email addresses to verify
+        :param mx_hosts: Optional MX hosts per domain from resolve_mx_bulk
+        :return: Verification results dictionary per address
+        """
+        verifications = {}
+        mx_hosts = {domain.lower(): hosts for domain, hosts in (mx_hosts or {}).items()}
+        candidates = []
+        for email in dict.fromkeys(emails):
+            if not self.validate_email_format(email):
+                verifications[email] = {
+                    'status': 'Invalid',
+                    'reason': 'Format Error',
+                    'details': 'Email does not match standard format'
+                }
+                continue
+            domain = email.split('@')[-1].lower()
+            if domain not in mx_hosts:
+                try:
+                    mx_hosts[domain] = self.mx_cache.lookup(domain, a_fallback=self.mx_resolver.a_fallback)
+                except Exception as e:
+                    self.logger.error(f"Domain validation error: {e}")
+                    mx_hosts[domain] = []
+            if not mx_hosts[domain]:
+                verifications[email] = {
+                    'status': 'Invalid',
+                    'reason': 'Domain Error',
+                    'details': 'Domain does not have valid MX records'
+                }
+                continue
+            candidates.append(email)
+
+        smtp_results = {}
+        if self.smtp_verifier is not None and candidates:
+            try:
+                smtp_results = self.smtp_verifier.verify_many(candidates, mx_hosts)
+            except Exception as e:
+                self.logger.error(f"SMTP verification failed: {e}")
+
+        for email in candidates:
+            smtp_result = smtp_results.get(email)
+            if smtp_result and smtp_result['status'] in CONCLUSIVE_SMTP_STATUSES:
+                verifications[email] = {
+                    'status': smtp_result['status'],
+                    'source': 'smtp',
+                    'smtp_code': smtp_result['smtp_code'],
+                    'format_valid': True,
+                    'domain_valid': True
+                }
+                continue
+            api_result = self.verify_email_existence(email)
+            verifications[email] = {
+                'status': api_result.get('status', 'Unknown'),
+                'score': api_result.get('score', 0),
+                'format_valid': True,
+                'domain_valid': True
+            }
+        return verifications
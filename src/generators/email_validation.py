@@ -0,0 +1,201 @@
+# src/generators/email_validation.py
+import re
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Conditional imports: Arrow-backed strings run the regular expressions in
+# native code, the idna package implements IDNA 2008 instead of the
+# standard library's IDNA 2003 codec
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+except ImportError:
+    pyarrow = None
+    pc = None
+
+try:
+    import idna
+except ImportError:
+    idna = None
+
+# Shared by validate_emails and email_reason, so single and bulk checks agree
+LOCAL_PATTERN = r'[A-Za-z0-9._%+-]+'
+DOMAIN_PATTERN = r'(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+(?:[A-Za-z]{2,63}|xn--[A-Za-z0-9-]{1,59})'
+LOCAL_REGEX = re.compile(LOCAL_PATTERN)
+DOMAIN_REGEX = re.compile(DOMAIN_PATTERN)
+
+MAX_LOCAL_LENGTH = 64
+MAX_DOMAIN_LENGTH = 253
+
+# Failure reasons, in the order they are checked
+REASONS = [
+    'empty',
+    'missing_at',
+    'multiple_at',
+    'empty_local',
+    'local_too_long',
+    'invalid_local_chars',
+    'invalid_local_dots',
+    'empty_domain',
+    'non_ascii_domain',
+    'invalid_idn',
+    'domain_too_long',
+    'invalid_domain'
+]
+
+
+def _string_series(values) -> pd.Series:
+    dtype = pd.StringDtype('pyarrow') if pyarrow is not None else pd.StringDtype()
+    if not isinstance(values, pd.Series):
+        values = pd.Series(list(values), dtype=object)
+    # No copy when the column already holds Arrow strings
+    return values.astype(dtype)
+
+
+def _split_addresses(series: pd.Series):
+    """
+    Split addresses at the first '@'
+
+    :return: Tuple of ('@' count per row, local part Series, domain Series)
+    """
+    if pc is not None and series.dtype == pd.StringDtype('pyarrow'):
+        # Arrow kernels split millions of rows without touching Python objects
+        values = pyarrow.array(series.array)
+        at_count = pc.count_substring(values, '@')
+        # Rows without '@' get one appended, so every split has two parts
+        padded = pc.if_else(pc.greater(at_count, 0), values, pc.binary_join_element_wise(
+            values, pyarrow.scalar('', type=values.type), pyarrow.scalar('@', type=values.type)))
+        parts = pc.split_pattern(padded, '@', max_splits=1)
+        domain = pc.if_else(pc.greater(at_count, 0), pc.list_element(parts, 1),
+                            pyarrow.scalar(None, type=values.type))
+        local = pd.Series(pd.arrays.ArrowStringArray(pc.list_element(parts, 0)), index=series.index)
+        domain = pd.Series(pd.arrays.ArrowStringArray(domain), index=series.index)
+        return at_count.to_numpy(zero_copy_only=False), local, domain
+
+    at_count = series.str.count('@')
+    parts = series.str.extract(r'^([^@]*)(?:@(.*))?$')
+    return at_count, parts[0].astype(series.dtype), parts[1].astype(series.dtype)
+
+
+def _to_ascii(domain: str):
+    """
+    :return: Punycode form of an internationalized domain, None when it is not valid IDNA
+    """
+    try:
+        if idna is not None:
+            return idna.encode(domain, uts46=True).decode('ascii')
+        return domain.encode('idna').decode('ascii')
+    except (UnicodeError, ValueError):
+        return None
+
+
+def email_reason(email: Optional[str], allow_idn: bool = False) -> Optional[str]:
+    """
+    Check one address with the rules of validate_emails, without building a DataFrame
+
+    :param email: Address
+    :param allow_idn: Accept non-ASCII domains that are valid IDNA
+    :return: First failure reason from REASONS, None when the address is valid
+    """
+    email = (email or '').strip()
+    if not email:
+        return 'empty'
+    at_count = email.count('@')
+    if at_count == 0:
+        return 'missing_at'
+    if at_count > 1:
+        return 'multiple_at'
+    local, _, domain = email.partition('@')
+    if not local:
+        return 'empty_local'
+    if len(local) > MAX_LOCAL_LENGTH:
+        return 'local_too_long'
+    if not LOCAL_REGEX.fullmatch(local):
+        return 'invalid_local_chars'
+    if local.startswith('.') or local.endswith('.') or '..' in local:
+        return 'invalid_local_dots'
+    domain = domain.lower().rstrip('.')
+    if not domain:
+        return 'empty_domain'
+    if not domain.isascii():
+        if not allow_idn:
+            return 'non_ascii_domain'
+        domain = _to_ascii(domain)
+        if domain is None:
+            return 'invalid_idn'
+    if len(domain) > MAX_DOMAIN_LENGTH:
+        return 'domain_too_long'
+    if not DOMAIN_REGEX.fullmatch(domain):
+        return 'invalid_domain'
+    return None
+
+
+def validate_emails(emails: Union[pd.Series, Iterable[str]], allow_idn: bool = False) -> pd.DataFrame:
+    """
+    Validate the format of a whole column of addresses at once
+
+    Addresses are stripped and split into local part and domain. The local
+    part must use the characters accepted by validate_email_format, the
+    domain must consist of valid DNS labels and an alphabetic TLD. With
+    allow_idn, internationalized domains are accepted and returned in their
+    ASCII (punycode) form.
+
+    :param emails: Series or iterable of addresses
+    :param allow_idn: Accept non-ASCII domains that are valid IDNA
+    :return: DataFrame aligned with the input, with columns 'email', 'local',
+        'domain', 'valid' (boolean mask) and 'reason' (categorical, missing for valid rows)
+    """
+    series = _string_series(emails).str.strip()
+
+    empty = (series.isna() | (series == '')).to_numpy(dtype=bool, na_value=True)
+    at_count, local, domain = _split_addresses(series)
+    at_count = pd.Series(at_count).fillna(0).to_numpy(dtype=np.int64)
+    domain = domain.str.lower()
+
+    local_length = local.str.len().fillna(0).to_numpy(dtype=np.int64)
+    local_chars = local.str.fullmatch(LOCAL_PATTERN).to_numpy(dtype=bool, na_value=False)
+    local_dots = (local.str.startswith('.') | local.str.endswith('.')
+                  | local.str.contains('..', regex=False)).to_numpy(dtype=bool, na_value=False)
+
+    domain = domain.str.rstrip('.')
+    non_ascii = (~domain.str.isascii()).to_numpy(dtype=bool, na_value=False)
+    invalid_idn = np.zeros(len(series), dtype=bool)
+    if allow_idn and non_ascii.any():
+        # Few distinct domains in practice, so each is converted once
+        unique_domains = pd.unique(domain[non_ascii].to_numpy(dtype=object))
+        converted = {value: _to_ascii(value) for value in unique_domains}
+        mapped = domain[non_ascii].map(converted)
+        invalid_idn[non_ascii] = mapped.isna().to_numpy()
+        domain = domain.copy()
+        domain[non_ascii] = mapped.fillna(domain[non_ascii])
+        non_ascii = np.zeros(len(series), dtype=bool)
+
+    domain_length = domain.str.len().fillna(0).to_numpy(dtype=np.int64)
+    domain_valid = domain.str.fullmatch(DOMAIN_PATTERN).to_numpy(dtype=bool, na_value=False)
+
+    conditions = [
+        empty,
+        at_count == 0,
+        at_count > 1,
+        local_length == 0,
+        local_length > MAX_LOCAL_LENGTH,
+        ~local_chars,
+        local_dots,
+        domain_length == 0,
+        non_ascii,
+        invalid_idn,
+        domain_length > MAX_DOMAIN_LENGTH,
+        ~domain_valid
+    ]
+    # np.select picks the first matching condition, i.e. the earliest failure
+    codes = np.select(conditions, np.arange(len(REASONS)), default=-1)
+    result = pd.DataFrame({
+        'email': series,
+        'local': local,
+        'domain': domain,
+        'valid': codes == -1,
+        'reason': pd.Categorical.from_codes(codes, categories=REASONS)
+    }, index=series.index)
+    return result
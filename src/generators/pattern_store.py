@@ -0,0 +1,91 @@
+# src/generators/pattern_store.py
+import os
+import threading
+from typing import Dict, List, Optional
+
+from src.generators.email_candidates import EMAIL_PATTERNS
+from src.utils.cache import PersistentCache, data_path
+from src.utils.config import get_env_float, get_env_int
+from src.utils.domain_index import normalize_domain
+
+
+class DomainPatternStore:
+    """
+    Cross-run record of the address pattern each email domain uses.
+
+    Every verified address confirms the pattern it was generated with, e.g.
+    'first.last' for jane.doe@example.com. Once a domain has enough
+    confirmations of one pattern and none of any other, candidates for it
+    can be limited to the learned pattern instead of trying every pattern
+    for every name.
+    """
+
+    def __init__(self, path: str = None, min_confirmations: int = None, max_age_days: float = None):
+        """
+        :param path: SQLite database file, defaults to EMAIL_PATTERN_STORE_PATH or data/email_patterns.sqlite3
+        :param min_confirmations: Confirmations needed before a pattern counts as learned, defaults to
+            EMAIL_PATTERN_MIN_CONFIRMATIONS or 3
+        :param max_age_days: Forget domains without a confirmation for this many days
+        """
+        max_age_days = (max_age_days if max_age_days is not None
+                        else get_env_float('EMAIL_PATTERN_MAX_AGE_DAYS', 180))
+        self.min_confirmations = max(1, min_confirmations if min_confirmations is not None
+                                     else get_env_int('EMAIL_PATTERN_MIN_CONFIRMATIONS', 3))
+        self.store = PersistentCache(
+            path or os.getenv('EMAIL_PATTERN_STORE_PATH') or data_path('email_patterns.sqlite3'),
+            namespace='email_patterns',
+            ttl=max_age_days * 86400 if max_age_days else None,
+            max_entries=get_env_int('EMAIL_PATTERN_STORE_MAX_ENTRIES', 100000)
+        )
+        # Serialises the read-modify-write of confirmation counts
+        self._lock = threading.Lock()
+
+    def confirmations(self, domain: str) -> Dict[str, int]:
+        """
+        :param domain: Email domain
+        :return: Number of verified addresses per pattern name
+        """
+        domain = normalize_domain(domain)
+        if not domain:
+            return {}
+        return dict(self.store.get(domain) or {})
+
+    def record(self, domain: str, pattern: str):
+        """
+        Count one verified address for a domain
+
+        :param domain: Email domain
+        :param pattern: Pattern name the address was generated with
+        """
+        domain = normalize_domain(domain)
+        if not domain or not pattern:
+            return
+        with self._lock:
+            counts = self.store.get(domain) or {}
+            counts[pattern] = counts.get(pattern, 0) + 1
+            self.store.set(domain, counts)
+
+    def rank(self, domain: str, patterns: List[str]) -> List[str]:
+        """
+        Order patterns by confirmations, keeping the given order for ties
+
+        :param domain: Email domain
+        :param patterns: Pattern names
+        :return: Reordered pattern names
+        """
+        counts = self.confirmations(domain)
+        order = {name: index for index, name in enumerate(patterns)}
+        return sorted(patterns, key=lambda name: (-counts.get(name, 0), order[name]))
+
+    def learned_pattern(self, domain: str) -> Optional[str]:
+        """
+        :param domain: Email domain
+        :return: The domain's only confirmed pattern, or None when it has too few
+            confirmations or another pattern was confirmed as well
+        """
+        confirmed = {name: count for name, count in self.confirmations(domain).items() if count > 0}
+        # A second confirmed pattern means mixed conventions or a server accepting anything
+        if len(confirmed) != 1:
+            return None
+        name, count = confirmed.popitem()
+        return name if name in EMAIL_PATTERNS and count >= self.min_confirmations else None
@@ -0,0 +1,377 @@
+# src/generators/smtp_verifier.py
+import asyncio
+import collections
+import os
+import socket
+import threading
+import uuid
+from typing import Dict, Iterable, List
+
+from src.utils.config import get_env_bool, get_env_float, get_env_int
+from src.utils.logger import setup_logger
+from src.utils.metrics import metrics
+
+# Reply codes that end a session early
+SERVICE_UNAVAILABLE = 421
+
+# Key of the limit on sessions across all hosts
+ALL_HOSTS = '*'
+
+
+class ConnectionSlots:
+    """
+    Process-wide count of open SMTP sessions per host.
+
+    Every verify_many call runs its own event loop, typically one per
+    pipeline thread, so asyncio.Semaphore cannot enforce a limit across
+    them. Slots are counted under a thread lock instead, and a released
+    slot is handed straight to the longest waiting coroutine, whichever
+    loop it runs on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = {}
+        self._waiters: Dict[str, collections.deque] = {}
+
+    async def acquire(self, host: str, limit: int):
+        """
+        Wait for a free session slot
+
+        :param host: Host name, or ALL_HOSTS
+        :param limit: Sessions allowed at once for the host
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            waiters = self._waiters.setdefault(host, collections.deque())
+            if self._active.get(host, 0) < limit and not waiters:
+                self._active[host] = self._active.get(host, 0) + 1
+                return
+            future = loop.create_future()
+            waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters[host].remove((loop, future))
+                    granted = False
+                except ValueError:
+                    granted = True
+            if granted:
+                # The slot was handed over just as the wait was cancelled
+                self.release(host)
+            raise
+
+    def release(self, host: str):
+        """
+        Free a slot taken with acquire
+
+        :param host: Host name, or ALL_HOSTS
+        """
+        with self._lock:
+            waiters = self._waiters.get(host)
+            while waiters:
+                loop, future = waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(_grant, future)
+                    return
+                except RuntimeError:
+                    # The waiter's loop is gone
+                    continue
+            self._active[host] -= 1
+
+    def active(self, host: str) -> int:
+        """
+        :return: Sessions currently open with the host
+        """
+        with self._lock:
+            return self._active.get(host, 0)
+
+
+def _grant(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SMTPSession:
+    """
+    Minimal SMTP client speaking just enough of the protocol to ask about recipients
+    """
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, helo_host: str):
+        """
+        Open the connection and greet the server
+
+        :param helo_host: Name sent with EHLO/HELO
+        :return: (code, text) of the greeting, or of the failed EHLO/HELO
+        """
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        code, text = await self.reply()
+        if code != 220:
+            return code, text
+        code, text = await self.command(f'EHLO {helo_host}')
+        if code != 250:
+            code, text = await self.command(f'HELO {helo_host}')
+        return code, text
+
+    async def reply(self):
+        """
+        Read one (possibly multi-line) reply
+
+        :return: Tuple of (code, text)
+        """
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionError(f"{self.host} closed the connection")
+            line = line.decode('utf-8', errors='replace').rstrip('\r\n')
+            lines.append(line[4:])
+            # The last line of a reply has a space after the code, the others a dash
+            if line[3:4] != '-':
+                try:
+                    return int(line[:3]), '\n'.join(lines)
+                except ValueError:
+                    raise ConnectionError(f"Malformed SMTP reply from {self.host}: {line!r}")
+
+    async def command(self, line: str):
+        self.writer.write(line.encode('utf-8') + b'\r\n')
+        await asyncio.wait_for(self.writer.drain(), self.timeout)
+        return await self.reply()
+
+    async def close(self):
+        if self.writer is None:
+            return
+        try:
+            await asyncio.wait_for(self.command('QUIT'), self.timeout)
+        except Exception:
+            pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+class SMTPVerifier:
+    """
+    Checks whether mailboxes exist by asking the domain's mail server.
+
+    Addresses are grouped by their primary MX host and checked with RCPT TO
+    over as few sessions as possible, with a bounded number of connections
+    per host that holds across every verifier and thread of the process.
+    Each domain is probed with a random address first, so catch-all servers
+    are reported as 'accept_all' instead of 'valid'. Temporary failures, such
+    as greylisting, are reported as 'unknown' unless retries are configured.
+    Nothing is ever sent: every session ends before DATA.
+    """
+
+    def __init__(self,
+                 helo_host: str = None,
+                 mail_from: str = None,
+                 port: int = None,
+                 host_override: str = None,
+                 timeout: float = None,
+                 max_connections: int = None,
+                 max_connections_per_host: int = None,
+                 recipients_per_session: int = None,
+                 greylist_retries: int = None,
+                 greylist_delay: float = None):
+        """
+        :param helo_host: Name sent with EHLO, defaults to SMTP_HELO_HOST or the local FQDN
+        :param mail_from: Envelope sender, defaults to SMTP_MAIL_FROM or verify@<helo_host>
+        :param port: SMTP port, defaults to SMTP_PORT or 25
+        :param host_override: Connect to this host instead of the MX hosts (SMTP_HOST), e.g. a local stand-in
+        :param timeout: Seconds allowed for connecting and for every reply
+        :param max_connections: Open sessions across all hosts
+        :param max_connections_per_host: Open sessions per MX host
+        :param recipients_per_session: RCPT TO commands per session before reconnecting
+        :param greylist_retries: Retries of temporarily rejected addresses, defaults to
+            SMTP_GREYLIST_RETRIES or 0; each retry blocks the calling thread for greylist_delay
+        :param greylist_delay: Seconds to wait before such a retry, defaults to SMTP_GREYLIST_DELAY or 60
+        """
+        self.logger = setup_logger('smtp_verifier')
+        self.helo_host = helo_host or os.getenv('SMTP_HELO_HOST') or socket.getfqdn()
+        self.mail_from = mail_from or os.getenv('SMTP_MAIL_FROM') or f'verify@{self.helo_host}'
+        self.port = port or get_env_int('SMTP_PORT', 25)
+        self.host_override = host_override or os.getenv('SMTP_HOST') or None
+        self.timeout = timeout or get_env_float('SMTP_TIMEOUT', 10.0)
+        self.max_connections = max(1, max_connections or get_env_int('SMTP_MAX_CONNECTIONS', 20))
+        self.max_connections_per_host = max(1, max_connections_per_host
+                                            or get_env_int('SMTP_MAX_CONNECTIONS_PER_HOST', 2))
+        self.recipients_per_session = max(1, recipients_per_session
+                                          or get_env_int('SMTP_RECIPIENTS_PER_SESSION', 50))
+        self.greylist_retries = (greylist_retries if greylist_retries is not None
+                                 else get_env_int('SMTP_GREYLIST_RETRIES', 0))
+        self.greylist_delay = (greylist_delay if greylist_delay is not None
+                               else get_env_float('SMTP_GREYLIST_DELAY', 60.0))
+
+    @staticmethod
+    def enabled() -> bool:
+        """
+        :return: Whether SMTP verification is switched on (SMTP_VERIFY)
+        """
+        return get_env_bool('SMTP_VERIFY', False)
+
+    def verify_many(self, emails: Iterable[str], mx_hosts: Dict[str, List[str]]) -> Dict[str, Dict]:
+        """
+        Verify addresses from synchronous code
+
+        :param emails: Addresses to check
+        :param mx_hosts: MX hosts per domain, ordered by preference
+        :return: Result per address, see verify_many_async
+        """
+        emails = list(emails)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.verify_many_async(emails, mx_hosts))
+
+        # Called from inside an event loop; run on a private loop instead of blocking it
+        results = {}
+
+        def run():
+            results.update(asyncio.run(self.verify_many_async(emails, mx_hosts)))
+
+        worker = threading.Thread(target=run, name='smtp-verify')
+        worker.start()
+        worker.join()
+        return results
+
+    async def verify_many_async(self, emails: Iterable[str], mx_hosts: Dict[str, List[str]]) -> Dict[str, Dict]:
+        """
+        Verify addresses, sharing sessions between addresses with the same MX host
+
+        :param emails: Addresses to check
+        :param mx_hosts: MX hosts per domain, ordered by preference
+        :return: Mapping of address to {'status', 'smtp_code', 'details'}, where status
+            is 'valid', 'invalid', 'accept_all' or 'unknown'
+        """
+        results = {}
+        groups: Dict[tuple, List[str]] = {}
+        for email in dict.fromkeys(emails):
+            domain = email.rpartition('@')[2].lower()
+            hosts = [self.host_override] if self.host_override else list(mx_hosts.get(domain) or [])
+            if not hosts:
+                results[email] = self._result('unknown', None, 'No MX host')
+                continue
+            groups.setdefault(tuple(hosts), []).append(email)
+
+        tasks = []
+        for hosts, group in groups.items():
+            for start in range(0, len(group), self.recipients_per_session):
+                tasks.append(self._verify_batch(list(hosts), group[start:start + self.recipients_per_session]))
+        for batch_results in await asyncio.gather(*tasks):
+            results.update(batch_results)
+        return results
+
+    async def _verify_batch(self, hosts: List[str], emails: List[str]) -> Dict[str, Dict]:
+        results = {}
+        pending = emails
+        for attempt in range(self.greylist_retries + 1):
+            if attempt:
+                self.logger.info(f"Retrying {len(pending)} temporarily rejected addresses "
+                                 f"on {hosts[0]} in {self.greylist_delay}s")
+                await asyncio.sleep(self.greylist_delay)
+            await connection_slots.acquire(ALL_HOSTS, self.max_connections)
+            try:
+                await connection_slots.acquire(hosts[0], self.max_connections_per_host)
+                try:
+                    results.update(await self._session(hosts, pending))
+                finally:
+                    connection_slots.release(hosts[0])
+            finally:
+                connection_slots.release(ALL_HOSTS)
+            pending = [email for email in pending if results[email].get('temporary')]
+            if not pending:
+                break
+        for result in results.values():
+            result.pop('temporary', None)
+        return results
+
+    async def _session(self, hosts: List[str], emails: List[str]) -> Dict[str, Dict]:
+        """
+        Check a batch of addresses over one session, trying the MX hosts in order
+        """
+        last_error = 'No MX host'
+        for host in hosts:
+            session = SMTPSession(host, self.port, self.timeout)
+            with metrics.time_call('smtp') as call:
+                try:
+                    code, text = await session.connect(self.helo_host)
+                    if code != 250:
+                        # 4xx greetings are how many greylisting servers answer
+                        call.error = code >= 500
+                        return {email: self._result('unknown', code, text, temporary=400 <= code < 500)
+                                for email in emails}
+                    return await self._check_recipients(session, emails)
+                except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+                    call.error = True
+                    last_error = f"{host}: {e or type(e).__name__}"
+                    self.logger.warning(f"SMTP session with {host} failed: {last_error}")
+                finally:
+                    await session.close()
+        return {email: self._result('unknown', None, last_error) for email in emails}
+
+    async def _check_recipients(self, session: SMTPSession, emails: List[str]) -> Dict[str, Dict]:
+        results = {}
+        code, text = await session.command(f'MAIL FROM:<{self.mail_from}>')
+        if code != 250:
+            return {email: self._result('unknown', code, text, temporary=400 <= code < 500) for email in emails}
+
+        catch_all = {}
+        for email in emails:
+            domain = email.rpartition('@')[2].lower()
+            try:
+                if domain not in catch_all:
+                    # A server accepting a random mailbox accepts everything
+                    probe_code, _ = await session.command(f'RCPT TO:<{uuid.uuid4().hex[:16]}@{domain}>')
+                    catch_all[domain] = probe_code in (250, 251)
+                code, text = await session.command(f'RCPT TO:<{email}>')
+            except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+                # The session is unusable; this and the remaining addresses are retried later
+                for remaining in emails[len(results):]:
+                    results[remaining] = self._result('unknown', None, f"{e or type(e).__name__}",
+                                                      temporary=True)
+                return results
+            results[email] = self._classify(code, text, catch_all[domain])
+            if code == SERVICE_UNAVAILABLE:
+                # The server is closing the session; the rest are retried later
+                for remaining in emails[len(results):]:
+                    results[remaining] = self._result('unknown', code, text, temporary=True)
+                return results
+        try:
+            await session.command('RSET')
+        except (OSError, asyncio.TimeoutError, ConnectionError):
+            pass
+        return results
+
+    def _classify(self, code: int, text: str, catch_all: bool) -> Dict:
+        if code in (250, 251):
+            return self._result('accept_all' if catch_all else 'valid', code, text)
+        if 400 <= code < 500:
+            return self._result('unknown', code, text, temporary=True)
+        if code in (550, 551, 553):
+            return self._result('invalid', code, text)
+        # Policy rejections (e.g. 554) say nothing about the mailbox
+        return self._result('unknown', code, text)
+
+    @staticmethod
+    def _result(status: str, code, details: str, temporary: bool = False) -> Dict:
+        result = {'status': status, 'smtp_code': code, 'details': details}
+        if temporary:
+            result['temporary'] = True
+        return result
+
+
+# Shared by every SMTPVerifier in the process
+connection_slots = ConnectionSlots()
@@ -0,0 +1,608 @@
+# src/pipeline.py
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+
+from dotenv import load_dotenv
+from src.scrapers.google_search_scraper import GoogleSearchScraper, SearchIncompleteError
+from src.scrapers.linkedin_scraper import LinkedInProfileScraper
+from src.generators.email_generator import EmailGenerator, is_confirmed
+from src.generators.description_enricher import DescriptionEnricher, company_key
+from src.exporters.google_sheets_exporter import LeadExporter
+from src.utils.logger import setup_logger
+from src.utils.config import get_env_bool, get_env_float, get_env_int
+from src.utils.job_store import CompanyCheckpoint, JobStore
+from src.utils.domain_index import DomainIndex, normalize_domain
+from src.utils.metrics import metrics
+from src.utils.cache import data_path
+
+# Pipeline messages keep going to main_script.log
+logger = setup_logger('main_script', level=logging.DEBUG)
+
+# Load environment variables
+load_dotenv()
+
+def _iter_chunks(iterable, size):
+    """
+    Group an iterable into lists of at most size items, without reading ahead
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _extract_domain(link):
+    """
+    Extract the host part of a search result link
+    """
+    try:
+        return link.split('//')[1].split('/')[0]
+    except IndexError:
+        return ""
+
+class LeadPipeline:
+    """
+    Turns search results into leads: description enrichment, sample names,
+    email verification and LinkedIn lookup.
+
+    Every company travels with a CompanyCheckpoint; stages already recorded
+    by an earlier attempt of the same job are skipped, and every stage that
+    finishes is recorded straight away.
+    """
+
+    def __init__(self,
+                 business_location,
+                 export_timestamp,
+                 linkedin_scraper,
+                 email_generator,
+                 enricher,
+                 concurrent=True,
+                 max_workers=8,
+                 enrichment_concurrency=4,
+                 verification_concurrency=8,
+                 linkedin_concurrency=3,
+                 on_lead=None,
+                 domain_index=None,
+                 known_domain_policy='process',
+                 refresh_after_days=None):
+        """
+        :param business_location: Location used for the LinkedIn lookup
+        :param export_timestamp: Timestamp stamped on the lead entries
+        :param linkedin_scraper: LinkedInProfileScraper instance
+        :param email_generator: EmailGenerator instance
+        :param enricher: DescriptionEnricher instance
+        :param concurrent: Process companies in parallel
+        :param max_workers: Number of companies processed at once
+        :param enrichment_concurrency: Maximum parallel enrichment batches
+        :param verification_concurrency: Maximum parallel email verifications
+        :param linkedin_concurrency: Maximum parallel LinkedIn lookups
+        :param on_lead: Optional callback receiving (lead, checkpoint) in result order
+        :param domain_index: Optional DomainIndex consulted before any expensive work
+        :param known_domain_policy: 'reuse' the stored lead, 'skip' the company, or 'process' it again (default)
+        :param refresh_after_days: Indexed leads older than this are processed again
+        """
+        if known_domain_policy not in ('reuse', 'skip', 'process'):
+            raise ValueError(f"Unknown known_domain_policy: {known_domain_policy}")
+        self.business_location = business_location
+        self.export_timestamp = export_timestamp
+        self.linkedin_scraper = linkedin_scraper
+        self.email_generator = email_generator
+        self.enricher = enricher
+        self.concurrent = concurrent
+        self.max_workers = max(1, max_workers)
+        self.enrichment_concurrency = max(1, enrichment_concurrency)
+        self.verification_concurrency = max(1, verification_concurrency)
+        self.linkedin_limit = threading.BoundedSemaphore(max(1, linkedin_concurrency))
+        self.on_lead = on_lead
+        self.domain_index = domain_index
+        self.known_domain_policy = known_domain_policy
+        self.refresh_after_days = refresh_after_days
+
+    def run(self, items):
+        """
+        Process (search result, checkpoint) pairs
+
+        :param items: Iterable of (result, CompanyCheckpoint) pairs, consumed lazily
+        :return: Lead entries in result order
+        """
+        if self.domain_index is not None and self.known_domain_policy != 'process':
+            items = self._apply_domain_index(items)
+        if self.concurrent:
+            return self._run_concurrent(items)
+        return self._run_sequential(items)
+
+    def _apply_domain_index(self, items):
+        """
+        Reuse or skip companies whose domain was processed by an earlier run
+        """
+        for result, checkpoint in items:
+            if not checkpoint.has('lead'):
+                entry = self.domain_index.lookup(_extract_domain(result.get('link', '')),
+                                                 result.get('title', ''),
+                                                 max_age_days=self.refresh_after_days)
+                if entry is not None:
+                    if self.known_domain_policy == 'skip':
+                        logger.info(f"Skipping already processed company: {result.get('title', '')}")
+                        continue
+                    logger.info(f"Reusing stored lead for company: {result.get('title', '')}")
+                    lead_entry = dict(entry[0], timestamp=self.export_timestamp)
+                    checkpoint.save('lead', lead_entry)
+            yield result, checkpoint
+
+    def prepare_chunk(self, chunk):
+        """
+        Enrich descriptions and generate sample names for one chunk of companies
+
+        Companies whose checkpoint already holds both outputs are left out.
+
+        :param chunk: List of (result, checkpoint) pairs
+        :return: Tuple of (descriptions by company key, sample names by company name)
+        """
+        results = [
+            result for result, checkpoint in chunk
+            if not checkpoint.has('lead')
+            and not (checkpoint.has('description') and checkpoint.has('sample_names'))
+        ]
+        if not results:
+            return {}, {}
+        # Resolve the chunk's domains together; per-address checks then hit the MX cache
+        with metrics.time_stage('dns'):
+            self.email_generator.resolve_mx_bulk(
+                [normalize_domain(_extract_domain(result.get('link', ''))) for result in results]
+            )
+        try:
+            with metrics.time_stage('description'):
+                descriptions = self.enricher.enrich_many(results)
+        except Exception as description_error:
+            logger.warning(f"Description enrichment failed: {description_error}")
+            descriptions = {company_key(result): result.get('snippet', '') for result in results}
+        try:
+            with metrics.time_stage('sample_names'):
+                sample_names = self.email_generator.generate_sample_names_bulk(
+                    [result.get('title', '') for result in results]
+                )
+        except Exception as names_error:
+            logger.warning(f"Sample name generation failed: {names_error}")
+            sample_names = {}
+        return descriptions, sample_names
+
+    @staticmethod
+    def _email_entry(email, verification):
+        """
+        Shape the lead entry of one verified email
+        """
+        validated_email_entry = {
+            'email': email,
+            'valid_format': verification.get('format_valid', False),
+            'domain_valid': verification.get('domain_valid', False),
+            'verification_status': verification.get('status', 'Unknown'),
+            'verification_score': verification.get('score', 'N/A')
+        }
+        # High-volume event, sampled by the logger (LOG_SAMPLE_RATES)
+        logger.info("Email %s verification: %s", email, validated_email_entry,
+                    extra={'event': 'email_verification'})
+        return validated_email_entry
+
+    def _verify_email(self, email):
+        """
+        Run advanced verification for a single email and shape the lead entry
+        """
+        try:
+            return self._email_entry(email, self.email_generator.advanced_email_verification(email))
+        except Exception as email_verify_error:
+            logger.warning(f"Email verification failed for {email}: {email_verify_error}")
+            return None
+
+    def _verify_emails_bulk(self, emails):
+        """
+        Verify all candidates of a company together, so SMTP sessions are shared
+        """
+        try:
+            verifications = self.email_generator.advanced_email_verification_bulk(emails)
+        except Exception as email_verify_error:
+            logger.warning(f"Email verification failed for {len(emails)} candidates: {email_verify_error}")
+            return []
+        return [self._email_entry(email, verifications[email]) for email in emails if email in verifications]
+
+    def process_company(self, result, checkpoint, descriptions=None, sample_names=None,
+                        verification_executor=None):
+        """
+        Run the per-company stages for one search result
+
+        :param result: Processed search result from GoogleSearchScraper
+        :param checkpoint: CompanyCheckpoint of the company
+        :param descriptions: Descriptions from the enrichment stage, by company key
+        :param sample_names: Sample names from the names stage, by company name
+        :param verification_executor: Optional executor used to verify emails in parallel
+        :return: Lead entry dictionary
+        """
+        if checkpoint.has('lead'):
+            return checkpoint.get('lead')
+
+        company_name = result.get('title', '')
+        # Extract the domain from the URL
+        company_domain = _extract_domain(result.get('link', ''))
+
+        logger.info(f"Processing company: {company_name}")
+
+        if not checkpoint.has('description'):
+            checkpoint.save('description', (descriptions or {}).get(
+                company_key(result), result.get('snippet', '')
+            ))
+        enriched_description = checkpoint.get('description')
+
+        if not checkpoint.has('sample_names') and (sample_names or {}).get(company_name):
+            checkpoint.save('sample_names', sample_names[company_name])
+
+        if checkpoint.has('emails'):
+            validated_emails = checkpoint.get('emails')
+        else:
+            # Generate potential email formats, grouped by pattern
+            candidates_by_pattern = self.email_generator.generate_email_formats_by_pattern(
+                company_name=company_name,
+                domain=company_domain,
+                sample_names=checkpoint.get('sample_names')
+            )
+
+            # Advanced email verification, keeping the candidate order
+            validated_emails = []
+            with metrics.time_stage('emails'):
+                for potential_emails in candidates_by_pattern:
+                    if self.email_generator.smtp_verifier is not None:
+                        verifications = self._verify_emails_bulk(potential_emails)
+                    elif verification_executor is not None:
+                        verifications = list(verification_executor.map(self._verify_email, potential_emails))
+                    else:
+                        verifications = [self._verify_email(email) for email in potential_emails]
+                    validated_emails.extend(entry for entry in verifications if entry is not None)
+                    # A confirmed address settles the domain's pattern; other patterns would only cost calls
+                    if self.email_generator.stops_at_confirmed_pattern and any(map(is_confirmed, verifications)):
+                        break
+            checkpoint.save('emails', validated_emails)
+            # Confirmed addresses narrow the candidates of later companies on the domain
+            self.email_generator.learn_email_patterns(company_name, validated_emails,
+                                                      checkpoint.get('sample_names'))
+
+        linkedin_failed = False
+        if checkpoint.has('linkedin'):
+            linkedin_urls = checkpoint.get('linkedin')
+        else:
+            # Find LinkedIn profiles for the company
+            try:
+                with self.linkedin_limit if self.concurrent else nullcontext(), metrics.time_stage('linkedin'):
+                    linkedin_profiles = self.linkedin_scraper.find_profiles(
+                        company_name=company_name,
+                        location=self.business_location,
+                        num_results=3
+                    )
+                linkedin_urls = [p.get('profile_url', '') for p in linkedin_profiles]
+                checkpoint.save('linkedin', linkedin_urls)
+            except Exception as linkedin_error:
+                logger.warning(f"LinkedIn profile scraping failed for {company_name}: {linkedin_error}")
+                linkedin_urls = []
+                linkedin_failed = True
+
+        # Build the lead entry
+        lead_entry = {
+            'company_name': company_name,
+            'website': result.get('link', ''),
+            'description': enriched_description,
+            'emails': validated_emails,
+            'linkedin_profiles': linkedin_urls,
+            'verification_status': 'Initial',
+            'timestamp': self.export_timestamp
+        }
+        # A failed lookup leaves the company unfinished so a resumed job retries it
+        if not linkedin_failed:
+            checkpoint.save('lead', lead_entry)
+            if self.domain_index is not None:
+                self.domain_index.record(company_domain, company_name, lead_entry)
+        return lead_entry
+
+    def _emit(self, lead_entry, checkpoint):
+        if self.on_lead:
+            self.on_lead(lead_entry, checkpoint)
+
+    def _run_sequential(self, items):
+        consolidated_leads = []
+        for chunk in _iter_chunks(items, self.enricher.batch_size):
+            descriptions, sample_names = self.prepare_chunk(chunk)
+            for result, checkpoint in chunk:
+                try:
+                    with metrics.time_stage('company'):
+                        lead_entry = self.process_company(result, checkpoint, descriptions, sample_names)
+                except Exception as company_process_error:
+                    logger.error(f"Error processing company {result.get('title', '')}: {company_process_error}")
+                    continue
+                consolidated_leads.append(lead_entry)
+                self._emit(lead_entry, checkpoint)
+        return consolidated_leads
+
+    def _process_after_preparation(self, preparation_future, result, checkpoint, verification_executor):
+        descriptions, sample_names = preparation_future.result()
+        with metrics.time_stage('company'):
+            return self.process_company(result, checkpoint, descriptions, sample_names,
+                                        verification_executor=verification_executor)
+
+    def _run_concurrent(self, items):
+        """
+        Process companies on thread pools with a separate bound per stage.
+
+        Search results are enriched and given sample names in batches on an
+        enrichment pool while the companies of earlier batches are already
+        being processed. Email verifications are fanned out to a shared
+        verification pool so the verification limit holds across companies.
+        Finished leads are collected, and handed to on_lead, in submission
+        order as soon as all earlier companies are done.
+        """
+        consolidated_leads = []
+        with ThreadPoolExecutor(max_workers=self.enrichment_concurrency,
+                                thread_name_prefix='enrich') as enrichment_executor, \
+             ThreadPoolExecutor(max_workers=self.verification_concurrency,
+                                thread_name_prefix='verify') as verification_executor, \
+             ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='company') as company_executor:
+            futures = []
+            next_index = 0
+
+            def collect_finished(block):
+                # Hand over leads in order, stopping at the first unfinished company
+                nonlocal next_index
+                while next_index < len(futures):
+                    result, checkpoint, future = futures[next_index]
+                    if not block and not future.done():
+                        return
+                    next_index += 1
+                    try:
+                        lead_entry = future.result()
+                    except Exception as company_process_error:
+                        logger.error(f"Error processing company {result.get('title', '')}: {company_process_error}")
+                        continue
+                    consolidated_leads.append(lead_entry)
+                    self._emit(lead_entry, checkpoint)
+
+            for chunk in _iter_chunks(items, self.enricher.batch_size):
+                preparation_future = enrichment_executor.submit(self.prepare_chunk, chunk)
+                for result, checkpoint in chunk:
+                    futures.append((result, checkpoint, company_executor.submit(
+                        self._process_after_preparation, preparation_future,
+                        result, checkpoint, verification_executor
+                    )))
+                collect_finished(block=False)
+            collect_finished(block=True)
+        return consolidated_leads
+
+
+def _mark_exported(checkpoints):
+    """
+    Record that the leads of these checkpoints reached the spreadsheet
+    """
+    for checkpoint in checkpoints:
+        checkpoint.save('exported', True)
+
+
+def _iter_job_items(job_store, job, google_scraper):
+    """
+    Yield (result, checkpoint) pairs for a job, replaying stored search results
+    when the search already finished and recording new ones as they stream in
+    """
+    job_id = job['job_id']
+    params = job['params']
+    stage_outputs = job_store.stage_outputs(job_id)
+    stored_results = job_store.results(job_id)
+
+    if job['search_complete']:
+        search_results = stored_results
+    else:
+        # Stream Google search results so companies start processing while
+        # later result pages are still being fetched; a search that stops
+        # early raises, so the job is not marked as fully searched
+        search_results = google_scraper.iter_search(
+            query=params['search_query'],
+            business_type=f"in {params['business_location']}",
+            num_results=params['num_results'],
+            raise_errors=True
+        )
+
+    count = 0
+    try:
+        for idx, result in enumerate(search_results):
+            outputs = stage_outputs.get(idx)
+            if not job['search_complete']:
+                # Stage outputs belong to the company an earlier attempt saw at this position
+                if idx < len(stored_results) and stored_results[idx].get('link') != result.get('link'):
+                    job_store.clear_stages(job_id, idx)
+                    outputs = None
+                job_store.record_result(job_id, idx, result)
+            count += 1
+            yield result, CompanyCheckpoint(job_store, job_id, idx, outputs)
+    except SearchIncompleteError as e:
+        logger.warning(f"Job {job_id}: {e}; resume the job to search again")
+    else:
+        if not job['search_complete']:
+            job_store.update_job(job_id, search_complete=1)
+    logger.info(f"Job {job_id}: {count} search results")
+
+def generate_leads(search_query, business_location, num_results,
+                   concurrent=None, max_workers=None,
+                   enrichment_concurrency=None, verification_concurrency=None,
+                   linkedin_concurrency=None, stream_export=None,
+                   job_id=None, job_store=None,
+                   known_domain_policy=None, refresh_after_days=None,
+                   domain_index=None):
+    """
+    Search for businesses and build consolidated leads
+
+    :param search_query: Search query
+    :param business_location: Business location filter
+    :param num_results: Number of search results to process
+    :param concurrent: Process companies in parallel (defaults to PIPELINE_CONCURRENT)
+    :param max_workers: Number of companies processed at once
+    :param enrichment_concurrency: Maximum parallel OpenAI enrichment batches
+    :param verification_concurrency: Maximum parallel email verifications
+    :param linkedin_concurrency: Maximum parallel LinkedIn lookups
+    :param stream_export: Append leads to Google Sheets as they complete (defaults to EXPORT_STREAMING)
+    :param job_id: Job to resume, or the ID given to a new job
+    :param job_store: Optional JobStore, defaults to the on-disk store
+    :param known_domain_policy: What to do with domains processed by earlier runs: 'reuse',
+        'skip' or 'process' (defaults to DOMAIN_INDEX_POLICY or 'process')
+    :param refresh_after_days: Reprocess indexed domains older than this many days
+        (defaults to DOMAIN_INDEX_REFRESH_DAYS)
+    :param domain_index: Optional DomainIndex, defaults to the on-disk index
+    :return: Tuple of (consolidated leads, spreadsheet ID)
+    """
+    if concurrent is None:
+        concurrent = get_env_bool('PIPELINE_CONCURRENT', True)
+    if stream_export is None:
+        stream_export = get_env_bool('EXPORT_STREAMING', True)
+    max_workers = max_workers or get_env_int('PIPELINE_MAX_WORKERS', 8)
+    enrichment_concurrency = enrichment_concurrency or get_env_int('PIPELINE_ENRICHMENT_CONCURRENCY', 4)
+    verification_concurrency = verification_concurrency or get_env_int('PIPELINE_VERIFICATION_CONCURRENCY', 8)
+    linkedin_concurrency = linkedin_concurrency or get_env_int('PIPELINE_LINKEDIN_CONCURRENCY', 3)
+    known_domain_policy = known_domain_policy or os.getenv('DOMAIN_INDEX_POLICY', 'process')
+    if refresh_after_days is None:
+        refresh_after_days = get_env_float('DOMAIN_INDEX_REFRESH_DAYS', 30)
+
+    # Metrics of this run are reported relative to this point
+    metrics_start = metrics.checkpoint()
+    run_started = datetime.now()
+    metrics_port = get_env_int('METRICS_PORT', 0)
+    if metrics_port:
+        try:
+            metrics.serve_prometheus(metrics_port)
+        except OSError as metrics_error:
+            logger.warning(f"Could not serve metrics on port {metrics_port}: {metrics_error}")
+
+    # Set export timestamp
+    export_timestamp = run_started.strftime("%Y-%m-%d %H:%M:%S")
+    os.environ['EXPORT_TIMESTAMP'] = export_timestamp
+    logger.info(f"Starting lead generation process at {export_timestamp}")
+
+    # Create the job, or pick up an earlier attempt of it
+    job_store = job_store or JobStore()
+    job = job_store.get_job(job_id) if job_id else None
+    if job:
+        logger.info(f"Resuming job {job_id} with parameters {job['params']}")
+        job_store.update_job(job_id, status='running')
+    else:
+        job_id = job_store.create_job({
+            'search_query': search_query,
+            'business_location': business_location,
+            'num_results': int(num_results)
+        }, job_id=job_id)
+        job = job_store.get_job(job_id)
+        logger.info(f"Created job {job_id}")
+    business_location = job['params']['business_location']
+
+    # Initialize scrapers and generators
+    google_scraper = GoogleSearchScraper()
+    linkedin_scraper = LinkedInProfileScraper()
+    email_generator = EmailGenerator()
+    enricher = DescriptionEnricher(max_concurrency=enrichment_concurrency)
+
+    # Open the streaming export first so finished leads reach the sheet during the run;
+    # a resumed job keeps appending to its own spreadsheet
+    exporter = None
+    export_stream = None
+    if stream_export:
+        try:
+            exporter = LeadExporter()
+            if job['spreadsheet_id']:
+                export_stream = exporter.resume_stream(job['spreadsheet_id'])
+            else:
+                export_stream = exporter.start_stream()
+                job_store.update_job(job_id, spreadsheet_id=export_stream.spreadsheet_id)
+            export_stream.on_written = _mark_exported
+            logger.info(f"Streaming leads to Google Sheets. Spreadsheet ID: {export_stream.spreadsheet_id}")
+        except Exception as export_error:
+            logger.error(f"Export failed: {export_error}")
+            export_stream = None
+
+    def on_lead(lead_entry, checkpoint):
+        # Leads exported by an earlier attempt are already in the sheet
+        if export_stream and not checkpoint.has('exported'):
+            export_stream.add(lead_entry, key=checkpoint)
+
+    pipeline = LeadPipeline(
+        business_location, export_timestamp,
+        linkedin_scraper, email_generator, enricher,
+        concurrent=concurrent,
+        max_workers=max_workers,
+        enrichment_concurrency=enrichment_concurrency,
+        verification_concurrency=verification_concurrency,
+        linkedin_concurrency=linkedin_concurrency,
+        on_lead=on_lead,
+        domain_index=domain_index or DomainIndex(),
+        known_domain_policy=known_domain_policy,
+        refresh_after_days=refresh_after_days
+    )
+
+    # Process each search result to build consolidated leads
+    unexported_rows = 0
+    try:
+        consolidated_leads = pipeline.run(_iter_job_items(job_store, job, google_scraper))
+    except BaseException:
+        job_store.update_job(job_id, status='failed')
+        raise
+    finally:
+        # Flush whatever finished, even when the run is interrupted
+        if export_stream:
+            with metrics.time_stage('export'):
+                unexported_rows = export_stream.close()
+    logger.info(f"Processed {len(consolidated_leads)} search results")
+
+    # Export the consolidated leads to Google Sheets
+    try:
+        if export_stream:
+            spreadsheet_id = export_stream.spreadsheet_id
+        else:
+            exporter = exporter or LeadExporter()
+            with metrics.time_stage('export'):
+                spreadsheet_id = exporter.export_leads(consolidated_leads)
+            job_store.update_job(job_id, spreadsheet_id=spreadsheet_id)
+        share_email = os.getenv('SHARE_EMAIL')
+        if share_email:
+            exporter.share_spreadsheet(spreadsheet_id, share_email)
+        logger.info(f"Leads exported to Google Sheets. Spreadsheet ID: {spreadsheet_id}")
+    except Exception as export_error:
+        logger.error(f"Export failed: {export_error}")
+        spreadsheet_id = None
+
+    if unexported_rows:
+        # Their companies are not checkpointed as exported, so resuming the job appends them
+        logger.error(f"{unexported_rows} leads were not written to the spreadsheet; "
+                     f"resume job {job_id} to export them")
+    if not job_store.get_job(job_id)['search_complete']:
+        # Results after the failed page were never seen; resuming the job searches again
+        status = 'search_incomplete'
+    elif spreadsheet_id and not unexported_rows:
+        status = 'completed'
+    else:
+        status = 'export_failed'
+    job_store.update_job(job_id, status=status)
+    metrics.observe_stage('run', (datetime.now() - run_started).total_seconds())
+    _export_metrics(job_id, metrics_start)
+    return consolidated_leads, spreadsheet_id
+
+
+def _export_metrics(job_id, metrics_start):
+    """
+    Write the metrics of a run as JSON (METRICS_JSON_PATH, default data/metrics/<job_id>.json)
+    and, when METRICS_PROMETHEUS_FILE is set, the cumulative values in Prometheus text format
+    """
+    try:
+        json_path = os.getenv('METRICS_JSON_PATH') or data_path(os.path.join('metrics', '{job_id}.json'))
+        json_path = metrics.write_json(json_path.format(job_id=job_id), since=metrics_start, job_id=job_id)
+        logger.info(f"Run metrics written to {json_path}")
+        prometheus_path = os.getenv('METRICS_PROMETHEUS_FILE')
+        if prometheus_path:
+            metrics.write_prometheus(prometheus_path)
+    except OSError as metrics_error:
+        logger.warning(f"Could not write run metrics: {metrics_error}")
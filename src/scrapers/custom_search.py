@@ -0,0 +1,194 @@
+# src/scrapers/custom_search.py
+import json
+import os
+import threading
+from typing import Dict
+
+from src.utils.cache import PersistentCache, data_path
+from src.utils.config import get_env_float, get_env_int, get_env_mapping
+from src.utils.logger import setup_logger
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import DEFAULT_QUOTA_SHARES, PriorityRateLimiter, QuotaExhaustedError, QuotaLedger
+from src.utils.transport import get_transport
+
+# Overridable so the client can be pointed at a local stand-in, e.g. for benchmarks
+CUSTOM_SEARCH_URL = os.getenv('GOOGLE_SEARCH_ENDPOINT', 'https://www.googleapis.com/customsearch/v1')
+
+# Request parameters that never take part in the cache key
+_UNCACHED_PARAMS = {'key'}
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+_limiter = None
+
+logger = setup_logger('custom_search')
+
+
+def get_search_cache() -> PersistentCache:
+    """
+    Return the process-wide Custom Search response cache
+
+    :return: Shared PersistentCache instance
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = PersistentCache(
+                os.getenv('SEARCH_CACHE_PATH') or data_path('search_cache.sqlite3'),
+                namespace='custom_search',
+                ttl=get_env_float('SEARCH_CACHE_TTL_HOURS', 24) * 3600,
+                max_entries=get_env_int('SEARCH_CACHE_MAX_ENTRIES', 5000)
+            )
+        return _search_cache
+
+
+def get_cse_limiter() -> PriorityRateLimiter:
+    """
+    Return the process-wide Custom Search rate limiter and daily quota ledger
+
+    Configured by CSE_RATE_PER_SECOND, CSE_BURST, CSE_DAILY_QUOTA and
+    CSE_QUOTA_SHARES, e.g. 'normal=0.9,fallback=0.75'.
+
+    :return: Shared PriorityRateLimiter instance
+    """
+    global _limiter
+    with _search_cache_lock:
+        if _limiter is None:
+            daily_quota = get_env_int('CSE_DAILY_QUOTA', 10000)
+            ledger = QuotaLedger(
+                os.getenv('CSE_QUOTA_LEDGER_PATH') or data_path('cse_quota.sqlite3'), daily_quota
+            ) if daily_quota > 0 else None
+            _limiter = PriorityRateLimiter(
+                rate=get_env_float('CSE_RATE_PER_SECOND', 10.0),
+                burst=get_env_int('CSE_BURST', 0) or None,
+                ledger=ledger,
+                quota_shares=get_env_mapping('CSE_QUOTA_SHARES', DEFAULT_QUOTA_SHARES),
+                name='cse'
+            )
+        return _limiter
+
+
+def set_cse_limiter(limiter: PriorityRateLimiter):
+    """
+    Replace the process-wide Custom Search rate limiter
+
+    :param limiter: PriorityRateLimiter to use from now on
+    """
+    global _limiter
+    with _search_cache_lock:
+        _limiter = limiter
+
+
+def cache_key(params: Dict) -> str:
+    """
+    Build a cache key from normalized request parameters, excluding the API key
+
+    :param params: Custom Search request parameters
+    :return: Stable cache key
+    """
+    normalized = {}
+    for name, value in params.items():
+        if name in _UNCACHED_PARAMS or value is None:
+            continue
+        if name == 'q':
+            value = ' '.join(str(value).lower().split())
+        normalized[name] = str(value)
+    return json.dumps(normalized, sort_keys=True)
+
+
+class CustomSearchClient:
+    # Retries of a request the API answered with 429, after pausing every caller
+    MAX_THROTTLE_RETRIES = 3
+
+    def __init__(self, api_key: str, cx: str, cache: PersistentCache = None,
+                 limiter: PriorityRateLimiter = None):
+        """
+        Thin Custom Search API client shared by the scrapers
+
+        :param api_key: Google Custom Search API Key
+        :param cx: Google Custom Search Engine ID
+        :param cache: Optional response cache, defaults to the shared cache
+        :param limiter: Optional rate limiter, defaults to the shared limiter
+        """
+        self.api_key = api_key
+        self.cx = cx
+        self.cache = cache if cache is not None else get_search_cache()
+        self.limiter = limiter or get_cse_limiter()
+
+    def fetch(self,
+              query: str,
+              num: int = 10,
+              start: int = None,
+              use_cache: bool = True,
+              refresh: bool = False,
+              cancel_event: threading.Event = None,
+              priority: str = 'primary') -> Dict:
+        """
+        Run a Custom Search request, served from the cache when possible
+
+        Requests that reach the API wait for the shared rate limiter, so
+        bursts queue up instead of failing, and more important priority
+        classes go first.
+
+        :param query: Search query
+        :param num: Number of results, at most 10 per request
+        :param start: Optional 1-based result offset
+        :param use_cache: Read and write the response cache
+        :param refresh: Ignore any cached response and store the fresh one
+        :param cancel_event: Optional event, once set the API is no longer called
+        :param priority: Priority class: 'primary', 'normal' or 'fallback'
+        :return: Decoded JSON response, empty when the call was cancelled or the
+            class has used its share of the daily quota
+        :raises requests.RequestException: If the API request fails
+        """
+        params = {
+            'key': self.api_key,
+            'cx': self.cx,
+            'q': query,
+            'num': num
+        }
+        if start:
+            params['start'] = start
+
+        key = cache_key(params)
+        if use_cache and not refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            try:
+                if not self.limiter.acquire(priority, cancel_event=cancel_event):
+                    return {}
+            except QuotaExhaustedError as e:
+                logger.warning(f"Skipping search '{query}': {e}")
+                return {}
+            # The caller may have been satisfied while this one waited for its turn
+            if cancel_event is not None and cancel_event.is_set():
+                return {}
+
+            with metrics.time_call('cse') as call:
+                response = get_transport().get(CUSTOM_SEARCH_URL, params=params, endpoint='cse')
+                call.error = not response.ok
+            if response.status_code != 429 or attempt == self.MAX_THROTTLE_RETRIES:
+                break
+            # Rate limited anyway: pause every caller, then queue up again
+            pause = _retry_after(response, default=2.0 ** attempt)
+            logger.warning(f"Custom Search rate limited, pausing {pause:.1f}s")
+            self.limiter.throttle(pause)
+        response.raise_for_status()
+        payload = response.json()
+
+        if use_cache:
+            self.cache.set(key, payload)
+        return payload
+
+
+def _retry_after(response, default: float) -> float:
+    """
+    :return: Seconds from the Retry-After header, or the default
+    """
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return default
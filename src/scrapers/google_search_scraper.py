@@ -1,17 +1,29 @@
 # src/scrapers/google_search_scraper.py
 import os
+import threading
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional
 from urllib.parse import urlparse, urlencode
 from dotenv import load_dotenv
 
 # Use absolute import for logger
 from src.utils.logger import setup_logger
+from src.scrapers.custom_search import CustomSearchClient
+from src.scrapers.website_crawler import WebsiteCrawler
 
 # Load environment variables
 load_dotenv()
 
+
+class SearchIncompleteError(Exception):
+    """
+    Raised by iter_search(raise_errors=True) when a page could not be fetched,
+    so the results seen so far are not all there is
+    """
+
+
 class GoogleSearchScraper:
     def __init__(self, api_key: str = None, cx: str = None):
         """
@@ -28,64 +40,146 @@ class GoogleSearchScraper:
             raise ValueError("Google Search API Key and Custom Search Engine ID are required. "
                              "Please set GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_CX in .env file.")
 
+        self.search_client = CustomSearchClient(self.api_key, self.cx)
+        self.crawler = WebsiteCrawler()
+
+    # The Custom Search API returns at most 10 results per request and
+    # never serves results beyond the 100th
+    PAGE_SIZE = 10
+    MAX_RESULTS = 100
+
     def search(self, 
                query: str, 
                num_results: int = 10, 
-               business_type: str = None) -> List[Dict]:
+               business_type: str = None,
+               use_cache: bool = True,
+               refresh_cache: bool = False) -> List[Dict]:
         """
         Perform Google Search and extract business information
         
         :param query: Search query
         :param num_results: Number of results to retrieve
         :param business_type: Optional business type filter
+        :param use_cache: Serve repeated queries from the search cache
+        :param refresh_cache: Bypass cached responses and store fresh ones
         :return: List of business search results
         """
+        return list(self.iter_search(
+            query,
+            num_results=num_results,
+            business_type=business_type,
+            use_cache=use_cache,
+            refresh_cache=refresh_cache
+        ))
+
+    def iter_search(self,
+                    query: str,
+                    num_results: int = 10,
+                    business_type: str = None,
+                    use_cache: bool = True,
+                    refresh_cache: bool = False,
+                    max_workers: int = 2,
+                    raise_errors: bool = False) -> Iterator[Dict]:
+        """
+        Stream Google Search results, paging through the API with the start offset.
+        
+        Pages are yielded in result order while the next pages are already in
+        flight, so the first page can be consumed before later ones arrive.
+        Only max_workers pages are requested ahead, and nothing more is sent
+        once a short or empty page shows the results have run out.
+        
+        :param query: Search query
+        :param num_results: Number of results to retrieve, capped at 100
+        :param business_type: Optional business type filter
+        :param use_cache: Serve repeated queries from the search cache
+        :param refresh_cache: Bypass cached responses and store fresh ones
+        :param max_workers: Maximum number of pages in flight at once
+        :param raise_errors: Raise SearchIncompleteError when a page fails or is skipped
+            (e.g. quota used up) instead of ending the results early
+        :return: Iterator of business search results
+        :raises SearchIncompleteError: With raise_errors, when the search stopped early
+        """
+        # Construct full query with optional business type
+        full_query = f"{query} {business_type}" if business_type else query
+        num_results = max(0, min(int(num_results), self.MAX_RESULTS))
+        if not num_results:
+            return
+
+        pages = [
+            (start, min(self.PAGE_SIZE, num_results - start + 1))
+            for start in range(1, num_results + 1, self.PAGE_SIZE)
+        ]
+        window = max(1, min(len(pages), max_workers))
+        executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix='search-page')
+        cancel_event = threading.Event()
+        upcoming = iter(pages)
+        in_flight = deque()
+
+        def request_next_page():
+            page = next(upcoming, None)
+            if page is not None:
+                in_flight.append((page[1], executor.submit(self._fetch_page, full_query, page[0], page[1],
+                                                           use_cache, refresh_cache, cancel_event)))
+
         try:
-            # Construct full query with optional business type
-            full_query = f"{query} {business_type}" if business_type else query
-            
-            # Google Custom Search API parameters
-            params = {
-                'key': self.api_key,
-                'cx': self.cx,
-                'q': full_query,
-                'num': num_results
-            }
-            
-            # Make API request
-            response = requests.get(
-                'https://www.googleapis.com/customsearch/v1', 
-                params=params
-            )
-            response.raise_for_status()
-            
-            # Parse search results
-            search_results = response.json().get('items', [])
-            
-            # Process and enrich results
-            processed_results = []
-            for result in search_results:
+            for _ in range(window):
+                request_next_page()
+            while in_flight:
+                page_size, future = in_flight.popleft()
                 try:
-                    processed_result = {
-                        'title': result.get('title', ''),
-                        'link': result.get('link', ''),
-                        'snippet': result.get('snippet', ''),
-                        'domain': urlparse(result.get('link', '')).netloc
-                    }
-                    
-                    # Additional enrichment could be added here
-                    processed_results.append(processed_result)
+                    search_results = future.result()
+                except (requests.RequestException, SearchIncompleteError) as e:
+                    self.logger.error(f"Google Search API request failed: {e}")
+                    if raise_errors:
+                        raise SearchIncompleteError(f"Search for '{full_query}' stopped early: {e}") from e
+                    return
                 except Exception as e:
-                    self.logger.warning(f"Error processing individual result: {e}")
-            
-            return processed_results
-        
-        except requests.RequestException as e:
-            self.logger.error(f"Google Search API request failed: {e}")
-            return []
+                    self.logger.error(f"Unexpected error in search: {e}")
+                    if raise_errors:
+                        raise SearchIncompleteError(f"Search for '{full_query}' stopped early: {e}") from e
+                    return
+
+                for result in search_results:
+                    processed_result = self._process_result(result)
+                    if processed_result is not None:
+                        yield processed_result
+
+                # A short page means there are no further results
+                if len(search_results) < page_size:
+                    return
+                request_next_page()
+        finally:
+            # Pages still queued or waiting for the rate limiter are never sent
+            cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_page(self, query: str, start: int, page_size: int,
+                    use_cache: bool, refresh_cache: bool,
+                    cancel_event: threading.Event = None) -> List[Dict]:
+        response = self.search_client.fetch(
+            query,
+            num=page_size,
+            start=start if start > 1 else None,
+            use_cache=use_cache,
+            refresh=refresh_cache,
+            cancel_event=cancel_event
+        )
+        # The client answers {} only when it did not call the API, e.g. the quota is used up
+        if not response:
+            raise SearchIncompleteError(f"Page at offset {start} was not fetched")
+        return response.get('items', [])
+
+    def _process_result(self, result: Dict) -> Optional[Dict]:
+        try:
+            return {
+                'title': result.get('title', ''),
+                'link': result.get('link', ''),
+                'snippet': result.get('snippet', ''),
+                'domain': urlparse(result.get('link', '')).netloc
+            }
         except Exception as e:
-            self.logger.error(f"Unexpected error in search: {e}")
-            return []
+            self.logger.warning(f"Error processing individual result: {e}")
+            return None
 
     def extract_business_details(self, url: str) -> Dict:
         """
@@ -94,26 +188,13 @@ class GoogleSearchScraper:
         :param url: Website URL to scrape
         :return: Dictionary of business details
         """
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Basic website information extraction
-            details = {
-                'url': url,
-                'title': soup.title.string if soup.title else '',
-                'meta_description': soup.find('meta', attrs={'name': 'description'})['content'] 
-                                    if soup.find('meta', attrs={'name': 'description'}) 
-                                    else ''
-            }
-            
-            return details
+        return self.crawler.fetch(url)
+
+    def extract_business_details_bulk(self, urls: List[str]) -> Dict[str, Dict]:
+        """
+        Extract business information from many websites concurrently
         
-        except requests.RequestException as e:
-            self.logger.warning(f"Could not fetch website details for {url}: {e}")
-            return {}
\ No newline at end of file
+        :param urls: Website URLs to scrape
+        :return: Dictionary of business details per URL, empty for sites that failed
+        """
+        return self.crawler.crawl(urls)
@@ -0,0 +1,138 @@
+# src/scrapers/linkedin_parser.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List
+
+from bs4 import BeautifulSoup
+
+from src.utils.config import get_env_int
+from src.utils.logger import setup_logger
+
+# Conditional import: lxml parses and selects in C, BeautifulSoup is the fallback
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+logger = setup_logger('linkedin_parser')
+
+HEADLINE_CLASS = 'top-card-layout__headline'
+SKILL_CLASS = 'skill'
+SECTION_IDS = {'experience': 'company_experience', 'education': 'education'}
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml is not None:
+    # Every field in one expression, compiled once; matches come back in document order
+    PROFILE_XPATH = lxml.etree.XPath(
+        f"//h1 | //div[{_has_class(HEADLINE_CLASS)}] | //span[{_has_class(SKILL_CLASS)}]"
+        f" | //*[@id='experience' or @id='education']//li"
+    )
+    SECTION_XPATH = lxml.etree.XPath(
+        "string(ancestor::*[@id='experience' or @id='education'][1]/@id)"
+    )
+
+
+def empty_details() -> Dict:
+    return {
+        'full_name': '',
+        'current_title': '',
+        'company_experience': [],
+        'skills': [],
+        'education': []
+    }
+
+
+def parse_profile(html) -> Dict:
+    """
+    Extract the details of a LinkedIn profile page in one pass over the document
+
+    :param html: Page as text or bytes
+    :return: Dictionary with 'full_name', 'current_title', 'company_experience',
+        'skills' and 'education', see LinkedInProfileScraper.extract_linkedin_details
+    """
+    if lxml is not None:
+        try:
+            return _parse_with_lxml(html)
+        except (ValueError, lxml.etree.LxmlError):
+            pass
+    return _parse_with_soup(html)
+
+
+def _parse_with_lxml(html) -> Dict:
+    details = empty_details()
+    for element in PROFILE_XPATH(lxml.html.fromstring(html)):
+        text = ''.join(part.strip() for part in element.itertext())
+        if element.tag == 'li':
+            details[SECTION_IDS[SECTION_XPATH(element)]].append(text)
+        elif element.tag == 'span':
+            details['skills'].append(text)
+        elif element.tag == 'h1':
+            details['full_name'] = details['full_name'] or text
+        else:
+            details['current_title'] = details['current_title'] or text
+    return details
+
+
+def _parse_with_soup(html) -> Dict:
+    details = empty_details()
+
+    def wanted(tag) -> bool:
+        classes = tag.get('class') or []
+        return (tag.name in ('h1', 'li')
+                or (tag.name == 'div' and HEADLINE_CLASS in classes)
+                or (tag.name == 'span' and SKILL_CLASS in classes))
+
+    for tag in BeautifulSoup(html, 'html.parser').find_all(wanted):
+        text = tag.get_text(strip=True)
+        if tag.name == 'li':
+            section = tag.find_parent(id=lambda value: value in SECTION_IDS)
+            if section is not None:
+                details[SECTION_IDS[section['id']]].append(text)
+        elif tag.name == 'span':
+            details['skills'].append(text)
+        elif tag.name == 'h1':
+            details['full_name'] = details['full_name'] or text
+        else:
+            details['current_title'] = details['current_title'] or text
+    return details
+
+
+def parse_profile_file(path: str) -> Dict:
+    """
+    Parse a saved LinkedIn profile page
+
+    :param path: HTML file
+    :return: Profile details, empty fields when the file cannot be read
+    """
+    try:
+        with open(path, 'rb') as file:
+            return parse_profile(file.read())
+    except OSError as e:
+        logger.error(f"Could not read saved profile {path}: {e}")
+        return empty_details()
+
+
+def parse_profile_files(paths: Iterable[str], processes: int = None) -> List[Dict]:
+    """
+    Parse many saved LinkedIn profile pages, across a process pool when it pays off
+
+    :param paths: HTML files
+    :param processes: Worker processes, defaults to LINKEDIN_PARSE_PROCESSES or the CPU count;
+        1 parses in this process
+    :return: Profile details in the order of paths
+    """
+    paths = list(paths)
+    processes = processes or get_env_int('LINKEDIN_PARSE_PROCESSES', os.cpu_count() or 1)
+    processes = max(1, min(processes, len(paths)))
+    if processes == 1:
+        return [parse_profile_file(path) for path in paths]
+
+    # Large chunks keep the pickling overhead per page small
+    chunksize = max(1, len(paths) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(parse_profile_file, paths, chunksize=chunksize))
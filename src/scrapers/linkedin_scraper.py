@@ -1,12 +1,24 @@
 import os
 import re
 import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup  # Ensure you have beautifulsoup4 installed
 
 # Use absolute import for logger
 from src.utils.logger import setup_logger
+from src.scrapers.custom_search import CustomSearchClient
+from src.scrapers.linkedin_parser import empty_details, parse_profile, parse_profile_files
+from src.utils.config import get_env_int
+from src.utils.metrics import metrics
+from src.utils.transport import get_transport
+
+PROFILE_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/90.0.4430.93 Safari/537.36")
+}
 
 class LinkedInProfileScraper:
     def __init__(self, api_key: str = None):
@@ -22,16 +34,22 @@ class LinkedInProfileScraper:
         if not self.api_key or not self.cx:
             raise ValueError("Google Search API Key and Custom Search Engine ID are required")
 
+        self.search_client = CustomSearchClient(self.api_key, self.cx)
+
     def find_profiles(self,
                       company_name: str,
                       location: str = None,
-                      num_results: int = 5) -> List[Dict]:
+                      num_results: int = 5,
+                      use_cache: bool = True,
+                      refresh_cache: bool = False) -> List[Dict]:
         """
         Find LinkedIn profiles for a specific company
 
         :param company_name: Name of the company
         :param location: Optional location filter
         :param num_results: Number of results to retrieve
+        :param use_cache: Serve repeated queries from the search cache
+        :param refresh_cache: Bypass cached responses and store fresh ones
         :return: List of LinkedIn profile links
         """
         try:
@@ -45,42 +63,53 @@ class LinkedInProfileScraper:
                 f"site:linkedin.com/in {clean_company_name.split()[0]}"
             ]
 
+            if location:
+                queries = [f"{query} {location}" for query in queries]
+
+            # The company query usually suffices; the looser strategies only run
+            # when it falls short, and then concurrently in priority order
             linkedin_profiles = []
-            for query in queries:
-                if location:
-                    query += f" {location}"
-
-                params = {
-                    'key': self.api_key,
-                    'cx': self.cx,
-                    'q': query,
-                    'num': num_results
-                }
-
-                response = requests.get(
-                    'https://www.googleapis.com/customsearch/v1',
-                    params=params
-                )
-                response.raise_for_status()
-
-                search_results = response.json().get('items', [])
-
-                for result in search_results:
+            seen_urls = set()
+
+            def merge(search_results: Dict):
+                for result in search_results.get('items', []):
                     try:
                         profile_url = result.get('link', '')
-                        if '/in/' in profile_url and profile_url not in [p['profile_url'] for p in linkedin_profiles]:
-                            profile_info = {
+                        if '/in/' in profile_url and profile_url not in seen_urls:
+                            seen_urls.add(profile_url)
+                            linkedin_profiles.append({
                                 'name': self._extract_name_from_url(profile_url),
                                 'profile_url': profile_url,
                                 'title': result.get('title', ''),
                                 'snippet': result.get('snippet', '')
-                            }
-                            linkedin_profiles.append(profile_info)
+                            })
                     except Exception as e:
                         self.logger.warning(f"Error processing profile: {e}")
 
-                if len(linkedin_profiles) >= num_results:
-                    break
+            merge(self.search_client.fetch(queries[0], num=num_results, use_cache=use_cache,
+                                           refresh=refresh_cache, priority='normal'))
+
+            if len(linkedin_profiles) < num_results:
+                cancel_event = threading.Event()
+                executor = ThreadPoolExecutor(max_workers=len(queries) - 1,
+                                              thread_name_prefix='linkedin-query')
+                try:
+                    futures = [
+                        executor.submit(self.search_client.fetch, query,
+                                        num=num_results, use_cache=use_cache,
+                                        refresh=refresh_cache,
+                                        cancel_event=cancel_event,
+                                        priority='fallback')
+                        for query in queries[1:]
+                    ]
+                    for future in futures:
+                        merge(future.result())
+                        if len(linkedin_profiles) >= num_results:
+                            break
+                finally:
+                    # Drop fallback strategies that have not sent their request yet
+                    cancel_event.set()
+                    executor.shutdown(wait=False, cancel_futures=True)
 
             if not linkedin_profiles:
                 self.logger.warning(f"No LinkedIn profiles found for {company_name}")
@@ -120,52 +149,39 @@ class LinkedInProfileScraper:
             - skills: List of skills mentioned on the profile
             - education: List of education entries
         """
-        details = {
-            'full_name': '',
-            'current_title': '',
-            'company_experience': [],
-            'skills': [],
-            'education': []
-        }
         try:
-            headers = {
-                "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                               "AppleWebKit/537.36 (KHTML, like Gecko) "
-                               "Chrome/90.0.4430.93 Safari/537.36")
-            }
-            response = requests.get(profile_url, headers=headers)
+            with metrics.time_call('linkedin') as call:
+                response = get_transport().get(profile_url, headers=PROFILE_HEADERS, endpoint='linkedin')
+                call.error = not response.ok
             response.raise_for_status()
-            html = response.text
-
-            soup = BeautifulSoup(html, "html.parser")
-
-            # Extract full name (example: from a header element)
-            name_tag = soup.find("h1")
-            if name_tag:
-                details['full_name'] = name_tag.get_text(strip=True)
-
-            # Extract current title (example: from a subtitle div)
-            title_tag = soup.find("div", class_="top-card-layout__headline")
-            if title_tag:
-                details['current_title'] = title_tag.get_text(strip=True)
-
-            # Extract company experience (example: list items in an 'experience' section)
-            exp_section = soup.find(id="experience")
-            if exp_section:
-                exp_items = exp_section.find_all("li")
-                details['company_experience'] = [item.get_text(strip=True) for item in exp_items]
-
-            # Extract skills (example: span elements with class 'skill')
-            skills_tags = soup.find_all("span", class_="skill")
-            details['skills'] = [tag.get_text(strip=True) for tag in skills_tags]
-
-            # Extract education (example: list items in an 'education' section)
-            edu_section = soup.find(id="education")
-            if edu_section:
-                edu_items = edu_section.find_all("li")
-                details['education'] = [item.get_text(strip=True) for item in edu_items]
-
+            return parse_profile(response.content)
         except Exception as e:
             self.logger.error(f"Error extracting LinkedIn details from {profile_url}: {e}")
+            return empty_details()
+
+    def extract_linkedin_details_bulk(self, profile_urls: List[str], max_workers: int = None) -> Dict[str, Dict]:
+        """
+        Fetch and parse many LinkedIn profiles concurrently
 
-        return details
+        :param profile_urls: Profile URLs
+        :param max_workers: Profiles fetched at once, defaults to LINKEDIN_MAX_WORKERS or 8
+        :return: Details per URL, see extract_linkedin_details
+        """
+        profile_urls = list(dict.fromkeys(url for url in profile_urls if url))
+        if not profile_urls:
+            return {}
+        max_workers = max(1, max_workers or get_env_int('LINKEDIN_MAX_WORKERS', 8))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(profile_urls)),
+                                thread_name_prefix='linkedin-profile') as executor:
+            return dict(zip(profile_urls, executor.map(self.extract_linkedin_details, profile_urls)))
+
+    @staticmethod
+    def parse_saved_profiles(paths: List[str], processes: int = None) -> List[Dict]:
+        """
+        Extract details from locally saved profile pages
+
+        :param paths: HTML files
+        :param processes: Worker processes, defaults to LINKEDIN_PARSE_PROCESSES or the CPU count
+        :return: Details in the order of paths, see extract_linkedin_details
+        """
+        return parse_profile_files(paths, processes)
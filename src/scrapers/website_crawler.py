@@ -0,0 +1,183 @@
+# src/scrapers/website_crawler.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.utils.cache import PersistentCache, data_path
+from src.utils.config import get_env_float, get_env_int
+from src.utils.logger import setup_logger
+from src.utils.metrics import metrics
+from src.utils.transport import get_transport
+
+# Conditional import: lxml parses the page head in C, BeautifulSoup is the fallback
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Only the head is needed for the title and meta description
+HEAD_END = b'</head>'
+CHUNK_SIZE = 8192
+
+
+def parse_head(html: bytes) -> Dict[str, str]:
+    """
+    Extract the title and meta description from the start of a page
+
+    :param html: Page bytes, possibly cut off after the head
+    :return: Dictionary with 'title' and 'meta_description'
+    """
+    title, description = '', ''
+    if lxml is not None:
+        try:
+            document = lxml.html.fromstring(html)
+            title = document.findtext('.//title') or ''
+            for meta in document.iter('meta'):
+                if (meta.get('name') or '').strip().lower() == 'description':
+                    description = meta.get('content') or ''
+                    break
+            return {'title': title.strip(), 'meta_description': description.strip()}
+        except (ValueError, lxml.etree.LxmlError):
+            pass
+
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(['title', 'meta']))
+    if soup.title and soup.title.string:
+        title = soup.title.string
+    meta = soup.find('meta', attrs={'name': lambda name: name and name.strip().lower() == 'description'})
+    if meta is not None:
+        description = meta.get('content') or ''
+    return {'title': title.strip(), 'meta_description': description.strip()}
+
+
+class WebsiteCrawler:
+    """
+    Fetches the title and meta description of many websites concurrently.
+
+    Responses are streamed and reading stops at the end of the head (or
+    after max_bytes), so large pages cost a few kilobytes. Requests to the
+    same host are limited and spaced out. ETag and Last-Modified validators
+    are kept per URL, so crawling a page again sends a conditional GET and
+    an unchanged page costs a 304 without a body.
+    """
+
+    def __init__(self,
+                 max_workers: int = None,
+                 per_host: int = None,
+                 host_delay: float = None,
+                 max_bytes: int = None,
+                 cache: PersistentCache = None):
+        """
+        :param max_workers: Pages fetched at once, defaults to CRAWL_MAX_WORKERS or 16
+        :param per_host: Concurrent requests per host, defaults to CRAWL_PER_HOST or 2
+        :param host_delay: Minimum seconds between requests to one host, defaults to CRAWL_HOST_DELAY or 0.5
+        :param max_bytes: Bytes read per page at most, defaults to CRAWL_MAX_BYTES or 65536
+        :param cache: Optional store of validators and details, defaults to data/website_cache.sqlite3
+        """
+        self.logger = setup_logger('website_crawler')
+        self.max_workers = max(1, max_workers or get_env_int('CRAWL_MAX_WORKERS', 16))
+        self.per_host = max(1, per_host or get_env_int('CRAWL_PER_HOST', 2))
+        self.host_delay = host_delay if host_delay is not None else get_env_float('CRAWL_HOST_DELAY', 0.5)
+        self.max_bytes = max_bytes or get_env_int('CRAWL_MAX_BYTES', 64 * 1024)
+        self.cache = cache if cache is not None else PersistentCache(
+            os.getenv('WEBSITE_CACHE_PATH') or data_path('website_cache.sqlite3'),
+            namespace='website_pages',
+            ttl=get_env_float('WEBSITE_CACHE_MAX_AGE_DAYS', 30) * 86400,
+            max_entries=get_env_int('WEBSITE_CACHE_MAX_ENTRIES', 50000)
+        )
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, host: str):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.BoundedSemaphore(self.per_host), 0.0, threading.Lock()]
+            return self._hosts[host]
+
+    def _wait_for_turn(self, host: str):
+        """
+        Reserve the next request slot of a host, sleeping until it is due
+        """
+        _, _, lock = slot = self._host_slot(host)
+        with lock:
+            due = max(slot[1], time.monotonic())
+            slot[1] = due + self.host_delay
+        time.sleep(max(0.0, due - time.monotonic()))
+
+    def crawl(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Fetch many pages concurrently
+
+        :param urls: Page URLs
+        :return: Details per URL; pages that could not be fetched map to an empty dict
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)),
+                                thread_name_prefix='crawl') as executor:
+            return dict(zip(urls, executor.map(self.fetch, urls)))
+
+    def fetch(self, url: str) -> Dict:
+        """
+        Fetch the details of one page
+
+        :param url: Page URL
+        :return: Dictionary with 'url', 'title' and 'meta_description', empty on failure
+        """
+        host = urlsplit(url).netloc.lower()
+        cached = self.cache.get(url)
+        headers = {'User-Agent': USER_AGENT}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        semaphore = self._host_slot(host)[0]
+        try:
+            with semaphore:
+                self._wait_for_turn(host)
+                with metrics.time_call('website') as call:
+                    response = get_transport().get(url, headers=headers, endpoint='website', stream=True)
+                    call.error = not response.ok
+                    try:
+                        if cached:
+                            # Hits are pages the server confirmed unchanged
+                            metrics.record_cache('website_revalidation', hit=response.status_code == 304)
+                        if response.status_code == 304 and cached:
+                            return dict(cached['details'])
+                        response.raise_for_status()
+                        head = self._read_head(response)
+                    finally:
+                        response.close()
+        except requests.RequestException as e:
+            self.logger.warning(f"Could not fetch website details for {url}: {e}")
+            return {}
+
+        details = dict(parse_head(head), url=url)
+        validators = {'etag': response.headers.get('ETag'),
+                      'last_modified': response.headers.get('Last-Modified')}
+        if validators['etag'] or validators['last_modified']:
+            self.cache.set(url, dict(validators, details=details))
+        return details
+
+    def _read_head(self, response) -> bytes:
+        """
+        Read the body until the head is complete or max_bytes are in
+        """
+        body = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            # Look a few bytes back so a tag split across chunks is still found
+            search_from = max(0, len(body) - len(HEAD_END))
+            body.extend(chunk)
+            if bytes(body[search_from:]).lower().find(HEAD_END) != -1 or len(body) >= self.max_bytes:
+                break
+        return bytes(body[:self.max_bytes])
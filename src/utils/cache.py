@@ -0,0 +1,167 @@
+# src/utils/cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from src.utils.metrics import metrics
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def data_path(filename: str) -> str:
+    """
+    Resolve a file inside the project data directory
+
+    :param filename: File name relative to the data directory
+    :return: Absolute path, honouring the COHESIVE_DATA_DIR override
+    """
+    data_dir = os.getenv('COHESIVE_DATA_DIR') or os.path.join(PROJECT_ROOT, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, filename)
+
+
+class PersistentCache:
+    """
+    Small SQLite-backed key/value cache with JSON values.
+
+    Entries older than ``ttl`` seconds are treated as misses. Once the table
+    grows past ``max_entries`` the least recently used rows are evicted.
+    """
+
+    # Run the eviction check once every N writes instead of on every write
+    EVICTION_INTERVAL = 100
+
+    def __init__(self,
+                 path: str,
+                 namespace: str = 'cache',
+                 ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        """
+        :param path: SQLite database file, or ':memory:'
+        :param namespace: Table name used for this cache
+        :param ttl: Freshness window in seconds, None keeps entries forever
+        :param max_entries: Maximum number of rows kept, None disables eviction
+        """
+        if not namespace.replace('_', '').isalnum():
+            raise ValueError(f"Invalid cache namespace: {namespace}")
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {namespace} ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._conn.execute(
+                f'CREATE INDEX IF NOT EXISTS {namespace}_accessed ON {namespace} (accessed_at)'
+            )
+
+    def get_entry(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        """
+        Fetch a fresh entry together with the time it was stored
+
+        :param key: Cache key
+        :param max_age: Freshness override in seconds, defaults to the cache TTL
+        :return: Tuple of (value, stored_at epoch seconds) or None on a miss
+        """
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT value, stored_at FROM {self.namespace} WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or (max_age is not None and now - row[1] > max_age):
+                self.misses += 1
+                metrics.record_cache(self.namespace, hit=False)
+                return None
+            with self._conn:
+                self._conn.execute(
+                    f'UPDATE {self.namespace} SET accessed_at = ? WHERE key = ?', (now, key)
+                )
+            self.hits += 1
+        metrics.record_cache(self.namespace, hit=True)
+        return json.loads(row[0]), row[1]
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Any:
+        """
+        Fetch a fresh value
+
+        :param key: Cache key
+        :param max_age: Freshness override in seconds, defaults to the cache TTL
+        :return: Cached value or None on a miss
+        """
+        entry = self.get_entry(key, max_age)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None):
+        """
+        Store a JSON-serialisable value
+
+        :param key: Cache key
+        :param value: Value to store
+        :param stored_at: Optional epoch timestamp, defaults to now
+        """
+        now = time.time()
+        stored_at = now if stored_at is None else stored_at
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    f'INSERT OR REPLACE INTO {self.namespace} (key, value, stored_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value), stored_at, now)
+                )
+            self._writes += 1
+            if self.max_entries and (self._writes - 1) % self.EVICTION_INTERVAL == 0:
+                self._evict()
+
+    def delete(self, key: str):
+        """
+        Remove a single entry
+
+        :param key: Cache key
+        """
+        with self._lock, self._conn:
+            self._conn.execute(f'DELETE FROM {self.namespace} WHERE key = ?', (key,))
+
+    def _evict(self):
+        with self._conn:
+            if self.ttl is not None:
+                self._conn.execute(
+                    f'DELETE FROM {self.namespace} WHERE stored_at < ?', (time.time() - self.ttl,)
+                )
+            count = self._conn.execute(f'SELECT COUNT(*) FROM {self.namespace}').fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    f'DELETE FROM {self.namespace} WHERE key IN ('
+                    f'SELECT key FROM {self.namespace} ORDER BY accessed_at ASC LIMIT ?)',
+                    (overflow,)
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM {self.namespace}').fetchone()[0]
+
+    def stats(self) -> dict:
+        """
+        :return: Hit/miss counters and current size
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self)
+        }
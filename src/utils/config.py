@@ -0,0 +1,68 @@
+# src/utils/config.py
+import os
+
+
+def get_env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from the environment
+
+    :param name: Environment variable name
+    :param default: Value used when the variable is unset or malformed
+    :return: Integer setting
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def get_env_float(name: str, default: float) -> float:
+    """
+    Read a float setting from the environment
+
+    :param name: Environment variable name
+    :param default: Value used when the variable is unset or malformed
+    :return: Float setting
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def get_env_bool(name: str, default: bool) -> bool:
+    """
+    Read a boolean setting from the environment
+
+    :param name: Environment variable name
+    :param default: Value used when the variable is unset
+    :return: Boolean setting
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_env_mapping(name: str, default: dict = None) -> dict:
+    """
+    Read a 'key=number,key=number' setting from the environment
+
+    :param name: Environment variable name
+    :param default: Values used for keys the variable does not set
+    :return: Mapping of key to float, malformed entries are ignored
+    """
+    values = dict(default or {})
+    for pair in filter(None, (part.strip() for part in (os.getenv(name) or '').split(','))):
+        key, _, value = pair.partition('=')
+        try:
+            values[key.strip()] = float(value)
+        except ValueError:
+            continue
+    return values
@@ -0,0 +1,193 @@
+# src/utils/dns_bulk.py
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import dns.asyncresolver
+import dns.nameserver
+import dns.resolver
+
+from src.utils.config import get_env_bool, get_env_float, get_env_int
+from src.utils.dns_cache import MXRecordCache, mx_cache, mx_hosts_from_answer, unpack_result
+from src.utils.logger import setup_logger
+from src.utils.metrics import metrics
+from src.utils.transport import get_transport
+
+
+class BulkMXResolver:
+    """
+    Resolves the mail hosts of many domains concurrently.
+
+    Lookups run on dnspython's asyncio resolver with a bounded number of
+    queries in flight. Domains without MX records fall back to their A/AAAA
+    records (RFC 5321 implicit MX). Results are shared with the process-wide
+    MXRecordCache, so later per-address checks of the same domains are cache
+    hits, and go through the shared transport so they can be recorded and
+    replayed like single lookups.
+    """
+
+    def __init__(self,
+                 nameservers: List[str] = None,
+                 timeout: float = None,
+                 concurrency: int = None,
+                 a_fallback: bool = None,
+                 cache: MXRecordCache = None):
+        """
+        :param nameservers: Resolver addresses, optionally 'host:port' or '[v6]:port', defaults to
+            DNS_NAMESERVERS or the system configuration
+        :param timeout: Seconds allowed per query, defaults to DNS_TIMEOUT or 5
+        :param concurrency: Queries in flight, defaults to DNS_CONCURRENCY or 200
+        :param a_fallback: Treat domains with only A/AAAA records as their own mail host,
+            defaults to DNS_A_FALLBACK or on
+        :param cache: MX cache to read and fill, defaults to the shared one
+        """
+        self.logger = setup_logger('dns_bulk')
+        if nameservers is None:
+            nameservers = [server.strip() for server in os.getenv('DNS_NAMESERVERS', '').split(',')
+                           if server.strip()]
+        self.nameservers = nameservers or None
+        self.timeout = timeout or get_env_float('DNS_TIMEOUT', 5.0)
+        self.concurrency = max(1, concurrency or get_env_int('DNS_CONCURRENCY', 200))
+        self.a_fallback = a_fallback if a_fallback is not None else get_env_bool('DNS_A_FALLBACK', True)
+        self.cache = cache or mx_cache
+
+    def _resolver(self) -> dns.asyncresolver.Resolver:
+        resolver = dns.asyncresolver.Resolver(configure=self.nameservers is None)
+        if self.nameservers is not None:
+            resolver.nameservers = [_nameserver(server) for server in self.nameservers]
+        resolver.timeout = self.timeout
+        resolver.lifetime = self.timeout
+        return resolver
+
+    def resolve(self, domains: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Resolve domains from synchronous code
+
+        :param domains: Domains to resolve
+        :return: Mapping of domain to MX hosts, see resolve_async
+        """
+        domains = list(domains)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.resolve_async(domains))
+
+        # Called from inside an event loop; run on a private loop instead of blocking it
+        results = {}
+
+        def run():
+            results.update(asyncio.run(self.resolve_async(domains)))
+
+        worker = threading.Thread(target=run, name='dns-bulk')
+        worker.start()
+        worker.join()
+        return results
+
+    async def resolve_async(self, domains: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Resolve the mail hosts of many domains
+
+        :param domains: Domains to resolve
+        :return: Mapping of lower-cased domain to MX hosts ordered by preference; empty
+            for domains that accept no mail. Domains whose lookup failed (timeouts,
+            unreachable nameservers) are left out.
+        """
+        results = {}
+        pending = []
+        for domain in dict.fromkeys(domain.strip().lower().rstrip('.') for domain in domains):
+            if not domain:
+                continue
+            cached = self.cache.peek(domain, a_fallback=self.a_fallback)
+            if cached is not None:
+                results[domain] = cached
+            else:
+                pending.append(domain)
+        if not pending:
+            return results
+
+        transport = get_transport()
+        resolver = self._resolver() if transport.mode != 'replay' else None
+        limit = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+
+        async def resolve_one(domain):
+            async with limit:
+                try:
+                    if transport.mode == 'replay':
+                        # Served from the cassette like MXRecordCache lookups
+                        hosts, ttl, implicit = unpack_result(transport.call('dns', f'MX {domain}', None))
+                    else:
+                        with metrics.time_call('dns'):
+                            hosts, ttl, implicit = await self._query(resolver, domain)
+                        transport.call('dns', f'MX {domain}', lambda: [hosts, ttl, implicit])
+                except Exception as e:
+                    self.logger.warning(f"MX lookup failed for {domain}: {e or type(e).__name__}")
+                    return
+            # Failed domains are counted by the lookup that resolves them later
+            self.cache.count_miss()
+            self.cache.store(domain, hosts, ttl, implicit)
+            results[domain] = list(hosts) if self.a_fallback or not implicit else []
+
+        await asyncio.gather(*(resolve_one(domain) for domain in pending))
+        self.logger.info(f"Resolved {len(pending)} domains in {time.perf_counter() - started:.2f}s, "
+                         f"{len(pending) - sum(domain in results for domain in pending)} failed")
+        return results
+
+    @staticmethod
+    async def _query(resolver, domain: str):
+        """
+        :return: Tuple of (MX hosts, TTL, implicit), with the domain itself as host and
+            implicit set when only address records exist
+        """
+        try:
+            return (*mx_hosts_from_answer(await resolver.resolve(domain, 'MX')), False)
+        except dns.resolver.NXDOMAIN:
+            return [], None, False
+        except dns.resolver.NoAnswer:
+            pass
+        # Always checked, so the shared cache can answer callers with and without the fallback
+        for record_type in ('A', 'AAAA'):
+            try:
+                answer = await resolver.resolve(domain, record_type)
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                continue
+            return [domain], answer.rrset.ttl if answer.rrset is not None else None, True
+        return [], None, False
+
+
+def _nameserver(server: str):
+    """
+    :param server: Address such as '10.0.0.2', '127.0.0.1:5353' or '[::1]:5353'
+    :return: Address string, or a nameserver object when a port is given
+    """
+    if server.startswith('['):
+        host, _, port = server[1:].partition(']:')
+    elif server.count(':') == 1:
+        host, _, port = server.partition(':')
+    else:
+        return server
+    return dns.nameserver.Do53Nameserver(host, int(port)) if port else host
+
+
+def resolve_mx_bulk(domains: Iterable[str], **options) -> Dict[str, List[str]]:
+    """
+    Resolve the mail hosts of many domains with a BulkMXResolver
+
+    :param domains: Domains to resolve
+    :param options: BulkMXResolver settings
+    :return: Mapping of domain to MX hosts
+    """
+    return BulkMXResolver(**options).resolve(domains)
+
+
+def mx_for_domain(mx_hosts: Optional[Dict[str, List[str]]], domain: str) -> Optional[List[str]]:
+    """
+    :param mx_hosts: Mapping returned by resolve_mx_bulk
+    :param domain: Domain to look up
+    :return: MX hosts of the domain, or None when the mapping does not cover it
+    """
+    if not mx_hosts:
+        return None
+    return mx_hosts.get(domain.strip().lower().rstrip('.'))
@@ -0,0 +1,230 @@
+# src/utils/dns_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import dns.resolver
+
+from src.utils.config import get_env_float, get_env_int
+from src.utils.metrics import metrics
+from src.utils.transport import get_transport
+
+
+class MXRecordCache:
+    """
+    Thread-safe in-process cache of MX lookups.
+
+    Positive answers are kept for the TTL of the returned record set, while
+    NXDOMAIN/NoAnswer results are kept for a bounded negative TTL. Concurrent
+    lookups for the same domain wait for the first one instead of hitting
+    the resolver again. Expired entries are dropped when they are next
+    read, and the least recently used ones once max_entries is reached.
+
+    Domains without MX records are also checked for an address record,
+    which RFC 5321 treats as an implicit MX. Such results are cached but
+    only returned to callers that ask for the fallback, so lookups are
+    MX-only by default.
+    """
+
+    def __init__(self,
+                 negative_ttl: float = None,
+                 min_ttl: float = 30.0,
+                 max_ttl: float = 86400.0,
+                 max_entries: int = None):
+        """
+        :param negative_ttl: Seconds to remember domains without MX records
+        :param min_ttl: Lower bound applied to record TTLs
+        :param max_ttl: Upper bound applied to record TTLs
+        :param max_entries: Domains kept at most, defaults to MX_CACHE_MAX_ENTRIES or 100000
+        """
+        self.negative_ttl = (negative_ttl if negative_ttl is not None
+                             else get_env_float('MX_CACHE_NEGATIVE_TTL', 300.0))
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.max_entries = max(1, max_entries or get_env_int('MX_CACHE_MAX_ENTRIES', 100000))
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, domain: str, a_fallback: bool = False) -> List[str]:
+        """
+        Return the MX hosts of a domain, ordered by preference
+
+        :param domain: Domain to resolve
+        :param a_fallback: Return the domain itself when it has no MX but an A/AAAA record
+        :return: List of MX hostnames, empty when the domain has no MX records
+        :raises dns.exception.DNSException: For resolver failures other than NXDOMAIN/NoAnswer
+        """
+        domain = domain.strip().lower().rstrip('.')
+        while True:
+            with self._lock:
+                entry = self._live_entry(domain)
+                if entry is not None:
+                    self._count(hit=True)
+                    return _hosts(entry, a_fallback)
+                event = self._in_flight.get(domain)
+                if event is None:
+                    # This thread owns the lookup
+                    event = threading.Event()
+                    self._in_flight[domain] = event
+                    self._count(hit=False)
+                    break
+            # Another thread is resolving the same domain
+            event.wait()
+            with self._lock:
+                entry = self._live_entry(domain)
+                if entry is not None:
+                    self._count(hit=True)
+                    return _hosts(entry, a_fallback)
+            # The owner failed without caching anything, so resolve again
+
+        try:
+            hosts, ttl, implicit = self._resolve(domain)
+            self.store(domain, hosts, ttl, implicit)
+            return list(hosts) if a_fallback or not implicit else []
+        finally:
+            with self._lock:
+                self._in_flight.pop(domain, None)
+            event.set()
+
+    def peek(self, domain: str, a_fallback: bool = False) -> Optional[List[str]]:
+        """
+        Return cached MX hosts without resolving
+
+        Only hits are counted; a miss is counted by whoever resolves the domain.
+
+        :param domain: Domain to look up
+        :param a_fallback: Return the domain itself when it has no MX but an A/AAAA record
+        :return: List of MX hostnames, or None when the domain is not cached
+        """
+        domain = domain.strip().lower().rstrip('.')
+        with self._lock:
+            entry = self._live_entry(domain)
+            if entry is None:
+                return None
+            self._count(hit=True)
+            return _hosts(entry, a_fallback)
+
+    def store(self, domain: str, hosts: List[str], ttl: Optional[float] = None, implicit: bool = False):
+        """
+        Insert a resolution result into the cache
+
+        :param domain: Resolved domain
+        :param hosts: MX hostnames, empty for a negative result
+        :param ttl: Record TTL in seconds, the negative TTL is used for empty results
+        :param implicit: The only host is the domain itself, from an A/AAAA record
+        """
+        domain = domain.strip().lower().rstrip('.')
+        if hosts:
+            ttl = min(max(ttl if ttl is not None else self.min_ttl, self.min_ttl), self.max_ttl)
+        else:
+            ttl = self.negative_ttl
+        with self._lock:
+            self._entries[domain] = (tuple(hosts), time.monotonic() + ttl, bool(hosts) and implicit)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def count_miss(self):
+        """
+        Count a miss for a domain resolved outside lookup(), e.g. by the bulk resolver
+        """
+        with self._lock:
+            self._count(hit=False)
+
+    def _live_entry(self, domain: str) -> Optional[tuple]:
+        # Called with the lock held
+        entry = self._entries.get(domain)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[domain]
+            return None
+        self._entries.move_to_end(domain)
+        return entry
+
+    def _count(self, hit: bool):
+        # Called with the lock held
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        metrics.record_cache('mx', hit=hit)
+
+    def _resolve(self, domain: str):
+        # Lookups go through the shared transport so they can be recorded and replayed
+        with metrics.time_call('dns'):
+            return unpack_result(get_transport().call('dns', f'MX {domain}', lambda: self._query(domain)))
+
+    @staticmethod
+    def _query(domain: str):
+        """
+        :return: List of (MX hosts, TTL, implicit), with the domain itself as host and
+            implicit set when only address records exist
+        """
+        try:
+            answer = dns.resolver.resolve(domain, 'MX')
+        except dns.resolver.NXDOMAIN:
+            return [[], None, False]
+        except dns.resolver.NoAnswer:
+            for record_type in ('A', 'AAAA'):
+                try:
+                    answer = dns.resolver.resolve(domain, record_type)
+                except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                    continue
+                return [[domain], answer.rrset.ttl if answer.rrset is not None else None, True]
+            return [[], None, False]
+        return [*mx_hosts_from_answer(answer), False]
+
+    def stats(self) -> Dict:
+        """
+        :return: Hit/miss counters and current size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries)
+            }
+
+    def clear(self):
+        """
+        Drop all cached entries and reset counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def unpack_result(result):
+    """
+    :param result: Recorded lookup result, [hosts, ttl] or [hosts, ttl, implicit]
+    :return: Tuple of (hosts, TTL, implicit)
+    """
+    hosts, ttl, *rest = result
+    return hosts, ttl, bool(rest and rest[0])
+
+
+def _hosts(entry: tuple, a_fallback: bool) -> List[str]:
+    return list(entry[0]) if a_fallback or not entry[2] else []
+
+
+def mx_hosts_from_answer(answer):
+    """
+    :param answer: dnspython answer to an MX query
+    :return: Tuple of (hosts ordered by preference, TTL)
+    """
+    records = sorted(answer, key=lambda record: record.preference)
+    # A null MX (RFC 7505) resolves to the root and means no mail is accepted
+    hosts = [str(record.exchange).rstrip('.') for record in records if str(record.exchange) != '.']
+    return hosts, answer.rrset.ttl if answer.rrset is not None else None
+
+
+# Process-wide cache shared by every EmailGenerator
+mx_cache = MXRecordCache()
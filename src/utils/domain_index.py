@@ -0,0 +1,108 @@
+# src/utils/domain_index.py
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+from src.utils.cache import PersistentCache, data_path
+
+# Hosts whose pages describe many companies; their results never share a stored lead.
+# DOMAIN_INDEX_SHARED_HOSTS adds more, comma separated
+SHARED_HOSTS = {
+    'linkedin.com', 'crunchbase.com', 'facebook.com', 'twitter.com', 'x.com',
+    'instagram.com', 'youtube.com', 'github.com', 'medium.com', 'wikipedia.org',
+    'glassdoor.com', 'indeed.com', 'yelp.com', 'bloomberg.com', 'zoominfo.com',
+    'builtin.com', 'builtinsf.com', 'wellfound.com', 'angel.co', 'g2.com',
+    'clutch.co', 'producthunt.com', 'techcrunch.com', 'google.com'
+}
+
+
+def normalize_domain(domain: str) -> str:
+    """
+    Normalize a company domain for indexing
+
+    :param domain: Host name, e.g. 'www.Example.com:443'
+    :return: Lower-case host without port or leading 'www.'
+    """
+    domain = (domain or '').strip().lower().split(':')[0].rstrip('.')
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
+
+
+def normalize_company_name(name: str) -> str:
+    """
+    Normalize a company name for indexing
+
+    :param name: Company name or search result title, e.g. 'Acme, Inc.'
+    :return: Lower-case words without punctuation, e.g. 'acme inc'
+    """
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', (name or '').lower()).split())
+
+
+class DomainIndex:
+    """
+    Cross-run index of processed companies, keyed by normalized domain and
+    company name.
+
+    Each entry holds the lead produced for the company and the time it was
+    processed, so overlapping queries can reuse or skip companies instead
+    of paying for enrichment, verification and LinkedIn lookups again.
+    Results on shared hosts such as linkedin.com or crunchbase.com are
+    never indexed, since one domain stands for many companies there.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: SQLite database file, defaults to DOMAIN_INDEX_PATH or data/domain_index.sqlite3
+        """
+        self.store = PersistentCache(
+            path or os.getenv('DOMAIN_INDEX_PATH') or data_path('domain_index.sqlite3'),
+            namespace='domain_index'
+        )
+        self.shared_hosts = SHARED_HOSTS | {
+            normalize_domain(host) for host in os.getenv('DOMAIN_INDEX_SHARED_HOSTS', '').split(',')
+            if host.strip()
+        }
+
+    def is_shared(self, domain: str) -> bool:
+        """
+        :param domain: Normalized domain
+        :return: Whether the domain, or a domain it belongs to, hosts pages of many companies
+        """
+        parts = domain.split('.')
+        return any('.'.join(parts[index:]) in self.shared_hosts for index in range(len(parts) - 1))
+
+    def _key(self, domain: str, company_name: str) -> Optional[str]:
+        domain = normalize_domain(domain)
+        name = normalize_company_name(company_name)
+        if not domain or not name or self.is_shared(domain):
+            return None
+        return f'{domain} {name}'
+
+    def lookup(self, domain: str, company_name: str, max_age_days: float = None) -> Optional[Tuple[Dict, float]]:
+        """
+        Find the stored lead of a company
+
+        :param domain: Company domain
+        :param company_name: Company name, as taken from the search result title
+        :param max_age_days: Ignore entries older than this many days
+        :return: Tuple of (lead, processed_at epoch seconds), or None when the company
+            is unknown or its domain is a shared host
+        """
+        key = self._key(domain, company_name)
+        if key is None:
+            return None
+        max_age = max_age_days * 86400 if max_age_days is not None else None
+        return self.store.get_entry(key, max_age=max_age)
+
+    def record(self, domain: str, company_name: str, lead: Dict):
+        """
+        Store the lead produced for a company
+
+        :param domain: Company domain
+        :param company_name: Company name, as taken from the search result title
+        :param lead: Lead entry
+        """
+        key = self._key(domain, company_name)
+        if key is not None:
+            self.store.set(key, lead)
@@ -0,0 +1,223 @@
+# src/utils/job_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from src.utils.cache import data_path
+
+
+def new_job_id() -> str:
+    """
+    :return: Fresh, short job identifier
+    """
+    return uuid.uuid4().hex[:12]
+
+
+class JobStore:
+    """
+    SQLite-backed record of lead-generation jobs.
+
+    Every search result of a job is stored with its position, and every
+    stage output is written as soon as that stage finishes, so a job can
+    be resumed after a crash without repeating paid API calls.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: SQLite database file, defaults to JOB_STORE_PATH or data/jobs.sqlite3
+        """
+        self.path = path or os.getenv('JOB_STORE_PATH') or data_path('jobs.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            if self.path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'job_id TEXT PRIMARY KEY, params TEXT NOT NULL, status TEXT NOT NULL, '
+                'search_complete INTEGER NOT NULL DEFAULT 0, spreadsheet_id TEXT, '
+                'created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS job_results ('
+                'job_id TEXT NOT NULL, idx INTEGER NOT NULL, result TEXT NOT NULL, '
+                'PRIMARY KEY (job_id, idx))'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS job_stages ('
+                'job_id TEXT NOT NULL, idx INTEGER NOT NULL, stage TEXT NOT NULL, '
+                'output TEXT NOT NULL, completed_at REAL NOT NULL, '
+                'PRIMARY KEY (job_id, idx, stage))'
+            )
+
+    def create_job(self, params: Dict, job_id: str = None) -> str:
+        """
+        Register a new job
+
+        :param params: Job parameters (query, location, number of results)
+        :param job_id: Optional identifier, generated when omitted
+        :return: Job ID
+        """
+        job_id = job_id or new_job_id()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO jobs (job_id, params, status, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (job_id, json.dumps(params), 'running', now, now)
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        :param job_id: Job ID
+        :return: Job record, or None for unknown jobs
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT job_id, params, status, search_complete, spreadsheet_id, created_at, updated_at '
+                'FROM jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'job_id': row[0],
+            'params': json.loads(row[1]),
+            'status': row[2],
+            'search_complete': bool(row[3]),
+            'spreadsheet_id': row[4],
+            'created_at': row[5],
+            'updated_at': row[6]
+        }
+
+    def update_job(self, job_id: str, **fields):
+        """
+        Update job columns (status, search_complete, spreadsheet_id)
+
+        :param job_id: Job ID
+        :param fields: Column values to set
+        """
+        allowed = {'status', 'search_complete', 'spreadsheet_id'}
+        unknown = set(fields) - allowed
+        if unknown:
+            raise ValueError(f"Unknown job fields: {sorted(unknown)}")
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f'UPDATE jobs SET {assignments}, updated_at = ? WHERE job_id = ?',
+                (*fields.values(), time.time(), job_id)
+            )
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        """
+        :param limit: Maximum number of jobs returned
+        :return: Most recently updated jobs
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT job_id FROM jobs ORDER BY updated_at DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [self.get_job(row[0]) for row in rows]
+
+    def record_result(self, job_id: str, idx: int, result: Dict):
+        """
+        Store a search result at its position in the job
+
+        :param job_id: Job ID
+        :param idx: Position of the result
+        :param result: Processed search result
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO job_results (job_id, idx, result) VALUES (?, ?, ?)',
+                (job_id, idx, json.dumps(result))
+            )
+
+    def results(self, job_id: str) -> List[Dict]:
+        """
+        :param job_id: Job ID
+        :return: Stored search results in their original order
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT result FROM job_results WHERE job_id = ? ORDER BY idx', (job_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def record_stage(self, job_id: str, idx: int, stage: str, output: Any):
+        """
+        Store the output of a finished stage for one company
+
+        :param job_id: Job ID
+        :param idx: Position of the company in the job
+        :param stage: Stage name
+        :param output: JSON-serialisable stage output
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO job_stages (job_id, idx, stage, output, completed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (job_id, idx, stage, json.dumps(output), time.time())
+            )
+
+    def clear_stages(self, job_id: str, idx: int):
+        """
+        Forget the stage outputs of one company, e.g. when its position now holds another company
+
+        :param job_id: Job ID
+        :param idx: Position of the company in the job
+        """
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM job_stages WHERE job_id = ? AND idx = ?', (job_id, idx))
+
+    def stage_outputs(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        """
+        :param job_id: Job ID
+        :return: Mapping of company position to {stage: output}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT idx, stage, output FROM job_stages WHERE job_id = ?', (job_id,)
+            ).fetchall()
+        outputs = {}
+        for idx, stage, output in rows:
+            outputs.setdefault(idx, {})[stage] = json.loads(output)
+        return outputs
+
+
+class CompanyCheckpoint:
+    """
+    Stage outputs of one company within a job
+    """
+
+    def __init__(self, store: JobStore, job_id: str, idx: int, outputs: Dict[str, Any] = None):
+        """
+        :param store: JobStore the outputs are written to
+        :param job_id: Job ID
+        :param idx: Position of the company in the job
+        :param outputs: Stage outputs recorded by a previous attempt
+        """
+        self.store = store
+        self.job_id = job_id
+        self.idx = idx
+        self.outputs = dict(outputs or {})
+
+    def has(self, stage: str) -> bool:
+        return stage in self.outputs
+
+    def get(self, stage: str, default: Any = None) -> Any:
+        return self.outputs.get(stage, default)
+
+    def save(self, stage: str, output: Any):
+        """
+        Record a finished stage
+
+        :param stage: Stage name
+        :param output: JSON-serialisable stage output
+        """
+        self.outputs[stage] = output
+        self.store.record_stage(self.job_id, self.idx, stage, output)
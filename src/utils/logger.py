@@ -1,11 +1,197 @@
 # src/utils/logger.py
+import atexit
+import gzip
+import itertools
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
+import threading
+from datetime import datetime, timezone
+
+from src.utils.config import get_env_bool, get_env_int
+
+# Default sampling of high-volume events, overridden by LOG_SAMPLE_RATES
+DEFAULT_SAMPLE_RATES = {
+    'email_verification': 0.1
+}
+
+_lock = threading.Lock()
+_queue = queue.SimpleQueue()
+_listener = None
+_handlers = {}
+# Set once the background writer is stopped; from then on loggers write synchronously
+_shut_down = False
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as single-line JSON objects
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        event = getattr(record, 'event', None)
+        if event:
+            entry['event'] = event
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the records tagged with extra={'event': ...}
+
+    Sampling is deterministic: with a rate of 0.1 every tenth record of an
+    event is kept. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, event: str, rate: float):
+        """
+        :param event: Event name
+        :param rate: Fraction of records kept, between 0 and 1
+        """
+        with self._lock:
+            self.rates[event] = max(0.0, min(1.0, rate))
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        rate = self.rates.get(event, 1.0) if event else 1.0
+        if rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if rate <= 0.0:
+            return False
+        with self._lock:
+            counter = self._counters.setdefault(event, itertools.count())
+            position = next(counter)
+        return position % round(1 / rate) == 0
+
+
+def _parse_sample_rates(spec: str) -> dict:
+    """
+    Parse 'event=rate,event=rate' settings, ignoring malformed entries
+    """
+    rates = {}
+    for pair in filter(None, (part.strip() for part in (spec or '').split(','))):
+        event, _, rate = pair.partition('=')
+        try:
+            rates[event.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+sampler = SamplingFilter(dict(DEFAULT_SAMPLE_RATES, **_parse_sample_rates(os.getenv('LOG_SAMPLE_RATES'))))
+
+
+def _compressing_rotator(source, dest):
+    # Rotated files are gzipped in the writer thread, never on the caller's
+    with open(source, 'rb') as plain, gzip.open(dest, 'wb') as compressed:
+        shutil.copyfileobj(plain, compressed)
+    os.remove(source)
+
+
+def _file_handler(name: str) -> logging.Handler:
+    """
+    Size-rotated log file, LOG_DIR/<name>.log
+    """
+    log_dir = os.getenv('LOG_DIR') or '.'
+    os.makedirs(log_dir, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, f'{name}.log'),
+        maxBytes=get_env_int('LOG_MAX_BYTES', 10 * 1024 * 1024),
+        backupCount=get_env_int('LOG_BACKUP_COUNT', 5),
+        encoding='utf-8',
+        delay=True
+    )
+    if get_env_bool('LOG_COMPRESS', True):
+        handler.namer = lambda default_name: f'{default_name}.gz'
+        handler.rotator = _compressing_rotator
+    return handler
+
+
+class _RoutingHandler(logging.Handler):
+    """
+    Hands records from the shared queue to the handlers of their logger
+    """
+
+    def handle(self, record):
+        handlers = _handlers.get(record.name, (None, []))[1]
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+def _ensure_listener():
+    global _listener
+    if _listener is None:
+        _listener = logging.handlers.QueueListener(_queue, _RoutingHandler())
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Write out every queued record and stop the background writer
+
+    Loggers are switched to their handlers directly first, so records logged
+    afterwards, e.g. by cleanup code during interpreter shutdown, are still written.
+    """
+    global _listener, _shut_down
+    with _lock:
+        _shut_down = True
+        listener, _listener = _listener, None
+        for name, (_, handlers) in _handlers.items():
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                if isinstance(handler, logging.handlers.QueueHandler):
+                    logger.removeHandler(handler)
+            for handler in handlers:
+                if handler not in logger.handlers:
+                    logger.addHandler(handler)
+        all_handlers = [handler for _, handlers in _handlers.values() for handler in handlers]
+    if listener is not None:
+        listener.stop()
+    for handler in all_handlers:
+        try:
+            handler.flush()
+        except (OSError, ValueError):
+            # The console stream may already be closed
+            pass
+
 
 def setup_logger(name, level=logging.DEBUG):
     """
     Create a logger with console and file output
-    
+
+    By default records are put on a queue and written by one background
+    thread shared by all loggers (LOG_ASYNC), so logging never blocks on
+    I/O. Files are rotated by size (LOG_MAX_BYTES, LOG_BACKUP_COUNT) and
+    gzipped (LOG_COMPRESS); LOG_FORMAT=json writes JSON lines.
+    Records tagged with extra={'event': ...} are sampled per LOG_SAMPLE_RATES.
+
     :param name: Name of the logger
     :param level: Logging level
     :return: Configured logger instance
@@ -13,28 +199,48 @@ def setup_logger(name, level=logging.DEBUG):
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
-    # Clear any existing handlers
-    logger.handlers.clear()
-    
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    
-    # Create file handler
-    file_handler = logging.FileHandler(f'{name}.log')
-    file_handler.setLevel(level)
-    
-    # Create formatters
-    console_formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
-    # Set formatters
-    console_handler.setFormatter(console_formatter)
-    file_handler.setFormatter(file_formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
-    return logger
\ No newline at end of file
+
+    async_mode = get_env_bool('LOG_ASYNC', True)
+    json_format = os.getenv('LOG_FORMAT', 'text').strip().lower() == 'json'
+    settings = (level, async_mode, json_format, os.getenv('LOG_DIR'), get_env_bool('LOG_CONSOLE', True))
+
+    with _lock:
+        # Loggers are set up again by every new scraper or generator; keep the open handlers
+        if _handlers.get(name, (None,))[0] == settings and logger.handlers:
+            return logger
+
+        # Clear any existing handlers
+        logger.handlers.clear()
+        for handler in _handlers.pop(name, (None, []))[1]:
+            handler.close()
+
+        handlers = []
+
+        # Create console handler
+        if settings[-1]:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(level)
+            console_handler.setFormatter(logging.Formatter('%(name)s - %(levelname)s - %(message)s'))
+            handlers.append(console_handler)
+
+        # Create file handler
+        file_handler = _file_handler(name)
+        file_handler.setLevel(level)
+        if json_format:
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        handlers.append(file_handler)
+
+        _handlers[name] = (settings, handlers)
+        if async_mode and not _shut_down:
+            _ensure_listener()
+            logger.addHandler(logging.handlers.QueueHandler(_queue))
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
+
+    if sampler not in logger.filters:
+        logger.addFilter(sampler)
+
+    return logger
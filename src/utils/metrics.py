@@ -0,0 +1,330 @@
+# src/utils/metrics.py
+import bisect
+import copy
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+# Histogram bucket upper bounds in seconds, from fast cache hits to slow model calls
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_PREFIX = 'cohesive'
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram with Prometheus semantics
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        # One counter per bucket plus the +Inf overflow bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        # Largest observation, or None when unknown, as for the difference of two snapshots
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def minus(self, earlier: Optional['Histogram']) -> 'Histogram':
+        """
+        :param earlier: Snapshot of the same histogram taken before
+        :return: Histogram of the observations made since the snapshot, without a max
+        """
+        delta = copy.deepcopy(self)
+        if earlier is not None:
+            delta.counts = [now - then for now, then in zip(self.counts, earlier.counts)]
+            delta.count -= earlier.count
+            delta.sum -= earlier.sum
+            # The largest value may have been observed before the snapshot
+            delta.max = None
+        return delta
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation inside its bucket
+
+        :param q: Quantile between 0 and 1
+        :return: Estimated value in seconds
+        """
+        if not self.count:
+            return 0.0
+        # Without a known max the +Inf bucket is reported at the highest bound, as Prometheus does
+        ceiling = self.max if self.max is not None else self.buckets[-1]
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else ceiling
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, ceiling)
+            seen += bucket_count
+        return ceiling
+
+    def summary(self) -> Dict:
+        summary = {
+            'count': self.count,
+            'total_seconds': round(self.sum, 4),
+            'mean_ms': round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 2),
+            'p99_ms': round(self.quantile(0.99) * 1000, 2)
+        }
+        if self.max is not None:
+            summary['max_ms'] = round(self.max * 1000, 2)
+        return summary
+
+
+class CallTimer:
+    """
+    Handle yielded by MetricsRegistry.time_call; set error for failed responses
+    that did not raise
+    """
+
+    def __init__(self):
+        self.error = False
+
+
+class MetricsRegistry:
+    """
+    In-process metrics for a lead-generation run.
+
+    Records latency histograms per pipeline stage and per external endpoint
+    (Custom Search, Hunter.io, OpenAI, Sheets, DNS, ...), call and error
+    counts, and cache hits and misses. Values are cumulative for the
+    process; checkpoint() and summary(since=...) give the figures of a
+    single run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._calls: Dict[str, Histogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._cache_hits: Dict[str, int] = {}
+        self._cache_misses: Dict[str, int] = {}
+        self._server = None
+
+    # Recording
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self._stages.setdefault(stage, Histogram()).observe(seconds)
+
+    def observe_call(self, endpoint: str, seconds: float, error: bool = False):
+        with self._lock:
+            self._calls.setdefault(endpoint, Histogram()).observe(seconds)
+            self._errors.setdefault(endpoint, 0)
+            if error:
+                self._errors[endpoint] += 1
+
+    def record_cache(self, cache: str, hit: bool):
+        with self._lock:
+            counters = self._cache_hits if hit else self._cache_misses
+            counters[cache] = counters.get(cache, 0) + 1
+
+    @contextmanager
+    def time_stage(self, stage: str):
+        """
+        Time a pipeline stage, including stages that raise
+
+        :param stage: Stage name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def time_call(self, endpoint: str):
+        """
+        Time one external call; exceptions count as errors
+
+        :param endpoint: Endpoint name, e.g. 'hunter'
+        :return: CallTimer whose error flag marks unsuccessful responses
+        """
+        timer = CallTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            timer.error = True
+            raise
+        finally:
+            self.observe_call(endpoint, time.perf_counter() - start, error=timer.error)
+
+    # Reporting
+
+    def checkpoint(self) -> Dict:
+        """
+        :return: Copy of the current values, for summary(since=...)
+        """
+        with self._lock:
+            return copy.deepcopy({
+                'stages': self._stages,
+                'calls': self._calls,
+                'errors': self._errors,
+                'cache_hits': self._cache_hits,
+                'cache_misses': self._cache_misses
+            })
+
+    def summary(self, since: Dict = None) -> Dict:
+        """
+        Summarise stages, endpoints and caches
+
+        :param since: Optional checkpoint; only activity after it is reported
+        :return: JSON-serialisable summary
+        """
+        now = self.checkpoint()
+        since = since or {}
+        stages = {}
+        for stage, histogram in sorted(now['stages'].items()):
+            delta = histogram.minus(since.get('stages', {}).get(stage))
+            if delta.count:
+                stages[stage] = delta.summary()
+
+        endpoints = {}
+        for endpoint, histogram in sorted(now['calls'].items()):
+            delta = histogram.minus(since.get('calls', {}).get(endpoint))
+            if not delta.count:
+                continue
+            errors = now['errors'].get(endpoint, 0) - since.get('errors', {}).get(endpoint, 0)
+            endpoints[endpoint] = dict(delta.summary(), errors=errors,
+                                       error_rate=round(errors / delta.count, 4))
+
+        caches = {}
+        for cache in sorted(set(now['cache_hits']) | set(now['cache_misses'])):
+            hits = now['cache_hits'].get(cache, 0) - since.get('cache_hits', {}).get(cache, 0)
+            misses = now['cache_misses'].get(cache, 0) - since.get('cache_misses', {}).get(cache, 0)
+            if hits or misses:
+                caches[cache] = {'hits': hits, 'misses': misses,
+                                 'hit_rate': round(hits / (hits + misses), 4)}
+
+        return {'stages': stages, 'endpoints': endpoints, 'caches': caches}
+
+    def write_json(self, path: str, since: Dict = None, **extra) -> str:
+        """
+        Write summary() to a JSON file
+
+        :param path: Output file
+        :param since: Optional checkpoint limiting the summary to one run
+        :param extra: Additional top-level fields, e.g. job_id
+        :return: Path written
+        """
+        document = dict(extra, generated_at=time.strftime('%Y-%m-%dT%H:%M:%S'), **self.summary(since))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(document, output, indent=2)
+        return path
+
+    def to_prometheus(self) -> str:
+        """
+        :return: Cumulative values in the Prometheus text exposition format
+        """
+        state = self.checkpoint()
+        lines = []
+
+        def histogram_lines(name, help_text, label, histograms):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for value, histogram in sorted(histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{{label}="{_escape(value)}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label}="{_escape(value)}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{{label}="{_escape(value)}"}} {histogram.count}')
+
+        def counter_lines(name, help_text, label, counters):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for value, count in sorted(counters.items()):
+                lines.append(f'{name}{{{label}="{_escape(value)}"}} {count}')
+
+        histogram_lines(f'{PROMETHEUS_PREFIX}_stage_duration_seconds',
+                        'Duration of pipeline stages.', 'stage', state['stages'])
+        histogram_lines(f'{PROMETHEUS_PREFIX}_external_call_duration_seconds',
+                        'Duration of calls to external services.', 'endpoint', state['calls'])
+        counter_lines(f'{PROMETHEUS_PREFIX}_external_call_errors_total',
+                      'Failed calls to external services.', 'endpoint', state['errors'])
+        counter_lines(f'{PROMETHEUS_PREFIX}_cache_hits_total', 'Cache hits.', 'cache', state['cache_hits'])
+        counter_lines(f'{PROMETHEUS_PREFIX}_cache_misses_total', 'Cache misses.', 'cache', state['cache_misses'])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> str:
+        """
+        Write to_prometheus() atomically, e.g. for the node_exporter textfile collector
+
+        :param path: Output file, conventionally ending in .prom
+        :return: Path written
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as output:
+            output.write(self.to_prometheus())
+        os.replace(temporary_path, path)
+        return path
+
+    def serve_prometheus(self, port: int, host: str = '127.0.0.1') -> int:
+        """
+        Serve to_prometheus() on http://host:port/metrics from a background thread
+
+        Calling it again while the endpoint is running has no effect.
+
+        :param port: TCP port, 0 picks a free one
+        :param host: Interface to bind
+        :return: Port the endpoint listens on
+        """
+        with self._lock:
+            if self._server is None:
+                registry = self
+
+                class MetricsHandler(BaseHTTPRequestHandler):
+                    def do_GET(self):
+                        if self.path.split('?')[0] != '/metrics':
+                            self.send_error(404)
+                            return
+                        body = registry.to_prometheus().encode('utf-8')
+                        self.send_response(200)
+                        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                        self.send_header('Content-Length', str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+
+                    def log_message(self, format, *args):
+                        pass
+
+                self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name='metrics-http',
+                                 daemon=True).start()
+            return self._server.server_address[1]
+
+    def reset(self):
+        """
+        Drop all recorded values
+        """
+        with self._lock:
+            self._stages.clear()
+            self._calls.clear()
+            self._errors.clear()
+            self._cache_hits.clear()
+            self._cache_misses.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by every module in the process
+metrics = MetricsRegistry()
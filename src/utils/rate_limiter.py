@@ -0,0 +1,216 @@
+# src/utils/rate_limiter.py
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from src.utils.cache import PersistentCache
+from src.utils.metrics import metrics
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+# Priority classes, most important first
+PRIORITY_CLASSES = ('primary', 'normal', 'fallback')
+
+# Share of the daily quota each class may use; the rest is kept for more important calls
+DEFAULT_QUOTA_SHARES = {
+    'primary': 1.0,
+    'normal': 0.9,
+    'fallback': 0.75
+}
+
+# How often waiting callers check their cancel event
+_POLL_INTERVAL = 0.1
+
+
+class QuotaExhaustedError(Exception):
+    """
+    Raised when the daily quota left for a priority class is used up
+    """
+
+
+class QuotaLedger:
+    """
+    Persistent count of the calls made per quota day.
+
+    Google resets API quotas at midnight Pacific time, so days are counted in
+    that time zone (UTC when no time zone data is available).
+    """
+
+    def __init__(self, path: str, daily_quota: int, time_zone: str = 'America/Los_Angeles'):
+        """
+        :param path: SQLite database file, or ':memory:'
+        :param daily_quota: Calls allowed per day, 0 for no limit
+        :param time_zone: Time zone in which the quota day starts
+        """
+        self.daily_quota = max(0, daily_quota)
+        self.store = PersistentCache(path, namespace='quota_ledger', ttl=7 * 86400, max_entries=1000)
+        try:
+            self.tz = ZoneInfo(time_zone) if ZoneInfo is not None else timezone.utc
+        except Exception:
+            self.tz = timezone.utc
+        self._lock = threading.Lock()
+        self._day = None
+        self._used = 0
+
+    def today(self) -> str:
+        return datetime.now(self.tz).strftime('%Y-%m-%d')
+
+    def used(self) -> int:
+        """
+        :return: Calls counted for the current quota day
+        """
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> int:
+        day = self.today()
+        if day != self._day:
+            self._day = day
+            self._used = int(self.store.get(day) or 0)
+        return self._used
+
+    def try_spend(self, share: float = 1.0) -> bool:
+        """
+        Count one call if the quota allows it
+
+        :param share: Fraction of the daily quota the caller may use
+        :return: Whether the call was counted
+        """
+        with self._lock:
+            used = self._load()
+            if self.daily_quota and used >= self.daily_quota * share:
+                return False
+            self._used = used + 1
+            self.store.set(self._day, self._used)
+            return True
+
+    def remaining(self) -> Optional[int]:
+        """
+        :return: Calls left today, None when there is no limit
+        """
+        if not self.daily_quota:
+            return None
+        return max(0, self.daily_quota - self.used())
+
+
+class PriorityRateLimiter:
+    """
+    Token bucket shared by every caller of one API, with a daily quota.
+
+    Callers block until a token is available instead of failing, and waiting
+    callers are served by priority class, then in arrival order. Lower
+    classes may only use part of the daily quota (quota_shares), so late in
+    the day the remaining calls go to the most important requests.
+    """
+
+    def __init__(self,
+                 rate: float,
+                 burst: int = None,
+                 ledger: QuotaLedger = None,
+                 quota_shares: Dict[str, float] = None,
+                 name: str = 'api'):
+        """
+        :param rate: Calls per second, 0 for no rate limit
+        :param burst: Bucket size, defaults to one second worth of calls
+        :param ledger: Optional QuotaLedger enforcing a daily quota
+        :param quota_shares: Share of the daily quota per priority class
+        :param name: Name used in metrics
+        """
+        self.rate = max(0.0, rate)
+        self.burst = max(1, burst or int(self.rate) or 1)
+        self.ledger = ledger
+        self.quota_shares = dict(DEFAULT_QUOTA_SHARES, **(quota_shares or {}))
+        self.name = name
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        if now < self._updated:
+            # Still inside a throttle pause
+            return
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        else:
+            self._tokens = float(self.burst)
+        self._updated = now
+
+    def acquire(self, priority: str = 'primary', cancel_event: threading.Event = None) -> bool:
+        """
+        Wait for permission to make one call
+
+        :param priority: Priority class from PRIORITY_CLASSES
+        :param cancel_event: Optional event, once set the caller stops waiting
+        :return: True when the call may go ahead, False when it was cancelled
+        :raises QuotaExhaustedError: When the class has used its share of today's quota
+        :raises ValueError: For unknown priority classes
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        entry = (PRIORITY_CLASSES.index(priority), next(self._sequence))
+        started = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return False
+                    now = time.monotonic()
+                    # Callers further back are woken when the one ahead of them leaves
+                    wait = None
+                    if self._waiters[0] == entry:
+                        self._refill(now)
+                        if now < self._blocked_until:
+                            wait = self._blocked_until - now
+                        elif self._tokens >= 1:
+                            if self.ledger is not None and not self.ledger.try_spend(
+                                    self.quota_shares.get(priority, 1.0)):
+                                raise QuotaExhaustedError(
+                                    f"Daily {self.name} quota used up for '{priority}' calls")
+                            self._tokens -= 1
+                            metrics.observe_stage(f'{self.name}_rate_limit_wait', now - started)
+                            return True
+                        else:
+                            wait = (1 - self._tokens) / self.rate
+                    if cancel_event is not None:
+                        wait = min(wait, _POLL_INTERVAL) if wait is not None else _POLL_INTERVAL
+                    self._condition.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                # The next caller in line may be able to go now
+                self._condition.notify_all()
+
+    def throttle(self, seconds: float):
+        """
+        Hold every caller back, e.g. after the API answered 429
+
+        :param seconds: Pause length
+        """
+        with self._condition:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + max(0.0, seconds))
+            # Tokens accumulate again only once the pause is over
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = self._blocked_until
+            self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        """
+        :return: Waiting callers and quota usage
+        """
+        with self._condition:
+            waiting = len(self._waiters)
+        return {
+            'waiting': waiting,
+            'quota_used': self.ledger.used() if self.ledger is not None else None,
+            'quota_remaining': self.ledger.remaining() if self.ledger is not None else None
+        }
@@ -0,0 +1,294 @@
+# src/utils/resilience.py
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from src.utils.config import get_env_int, get_env_mapping
+from src.utils.logger import setup_logger
+
+logger = setup_logger('resilience')
+
+# Statuses worth another attempt: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Settings per endpoint, overridden with RESILIENCE_<ENDPOINT>='timeout=5,retries=2,...'
+#   timeout            seconds allowed for connecting and for each read of one attempt
+#   deadline           seconds allowed for all attempts and backoff pauses together
+#   retries            further attempts after the first
+#   backoff            base of the exponential backoff, in seconds
+#   hedge_after        send a duplicate request when the first is slower than this, 0 disables
+#   retry_throttled    1 to retry 429 answers, 0 when a rate limiter upstream handles them
+#   breaker_failures   consecutive failures that open the host's circuit, 0 disables
+#   breaker_reset      seconds an open circuit stays open before one trial request
+DEFAULT_POLICY = {
+    'timeout': 30.0,
+    'deadline': 90.0,
+    'retries': 2,
+    'backoff': 0.5,
+    'hedge_after': 0.0,
+    'retry_throttled': 1,
+    'breaker_failures': 5,
+    'breaker_reset': 30.0
+}
+
+ENDPOINT_POLICIES = {
+    # The Custom Search limiter pauses and requeues on 429 itself
+    'cse': {'timeout': 10.0, 'deadline': 30.0, 'retries': 3, 'retry_throttled': 0},
+    'hunter': {'timeout': 10.0, 'deadline': 30.0, 'retries': 2},
+    # Company websites are free to ask twice, and single slow hosts are common
+    'website': {'timeout': 10.0, 'deadline': 20.0, 'retries': 1, 'hedge_after': 3.0,
+                'breaker_failures': 3, 'breaker_reset': 300.0},
+    'linkedin': {'timeout': 10.0, 'deadline': 20.0, 'retries': 1},
+    # The OpenAI SDK retries by itself; only its timeout and retry count are taken from here
+    'openai': {'timeout': 60.0, 'retries': 2}
+}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised without calling the host while its circuit is open.
+
+    It derives from requests.ConnectionError so callers treat it like any
+    other failed request.
+    """
+
+
+class DeadlineExceededError(requests.Timeout):
+    """
+    Raised when an endpoint's deadline runs out before an attempt succeeds
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one host.
+
+    After `failures` failed calls in a row the circuit opens and calls fail
+    fast. Once `reset_after` seconds have passed one trial call is let
+    through; its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, host: str, failures: int, reset_after: float):
+        self.host = host
+        self.failure_threshold = failures
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            return 'half_open' if time.monotonic() - self.opened_at >= self.reset_after else 'open'
+
+    def allow(self) -> bool:
+        """
+        :return: Whether a call may go ahead now
+        """
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_after or self.trial_running:
+                return False
+            self.trial_running = True
+            logger.info(f"Circuit for {self.host} half-open, sending a trial request")
+            return True
+
+    def record(self, success: bool):
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.trial_running = False
+            if success:
+                if self.opened_at is not None:
+                    logger.info(f"Circuit for {self.host} closed again")
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"Circuit for {self.host} opened after {self.failures} failures, "
+                                   f"failing fast for {self.reset_after:.0f}s")
+                self.opened_at = time.monotonic()
+
+
+class ResilientCaller:
+    """
+    Deadlines, retries with exponential backoff, hedged requests and
+    per-host circuit breakers for outgoing HTTP calls.
+
+    Each endpoint ('cse', 'hunter', 'website', ...) has its own policy, see
+    DEFAULT_POLICY. Every decision (retry, hedge, breaker change, deadline)
+    is logged to resilience.log.
+    """
+
+    def __init__(self, policies: Dict[str, Dict] = None):
+        """
+        :param policies: Optional policy overrides per endpoint
+        """
+        self._overrides = policies or {}
+        self._policies = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def policy(self, endpoint: str) -> Dict:
+        """
+        :param endpoint: Endpoint name
+        :return: Effective settings of the endpoint
+        """
+        with self._lock:
+            if endpoint not in self._policies:
+                base = dict(DEFAULT_POLICY, **ENDPOINT_POLICIES.get(endpoint, {}),
+                            **self._overrides.get(endpoint, {}))
+                self._policies[endpoint] = get_env_mapping(f'RESILIENCE_{endpoint.upper()}', base)
+            return self._policies[endpoint]
+
+    def breaker(self, endpoint: str, host: str) -> CircuitBreaker:
+        policy = self.policy(endpoint)
+        key = f'{endpoint} {host}'
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(host, int(policy['breaker_failures']),
+                                                     policy['breaker_reset'])
+            return self._breakers[key]
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=get_env_int('RESILIENCE_HEDGE_WORKERS', 32),
+                                                    thread_name_prefix='hedge')
+            return self._executor
+
+    def call(self,
+             endpoint: str,
+             url: str,
+             send: Callable[[float], requests.Response],
+             timeout: Optional[float] = None,
+             hedge: bool = True) -> requests.Response:
+        """
+        Run one logical request under the endpoint's policy
+
+        :param endpoint: Endpoint name selecting the policy
+        :param url: Request URL, its host selects the circuit breaker
+        :param send: Performs one attempt given its timeout in seconds
+        :param timeout: Optional per-attempt timeout overriding the policy
+        :param hedge: Allow hedged duplicates; only safe for idempotent requests
+        :return: Last response, which may still carry a retryable status
+        :raises CircuitOpenError: While the host's circuit is open
+        :raises DeadlineExceededError: When the deadline runs out
+        :raises requests.RequestException: When the last attempt fails
+        """
+        policy = self.policy(endpoint)
+        host = urlsplit(url).netloc or url
+        breaker = self.breaker(endpoint, host)
+        attempt_timeout = timeout or policy['timeout']
+        deadline = time.monotonic() + policy['deadline']
+        retries = int(policy['retries'])
+        retry_statuses = RETRY_STATUSES if policy['retry_throttled'] else RETRY_STATUSES - {429}
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit for {host} is open, not calling {endpoint}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                breaker.record(False)
+                raise DeadlineExceededError(f"{endpoint} deadline of {policy['deadline']:.0f}s exceeded")
+            try:
+                response = self._attempt(endpoint, send, min(attempt_timeout, remaining),
+                                         policy['hedge_after'] if hedge else 0.0)
+            except requests.RequestException as e:
+                breaker.record(False)
+                if attempt >= retries:
+                    raise
+                pause = self._backoff(policy, attempt)
+                logger.warning(f"{endpoint} request to {host} failed ({type(e).__name__}), "
+                               f"retry {attempt + 1}/{retries} in {pause:.2f}s")
+            except Exception:
+                # Not a network failure, so no retry, but a trial request must not stay pending
+                breaker.record(False)
+                raise
+            else:
+                # Throttling says nothing about the host's health
+                breaker.record(response.status_code < 500)
+                if response.status_code not in retry_statuses or attempt >= retries:
+                    return response
+                pause = self._backoff(policy, attempt, response)
+                logger.warning(f"{endpoint} request to {host} answered {response.status_code}, "
+                               f"retry {attempt + 1}/{retries} in {pause:.2f}s")
+            if time.monotonic() + pause >= deadline:
+                logger.warning(f"{endpoint} deadline leaves no time for another attempt")
+                raise DeadlineExceededError(f"{endpoint} deadline of {policy['deadline']:.0f}s exceeded")
+            time.sleep(pause)
+            attempt += 1
+
+    def _attempt(self, endpoint: str, send, timeout: float, hedge_after: float) -> requests.Response:
+        if not hedge_after or hedge_after >= timeout:
+            return send(timeout)
+
+        # Hedging: a second identical request races the first once it is slow
+        pool = self._hedge_pool()
+        first = pool.submit(send, timeout)
+        done, _ = wait([first], timeout=hedge_after)
+        if done:
+            return first.result()
+        logger.info(f"{endpoint} request slower than {hedge_after:.1f}s, sending a hedged duplicate")
+        second = pool.submit(send, timeout)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    error = e
+                    continue
+                if future is second:
+                    logger.info(f"Hedged {endpoint} request won")
+                # Release the connection of the losing request once it finishes
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                return response
+        raise error
+
+    @staticmethod
+    def _backoff(policy: Dict, attempt: int, response: requests.Response = None) -> float:
+        if response is not None and response.headers.get('Retry-After'):
+            try:
+                return max(0.0, float(response.headers['Retry-After']))
+            except ValueError:
+                pass
+        # Full jitter keeps retrying clients from hitting the host in lockstep
+        return random.uniform(0, policy['backoff'] * 2 ** attempt)
+
+    def stats(self) -> Dict:
+        """
+        :return: State of every circuit breaker seen so far
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.state for key, breaker in breakers.items()}
+
+
+def _close_response(future):
+    try:
+        future.result().close()
+    except Exception:
+        pass
+
+
+# Shared by every transport in the process
+resilient_caller = ResilientCaller()
@@ -0,0 +1,416 @@
+# src/utils/transport.py
+import base64
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.utils.cache import data_path
+from src.utils.logger import setup_logger
+from src.utils.resilience import resilient_caller
+
+# Conditional imports, only needed to capture OpenAI and Google API traffic
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import httplib2
+except ImportError:
+    httplib2 = None
+
+# Query parameters and headers that carry credentials and never reach a cassette
+SECRET_PARAMS = {'key', 'api_key', 'access_token'}
+SECRET_HEADERS = {'authorization', 'x-goog-api-key', 'api-key', 'cookie'}
+
+MODES = ('live', 'record', 'replay')
+
+
+class CassetteMissError(requests.ConnectionError):
+    """
+    Raised in replay mode when no recorded interaction matches a request.
+
+    It derives from requests.ConnectionError so callers treat it like any
+    other failed request.
+    """
+
+
+def _scrub_url(url: str, params: Dict = None) -> str:
+    """
+    Merge query parameters into the URL, dropping secrets and sorting the rest
+    """
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    for name, value in (params or {}).items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query.extend((name, str(item)) for item in values)
+    query = sorted((name, value) for name, value in query if name not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def _encode_body(body) -> Dict:
+    if body is None:
+        return {'text': ''}
+    if isinstance(body, str):
+        return {'text': body}
+    try:
+        return {'text': body.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(body).decode('ascii')}
+
+
+def _decode_body(encoded: Dict) -> bytes:
+    if 'base64' in encoded:
+        return base64.b64decode(encoded['base64'])
+    return encoded.get('text', '').encode('utf-8')
+
+
+class HttpTransport:
+    """
+    Pluggable transport for every external call made by the pipeline.
+
+    In 'live' mode requests go straight to the network. In 'record' mode they
+    go to the network and every interaction is appended to a JSON-lines
+    cassette. In 'replay' mode nothing touches the network: responses are
+    served from the cassette, so a recorded run can be repeated offline.
+
+    Interactions are matched on method, URL and query (without secrets) and
+    a digest of the request body. When no exact match exists, the recorded
+    interactions for the same method and URL are served in recording order,
+    which covers bodies with volatile content such as timestamps.
+    """
+
+    def __init__(self, mode: str = None, cassette_path: str = None, session: requests.Session = None):
+        """
+        :param mode: 'live', 'record' or 'replay', defaults to HTTP_TRANSPORT_MODE
+        :param cassette_path: Cassette file, defaults to HTTP_CASSETTE or data/cassettes/default.jsonl
+        :param session: Optional requests session used for live traffic
+        """
+        self.logger = setup_logger('http_transport')
+        self.mode = (mode or os.getenv('HTTP_TRANSPORT_MODE', 'live')).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown transport mode: {self.mode}")
+        self.cassette_path = (cassette_path or os.getenv('HTTP_CASSETTE')
+                              or os.path.join(data_path('cassettes'), 'default.jsonl'))
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._loose = {}
+        self._loose_positions = {}
+        if self.mode == 'replay':
+            self._load()
+        elif self.mode == 'record':
+            os.makedirs(os.path.dirname(os.path.abspath(self.cassette_path)), exist_ok=True)
+
+    # Cassette bookkeeping
+
+    @staticmethod
+    def _keys(kind: str, method: str, url: str, body_text: str):
+        loose = f"{kind} {method.upper()} {url}"
+        digest = hashlib.sha1(body_text.encode('utf-8')).hexdigest()
+        return f"{loose} {digest}", loose
+
+    def _load(self):
+        if not os.path.exists(self.cassette_path):
+            self.logger.warning(f"Cassette not found, every request will miss: {self.cassette_path}")
+            return
+        with open(self.cassette_path, encoding='utf-8') as cassette:
+            for line in cassette:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                self._exact.setdefault(interaction['match'], []).append(interaction)
+                self._loose.setdefault(interaction['loose'], []).append(interaction)
+        self.logger.info(f"Loaded {sum(len(v) for v in self._exact.values())} interactions "
+                         f"from {self.cassette_path}")
+
+    def _record(self, kind: str, method: str, url: str, body_text: str, response: Dict):
+        match, loose = self._keys(kind, method, url, body_text)
+        interaction = {
+            'match': match,
+            'loose': loose,
+            'request': {'method': method.upper(), 'url': url, 'body': body_text},
+            'response': response
+        }
+        with self._lock, open(self.cassette_path, 'a', encoding='utf-8') as cassette:
+            cassette.write(json.dumps(interaction) + '\n')
+
+    def _replay(self, kind: str, method: str, url: str, body_text: str) -> Dict:
+        match, loose = self._keys(kind, method, url, body_text)
+        with self._lock:
+            if match in self._exact:
+                return self._exact[match][-1]['response']
+            candidates = self._loose.get(loose)
+            if candidates:
+                position = self._loose_positions.get(loose, 0)
+                self._loose_positions[loose] = position + 1
+                return candidates[min(position, len(candidates) - 1)]['response']
+        raise CassetteMissError(f"No recorded interaction for {method.upper()} {url}")
+
+    # requests-style traffic
+
+    def get(self, url: str, params: Dict = None, endpoint: str = 'default', **kwargs) -> requests.Response:
+        """
+        Drop-in replacement for requests.get
+
+        :param url: Request URL
+        :param params: Query parameters
+        :param endpoint: Endpoint name selecting the deadline, retry, hedging and circuit breaker policy
+        :return: requests.Response
+        """
+        return self.request('GET', url, params=params, endpoint=endpoint, **kwargs)
+
+    def request(self, method: str, url: str, params: Dict = None, endpoint: str = 'default',
+                **kwargs) -> requests.Response:
+        """
+        Drop-in replacement for requests.request
+
+        Live requests run under the endpoint's resilience policy, see
+        src.utils.resilience; a timeout argument overrides its per-attempt timeout.
+
+        :param method: HTTP method
+        :param url: Request URL
+        :param params: Query parameters
+        :param endpoint: Endpoint name selecting the deadline, retry, hedging and circuit breaker policy
+        :return: requests.Response
+        """
+        scrubbed_url = _scrub_url(url, params)
+        body = kwargs.get('data') or kwargs.get('json')
+        body_text = json.dumps(body, sort_keys=True) if isinstance(body, (dict, list)) else (body or '')
+        if isinstance(body_text, bytes):
+            body_text = body_text.decode('utf-8', errors='replace')
+
+        if self.mode == 'replay':
+            recorded = self._replay('http', method, scrubbed_url, body_text)
+            response = requests.Response()
+            response.status_code = recorded['status']
+            response.headers = CaseInsensitiveDict(recorded.get('headers', {}))
+            response._content = _decode_body(recorded['body'])
+            response.url = recorded.get('url', scrubbed_url)
+            response.encoding = recorded.get('encoding') or 'utf-8'
+            response.reason = recorded.get('reason', '')
+            # Lets stream=True callers iterate over the recorded body
+            response._content_consumed = True
+            return response
+
+        timeout = kwargs.pop('timeout', None)
+        response = resilient_caller.call(
+            endpoint, url,
+            lambda attempt_timeout: self.session.request(method, url, params=params,
+                                                         timeout=attempt_timeout, **kwargs),
+            timeout=timeout,
+            hedge=method.upper() in ('GET', 'HEAD')
+        )
+        if self.mode == 'record':
+            if kwargs.get('stream'):
+                # Record only what the caller reads, once it closes the response
+                self._record_on_close(response, method, scrubbed_url, body_text)
+            else:
+                self._record_response(response, response.content, method, scrubbed_url, body_text)
+        return response
+
+    def _record_response(self, response: requests.Response, content: bytes,
+                         method: str, scrubbed_url: str, body_text: str):
+        self._record('http', method, scrubbed_url, body_text, {
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in SECRET_HEADERS | {'content-encoding', 'transfer-encoding'}},
+            'body': _encode_body(content),
+            'url': _scrub_url(response.url),
+            'encoding': response.encoding
+        })
+
+    def _record_on_close(self, response: requests.Response, method: str, scrubbed_url: str, body_text: str):
+        """
+        Record a streamed response with the bytes read from it before close()
+        """
+        raw = _RecordingRaw(response.raw)
+        response.raw = raw
+        close = response.close
+
+        def close_and_record():
+            close()
+            if not raw.recorded:
+                raw.recorded = True
+                self._record_response(response, bytes(raw.captured), method, scrubbed_url, body_text)
+
+        response.close = close_and_record
+
+    # Arbitrary JSON-serialisable calls, e.g. DNS lookups
+
+    def call(self, kind: str, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Record or replay the JSON-serialisable result of a non-HTTP call
+
+        Exceptions are not recorded, so failing calls raise CassetteMissError on replay.
+
+        :param kind: Call family, e.g. 'dns'
+        :param key: Call arguments identifying the result
+        :param func: Callable performing the live call
+        :return: Call result
+        """
+        if self.mode == 'replay':
+            return self._replay(kind, 'CALL', key, '')['value']
+        value = func()
+        if self.mode == 'record':
+            self._record(kind, 'CALL', key, '', {'value': value})
+        return value
+
+    # Client adapters
+
+    def httpx_client(self):
+        """
+        Build an httpx client routed through this transport, for the OpenAI SDK
+
+        :return: httpx.Client, or None in live mode or when httpx is missing
+        """
+        if self.mode == 'live':
+            return None
+        if httpx is None:
+            self.logger.warning("httpx not installed; OpenAI traffic is not recorded")
+            return None
+        return httpx.Client(transport=_HttpxTransportAdapter(self), timeout=60)
+
+    def wrap_httplib2(self, http):
+        """
+        Wrap an httplib2-compatible object used by googleapiclient
+
+        :param http: httplib2.Http or AuthorizedHttp, may be None in replay mode
+        :return: Object exposing httplib2's request() signature
+        """
+        if self.mode == 'live':
+            return http
+        return _Httplib2Adapter(self, http)
+
+
+class _RecordingRaw:
+    """
+    Wraps a urllib3 response and keeps a copy of every decoded chunk read through it
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.captured = bytearray()
+        self.recorded = False
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            self.captured.extend(chunk)
+            yield chunk
+
+    def read(self, *args, **kwargs):
+        chunk = self._raw.read(*args, **kwargs)
+        self.captured.extend(chunk or b'')
+        return chunk
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class _HttpxTransportAdapter(httpx.BaseTransport if httpx else object):
+    def __init__(self, transport: HttpTransport):
+        self.transport = transport
+        self.live = httpx.HTTPTransport() if transport.mode == 'record' else None
+
+    def handle_request(self, request):
+        url = _scrub_url(str(request.url))
+        body_text = request.read().decode('utf-8', errors='replace')
+        if self.transport.mode == 'replay':
+            recorded = self.transport._replay('httpx', request.method, url, body_text)
+            return httpx.Response(recorded['status'], headers=recorded.get('headers', {}),
+                                  content=_decode_body(recorded['body']), request=request)
+
+        response = self.live.handle_request(request)
+        content = response.read()
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in SECRET_HEADERS | {'content-encoding', 'transfer-encoding'}}
+        self.transport._record('httpx', request.method, url, body_text, {
+            'status': response.status_code,
+            'headers': headers,
+            'body': _encode_body(content)
+        })
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    def close(self):
+        if self.live is not None:
+            self.live.close()
+
+
+class _Httplib2Adapter:
+    def __init__(self, transport: HttpTransport, http):
+        self.transport = transport
+        self.http = http
+
+    def __getattr__(self, name):
+        # googleapiclient reads attributes such as credentials or timeout
+        return getattr(self.http, name)
+
+    def request(self, uri, method='GET', body=None, headers=None, *args, **kwargs):
+        url = _scrub_url(uri)
+        body_text = _encode_body(body).get('text', '')
+        if self.transport.mode == 'replay':
+            recorded = self.transport._replay('httplib2', method, url, body_text)
+            info = dict(recorded.get('headers', {}), status=str(recorded['status']))
+            return httplib2.Response(info), _decode_body(recorded['body'])
+
+        response, content = self.http.request(uri, method, body=body, headers=headers, *args, **kwargs)
+        self.transport._record('httplib2', method, url, body_text, {
+            'status': response.status,
+            'headers': {name: value for name, value in response.items()
+                        if name.lower() not in SECRET_HEADERS | {'status', 'content-encoding'}},
+            'body': _encode_body(content)
+        })
+        return response, content
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """
+    Return the process-wide transport, configured from the environment on first use
+
+    :return: Shared HttpTransport
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
+
+
+def set_transport(transport: HttpTransport):
+    """
+    Replace the process-wide transport, e.g. to switch into replay mode
+
+    :param transport: HttpTransport to use from now on
+    """
+    global _transport
+    with _transport_lock:
+        _transport = transport
+
+
+def openai_client(api_key: str):
+    """
+    Build an OpenAI client whose traffic goes through the shared transport
+
+    :param api_key: OpenAI API key
+    :return: openai.OpenAI instance
+    """
+    import openai
+    policy = resilient_caller.policy('openai')
+    options = {'timeout': policy['timeout'], 'max_retries': int(policy['retries'])}
+    http_client = get_transport().httpx_client()
+    if http_client is not None:
+        return openai.OpenAI(api_key=api_key, http_client=http_client, **options)
+    return openai.OpenAI(api_key=api_key, **options)
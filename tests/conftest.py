@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Keep caches, ledgers and logs of the test run out of the project's data directory
+_scratch = tempfile.mkdtemp(prefix='cohesive-tests-')
+os.environ.setdefault('COHESIVE_DATA_DIR', os.path.join(_scratch, 'data'))
+os.environ.setdefault('LOG_DIR', os.path.join(_scratch, 'logs'))
+os.environ.setdefault('LOG_CONSOLE', 'false')
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import EndpointProfile, MockApiServer
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """
+    Local stand-in for Custom Search, Hunter.io, OpenAI and Sheets, with every client pointed at it
+    """
+    from src.generators import email_generator
+    from src.scrapers import custom_search
+
+    server = MockApiServer(results_per_query=25, profiles={'cse': EndpointProfile(latency=0.02)}).start()
+    for name, value in server.env().items():
+        monkeypatch.setenv(name, value)
+    # Endpoint URLs are read when the modules are imported
+    monkeypatch.setattr(custom_search, 'CUSTOM_SEARCH_URL', server.env()['GOOGLE_SEARCH_ENDPOINT'])
+    monkeypatch.setattr(email_generator, 'HUNTER_VERIFY_URL', server.env()['HUNTER_API_URL'])
+    try:
+        yield server
+    finally:
+        server.stop()
@@ -0,0 +1,32 @@
+import time
+
+from src.utils.cache import PersistentCache
+
+
+def test_persistent_cache_round_trip_and_ttl():
+    cache = PersistentCache(':memory:', namespace='test', ttl=60)
+    cache.set('key', {'value': [1, 2]})
+
+    assert cache.get('key') == {'value': [1, 2]}
+    assert cache.get('missing') is None
+
+    cache.set('old', 'value', stored_at=time.time() - 120)
+    assert cache.get('old') is None
+    assert cache.get('old', max_age=300) == 'value'
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_persistent_cache_evicts_least_recently_used():
+    cache = PersistentCache(':memory:', namespace='test', max_entries=2)
+    cache.EVICTION_INTERVAL = 1
+    cache.set('a', 1)
+    time.sleep(0.01)
+    cache.set('b', 2)
+    time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
@@ -0,0 +1,35 @@
+from src.scrapers.custom_search import CustomSearchClient, cache_key
+from src.utils.cache import PersistentCache
+from src.utils.rate_limiter import PriorityRateLimiter
+
+
+def _client(cache):
+    return CustomSearchClient('test-key', 'test-cx', cache=cache, limiter=PriorityRateLimiter(rate=0))
+
+
+def test_repeated_query_is_served_from_the_given_cache(mock_api):
+    cache = PersistentCache(':memory:', namespace='search')
+    client = _client(cache)
+
+    first = client.fetch('Software   Companies', num=10)
+    second = client.fetch('software companies', num=10)
+
+    assert first == second
+    assert len(first['items']) == 10
+    assert len(cache) == 1
+    assert mock_api.states['cse'].requests == 1
+
+
+def test_refresh_bypasses_the_cache(mock_api):
+    client = _client(PersistentCache(':memory:', namespace='search'))
+
+    client.fetch('software companies')
+    client.fetch('software companies', refresh=True)
+    client.fetch('software companies', use_cache=False)
+
+    assert mock_api.states['cse'].requests == 3
+
+
+def test_cache_key_ignores_the_api_key_and_query_spacing():
+    assert (cache_key({'key': 'a', 'cx': 'cx', 'q': ' Acme  Corp', 'num': 10, 'start': None})
+            == cache_key({'key': 'b', 'cx': 'cx', 'q': 'acme corp', 'num': 10}))
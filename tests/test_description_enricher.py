@@ -0,0 +1,34 @@
+from src.generators.description_enricher import DescriptionEnricher, company_key
+from src.utils.cache import PersistentCache
+
+
+def _result(index):
+    return {'title': f'Company {index}', 'link': f'https://www.company{index}.test/about',
+            'snippet': f'Snippet {index}'}
+
+
+def test_descriptions_are_batched_and_memoized_in_the_given_cache(mock_api):
+    cache = PersistentCache(':memory:', namespace='descriptions')
+    enricher = DescriptionEnricher(batch_size=2, max_concurrency=2, cache=cache)
+    results = [_result(index) for index in range(5)] + [_result(0)]
+
+    descriptions = enricher.enrich_many(results)
+
+    assert descriptions == {f'company{index}.test': f'Company {index} is a software vendor.' for index in range(5)}
+    assert mock_api.states['openai'].requests == 3
+    assert len(cache) == 5
+
+    assert enricher.enrich_many(results) == descriptions
+    assert mock_api.states['openai'].requests == 3
+
+
+def test_snippets_are_used_without_a_model(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    enricher = DescriptionEnricher(cache=PersistentCache(':memory:', namespace='descriptions'))
+
+    assert enricher.enrich_many([_result(1)]) == {'company1.test': 'Snippet 1'}
+
+
+def test_company_key_normalizes_the_domain():
+    assert company_key({'link': 'https://WWW.Acme.com:443/x'}) == 'acme.com'
+    assert company_key({'link': '', 'title': ' Acme Corp '}) == 'acme corp'
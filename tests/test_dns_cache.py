@@ -0,0 +1,103 @@
+import threading
+import time
+
+import dns.resolver
+
+from src.utils import dns_cache
+from src.utils.dns_cache import MXRecordCache
+
+
+class _Answer:
+    def __init__(self, hosts, ttl=300):
+        self.records = [type('MX', (), {'preference': index, 'exchange': f'{host}.'})()
+                        for index, host in enumerate(hosts)]
+        self.rrset = type('RRset', (), {'ttl': ttl})()
+
+    def __iter__(self):
+        return iter(self.records)
+
+
+def test_mx_cache_serves_repeated_lookups_from_memory(monkeypatch):
+    calls = []
+
+    def resolve(domain, record_type):
+        calls.append((domain, record_type))
+        return _Answer(['mx2.example.com', 'mx1.example.com'][::-1])
+
+    monkeypatch.setattr(dns_cache.dns.resolver, 'resolve', resolve)
+    cache = MXRecordCache()
+
+    assert cache.lookup('Example.com.') == ['mx1.example.com', 'mx2.example.com']
+    assert cache.lookup('example.com') == ['mx1.example.com', 'mx2.example.com']
+    assert calls == [('example.com', 'MX')]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_mx_cache_collapses_concurrent_lookups(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def resolve(domain, record_type):
+        calls.append(domain)
+        release.wait(1)
+        return _Answer(['mx.example.com'])
+
+    monkeypatch.setattr(dns_cache.dns.resolver, 'resolve', resolve)
+    cache = MXRecordCache()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.lookup('example.com')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ['example.com']
+    assert results == [['mx.example.com']] * 5
+
+
+def test_mx_cache_negative_results_expire(monkeypatch):
+    calls = []
+
+    def resolve(domain, record_type):
+        calls.append(record_type)
+        raise dns.resolver.NXDOMAIN()
+
+    monkeypatch.setattr(dns_cache.dns.resolver, 'resolve', resolve)
+    cache = MXRecordCache(negative_ttl=0.05)
+
+    assert cache.lookup('missing.example') == []
+    assert cache.lookup('missing.example') == []
+    time.sleep(0.1)
+    assert cache.lookup('missing.example') == []
+    assert calls == ['MX', 'MX']
+    assert cache.stats()['size'] == 1
+
+
+def test_mx_cache_address_fallback_is_opt_in(monkeypatch):
+    def resolve(domain, record_type):
+        if record_type == 'MX':
+            raise dns.resolver.NoAnswer()
+        return _Answer([])
+
+    monkeypatch.setattr(dns_cache.dns.resolver, 'resolve', resolve)
+    cache = MXRecordCache()
+
+    assert cache.lookup('a-only.example') == []
+    assert cache.lookup('a-only.example', a_fallback=True) == ['a-only.example']
+    assert cache.peek('a-only.example') == []
+    assert cache.peek('unknown.example') is None
+
+
+def test_mx_cache_is_bounded():
+    cache = MXRecordCache(max_entries=2)
+    cache.store('a.example', ['mx.a.example'], 300)
+    cache.store('b.example', ['mx.b.example'], 300)
+    cache.peek('a.example')
+    cache.store('c.example', ['mx.c.example'], 300)
+
+    assert cache.peek('a.example') == ['mx.a.example']
+    assert cache.peek('b.example') is None
+    assert cache.stats()['size'] == 2
@@ -0,0 +1,26 @@
+from src.generators.email_candidates import candidate_emails, generate_candidates, match_pattern
+
+
+def test_candidates_follow_the_pattern_order():
+    assert candidate_emails(['Jane Doe'], 'Example.com') == [
+        'jane.doe@example.com', 'janedoe@example.com', 'jane_doe@example.com',
+        'jdoe@example.com', 'j.doe@example.com', 'jane@example.com'
+    ]
+    assert candidate_emails(['José  Núñez'], 'example.com', patterns=['flast']) == ['jnunez@example.com']
+    assert candidate_emails([], 'example.com') == []
+
+
+def test_duplicate_candidates_are_dropped():
+    candidates = generate_candidates({'name': ['Jane Doe', 'jane doe'], 'domain': ['example.com'] * 2})
+
+    assert candidates['email'].is_unique
+    assert len(candidates) == 6
+
+
+def test_match_pattern_finds_the_generating_pattern():
+    names = ['Jane Doe', 'John Smith']
+
+    assert match_pattern('J.Smith@example.com', names) == 'f.last'
+    assert match_pattern('jane.doe@example.com', names) == 'first.last'
+    assert match_pattern('info@example.com', names) is None
+    assert match_pattern('', names) is None
@@ -0,0 +1,31 @@
+from src.generators.email_generator import EmailGenerator
+from src.utils.cache import PersistentCache
+
+
+def test_hunter_results_go_to_the_given_cache(mock_api):
+    cache = PersistentCache(':memory:', namespace='hunter')
+    generator = EmailGenerator(verification_cache=cache)
+
+    first = generator.verify_email_existence('Jane.Doe@Example.com')
+    second = generator.verify_email_existence('jane.doe@example.com')
+
+    assert first == second
+    assert cache.get('jane.doe@example.com') == first
+    assert mock_api.states['hunter'].requests == 1
+
+
+def test_sample_names_are_batched_and_memoized_in_the_given_cache(mock_api, monkeypatch):
+    monkeypatch.setenv('SAMPLE_NAMES_BATCH_SIZE', '2')
+    cache = PersistentCache(':memory:', namespace='names')
+    generator = EmailGenerator(names_cache=cache)
+    companies = ['Acme', 'Globex', 'Initech', 'acme ']
+
+    names = generator.generate_sample_names_bulk(companies, num_names=2)
+
+    assert names == {company: ['Alex Morgan', 'Sam Taylor'] for company in companies}
+    # 'acme ' shares the memo key of 'Acme' but was asked for in the same run
+    assert mock_api.states['openai'].requests == 2
+    assert len(cache) == 3
+
+    assert generator._generate_sample_names('Globex', num_names=2) == ['Alex Morgan', 'Sam Taylor']
+    assert mock_api.states['openai'].requests == 2
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from src.generators.email_generator import EmailGenerator
+from src.generators.email_validation import email_reason, validate_emails
+
+ADDRESSES = [
+    'jane.doe@example.com',
+    ' Jane.Doe@Example.com. ',
+    '',
+    'no-at-sign',
+    'a@b@example.com',
+    '@example.com',
+    'x' * 65 + '@example.com',
+    'jane doe@example.com',
+    'a..b@x.com',
+    '.a@x.com',
+    'a.@x.com',
+    'jane@',
+    'jane@exämple.com',
+    'jane@' + 'a' * 250 + '.com',
+    'jane@example',
+    'a@-x.com',
+    'a@x..com',
+    'a@x.c0m',
+    'a+tag@sub.example.co.uk',
+    'o\'brien@example.com'
+]
+
+
+def test_validate_emails_reports_the_first_failure():
+    emails = pd.Series([
+        ' Jane.Doe@Example.com ',
+        '',
+        'no-at-sign',
+        'a@b@example.com',
+        '@example.com',
+        'x' * 65 + '@example.com',
+        'jane doe@example.com',
+        'jane..doe@example.com',
+        'jane@',
+        'jane@exämple.com',
+        'jane@' + 'a' * 250 + '.com',
+        'jane@example'
+    ], index=range(10, 22))
+
+    result = validate_emails(emails)
+
+    assert result.index.tolist() == emails.index.tolist()
+    assert result['valid'].tolist() == [True] + [False] * 11
+    assert result['reason'].astype(object).where(result['reason'].notna(), None).tolist() == [
+        None, 'empty', 'missing_at', 'multiple_at', 'empty_local', 'local_too_long',
+        'invalid_local_chars', 'invalid_local_dots', 'empty_domain', 'non_ascii_domain',
+        'domain_too_long', 'invalid_domain'
+    ]
+    assert result.loc[10, 'domain'] == 'example.com'
+    assert result.loc[10, 'local'] == 'Jane.Doe'
+
+
+def test_validate_emails_converts_idn_domains_when_allowed():
+    result = validate_emails(['jane@bücher.de', 'jane@-bad-.de'], allow_idn=True)
+
+    assert result['valid'].tolist() == [True, False]
+    assert result.loc[0, 'domain'] == 'xn--bcher-kva.de'
+
+
+@pytest.mark.parametrize('allow_idn', [False, True])
+def test_single_and_bulk_validation_agree(allow_idn):
+    addresses = ADDRESSES + ['jane@bücher.de', 'jane@-bad-.de']
+    bulk = validate_emails(addresses, allow_idn=allow_idn)
+
+    for email, reason in zip(addresses, bulk['reason']):
+        assert email_reason(email, allow_idn=allow_idn) == (None if pd.isna(reason) else reason), email
+
+
+def test_generator_format_check_uses_the_bulk_rules(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    generator = EmailGenerator()
+
+    assert [generator.validate_email_format(email) for email in ADDRESSES] == \
+        validate_emails(ADDRESSES)['valid'].tolist()
+    assert not generator.validate_email_format('a..b@x.com')
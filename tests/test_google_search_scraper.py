@@ -0,0 +1,50 @@
+import pytest
+
+from src.scrapers.custom_search import CustomSearchClient
+from src.scrapers.google_search_scraper import GoogleSearchScraper
+from src.utils.cache import PersistentCache
+from src.utils.rate_limiter import PriorityRateLimiter
+
+
+@pytest.fixture
+def scraper(mock_api):
+    scraper = GoogleSearchScraper(api_key='test-key', cx='test-cx')
+    scraper.search_client = CustomSearchClient(
+        'test-key', 'test-cx',
+        cache=PersistentCache(':memory:', namespace='search'),
+        limiter=PriorityRateLimiter(rate=0)
+    )
+    return scraper
+
+
+def test_iter_search_pages_through_results_in_order(scraper, mock_api):
+    results = list(scraper.iter_search('software companies', num_results=20))
+
+    assert [result['link'] for result in results] == [f'https://company{index}.bench.test/' for index in range(20)]
+    assert all(result['domain'] and result['title'] for result in results)
+    assert mock_api.states['cse'].requests == 2
+
+
+def test_iter_search_stops_after_a_short_page(scraper, mock_api):
+    results = list(scraper.iter_search('software companies', num_results=100, max_workers=2))
+
+    assert len(results) == 25
+    # Pages 1-3 hold the results; at most one page beyond the short one was in flight
+    assert mock_api.states['cse'].requests <= 4
+
+
+def test_iter_search_sends_nothing_more_once_the_caller_stops(scraper, mock_api):
+    results = scraper.iter_search('software companies', num_results=100, max_workers=2)
+    first = next(results)
+    results.close()
+
+    assert first['link']
+    assert mock_api.states['cse'].requests <= 2
+
+
+def test_search_without_credentials_is_rejected(monkeypatch):
+    monkeypatch.delenv('GOOGLE_SEARCH_API_KEY', raising=False)
+    monkeypatch.delenv('GOOGLE_SEARCH_CX', raising=False)
+
+    with pytest.raises(ValueError):
+        GoogleSearchScraper()
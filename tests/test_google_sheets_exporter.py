@@ -0,0 +1,142 @@
+import pytest
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+from src.exporters import google_sheets_exporter
+from src.exporters.google_sheets_exporter import HEADERS, LeadExporter
+from src.utils.job_store import CompanyCheckpoint, JobStore
+
+
+class FakeRequest:
+    def __init__(self, run):
+        self.run = run
+
+    def execute(self):
+        return self.run()
+
+
+class FakeSheets:
+    """
+    In-memory spreadsheet whose appends can fail before or after they land
+    """
+
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+        self.appends = 0
+        # One entry per upcoming append: 'before' rejects it, 'after' writes it and then fails
+        self.failures = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def create(self, body, fields):
+        return FakeRequest(lambda: {'spreadsheetId': 'sheet-1'})
+
+    def get(self, spreadsheetId, range):
+        return FakeRequest(lambda: {'values': list(self.rows)} if self.rows else {})
+
+    def append(self, spreadsheetId, range, valueInputOption, insertDataOption, body):
+        def run():
+            self.appends += 1
+            failure = self.failures.pop(0) if self.failures else None
+            if failure == 'before':
+                raise HttpError(Response({'status': 503}), b'backend error')
+            self.rows.extend(body['values'])
+            if failure == 'after':
+                raise HttpError(Response({'status': 503}), b'backend error')
+            return {}
+        return FakeRequest(run)
+
+
+@pytest.fixture
+def sheets(monkeypatch):
+    service = FakeSheets()
+    monkeypatch.setattr(google_sheets_exporter, 'get_credentials', lambda filename: None)
+    monkeypatch.setattr(google_sheets_exporter, 'get_sheets_service', lambda filename: service)
+    monkeypatch.setattr(google_sheets_exporter.time, 'sleep', lambda seconds: None)
+    return service
+
+
+def _lead(index):
+    return {'company_name': f'Company {index}', 'website': f'https://company{index}.test/'}
+
+
+def _stream(exporter, spreadsheet_id=None):
+    options = {'batch_size': 100, 'flush_interval': 60, 'min_write_interval': 0}
+    if spreadsheet_id:
+        return exporter.resume_stream(spreadsheet_id, **options)
+    return exporter.start_stream(**options)
+
+
+def test_failed_write_that_landed_is_not_appended_again(sheets):
+    stream = _stream(LeadExporter())
+    sheets.failures = ['after']
+    for index in range(3):
+        stream.add(_lead(index))
+
+    assert stream.close() == 0
+    assert [row[0] for row in sheets.rows] == [HEADERS[0], 'Company 0', 'Company 1', 'Company 2']
+    assert stream.rows_written == 4
+    assert sheets.appends == 2
+
+
+def test_failed_write_that_did_not_land_is_retried(sheets):
+    stream = _stream(LeadExporter())
+    sheets.failures = ['before', 'before']
+    for index in range(2):
+        stream.add(_lead(index))
+
+    assert stream.close() == 0
+    assert [row[0] for row in sheets.rows] == [HEADERS[0], 'Company 0', 'Company 1']
+    assert sheets.appends == 4
+
+
+def test_resumed_stream_counts_the_rows_already_in_the_sheet(sheets):
+    sheets.rows = [HEADERS, ['Company 0'], ['Company 1']]
+    stream = _stream(LeadExporter(), 'sheet-1')
+    sheets.failures = ['after', 'before']
+    stream.add(_lead(2))
+    stream.add(_lead(3))
+
+    assert stream.close() == 0
+    assert [row[0] for row in sheets.rows][1:] == ['Company 0', 'Company 1', 'Company 2', 'Company 3']
+    assert stream.rows_written == 2
+
+
+def test_rows_that_were_not_written_stay_buffered(sheets):
+    stream = LeadExporter().resume_stream('sheet-1', batch_size=100, flush_interval=60, min_write_interval=0)
+    stream.max_retries = 2
+    sheets.failures = ['before'] * 2
+    stream.add(_lead(0))
+
+    assert not stream.flush()
+    assert stream.pending_rows == 1
+    assert stream.close() == 0
+    assert [row[0] for row in sheets.rows] == ['Company 0']
+
+
+def test_written_rows_mark_their_checkpoints(sheets, tmp_path):
+    job_store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    job_id = job_store.create_job({'search_query': 'software'})
+    checkpoints = [CompanyCheckpoint(job_store, job_id, index) for index in range(3)]
+    written = []
+
+    def mark_exported(keys):
+        written.append(len(keys))
+        for checkpoint in keys:
+            checkpoint.save('exported', True)
+
+    stream = _stream(LeadExporter())
+    stream.on_written = mark_exported
+    stream.add(_lead(0), key=checkpoints[0])
+    stream.add(_lead(1), key=checkpoints[1])
+    stream.add(_lead(2))
+
+    stream.close()
+
+    assert {idx: outputs.get('exported') for idx, outputs in job_store.stage_outputs(job_id).items()} == \
+        {0: True, 1: True}
+    assert written == [2]
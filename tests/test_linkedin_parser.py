@@ -0,0 +1,44 @@
+from src.scrapers import linkedin_parser
+from src.scrapers.linkedin_parser import empty_details, parse_profile, parse_profile_files
+
+PROFILE_HTML = """
+<html><body>
+  <h1> Jane <b>Doe</b> </h1>
+  <h1>Ignored second heading</h1>
+  <div class="top-card-layout__headline extra">Head of Sales at Acme</div>
+  <section id="experience">
+    <ul><li>Acme Corp</li><li>Globex <span>Inc</span></li></ul>
+  </section>
+  <ul><li>Navigation item</li></ul>
+  <section id="education"><ul><li>State University</li></ul></section>
+  <span class="skill">Negotiation</span>
+  <span class="skills">Not a skill</span>
+  <span class="skill">CRM</span>
+</body></html>
+"""
+
+EXPECTED_PROFILE = {
+    'full_name': 'JaneDoe',
+    'current_title': 'Head of Sales at Acme',
+    'company_experience': ['Acme Corp', 'GlobexInc'],
+    'skills': ['Negotiation', 'CRM'],
+    'education': ['State University']
+}
+
+
+def test_parse_profile_extracts_every_field():
+    assert parse_profile(PROFILE_HTML) == EXPECTED_PROFILE
+    assert parse_profile(PROFILE_HTML.encode('utf-8')) == EXPECTED_PROFILE
+
+
+def test_lxml_and_soup_parsers_agree():
+    assert linkedin_parser._parse_with_soup(PROFILE_HTML) == linkedin_parser._parse_with_lxml(PROFILE_HTML)
+
+
+def test_parse_profile_files_keeps_order_and_survives_missing_files(tmp_path):
+    profile = tmp_path / 'profile.html'
+    profile.write_text(PROFILE_HTML, encoding='utf-8')
+    paths = [str(profile), str(tmp_path / 'missing.html'), str(profile)]
+
+    assert parse_profile_files(paths, processes=1) == [EXPECTED_PROFILE, empty_details(), EXPECTED_PROFILE]
+    assert parse_profile_files(paths, processes=2) == [EXPECTED_PROFILE, empty_details(), EXPECTED_PROFILE]
@@ -0,0 +1,41 @@
+import copy
+
+from src.utils.metrics import Histogram, MetricsRegistry
+
+
+def test_run_summary_does_not_carry_the_max_of_an_earlier_run():
+    registry = MetricsRegistry()
+    registry.observe_call('hunter', 8.0)
+    start = registry.checkpoint()
+    for seconds in (0.02, 0.03, 0.04):
+        registry.observe_call('hunter', seconds)
+
+    run = registry.summary(since=start)['endpoints']['hunter']
+    total = registry.summary()['endpoints']['hunter']
+
+    assert run['count'] == 3
+    assert 'max_ms' not in run
+    assert run['p99_ms'] <= 50.0
+    assert total['max_ms'] == 8000.0
+
+
+def test_quantiles_interpolate_inside_buckets_and_stop_at_the_max():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 0.6):
+        histogram.observe(seconds)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1.0) == 0.6
+
+
+def test_overflow_bucket_of_a_delta_is_reported_at_the_highest_bound():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    histogram.observe(30.0)
+    snapshot = copy.deepcopy(histogram)
+    histogram.observe(2.0)
+
+    delta = histogram.minus(snapshot)
+
+    assert delta.count == 1
+    assert delta.max is None
+    assert delta.quantile(0.99) == 1.0
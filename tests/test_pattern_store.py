@@ -0,0 +1,15 @@
+from src.generators.pattern_store import DomainPatternStore
+
+
+def test_pattern_is_learned_only_after_enough_consistent_confirmations():
+    store = DomainPatternStore(':memory:', min_confirmations=2)
+    store.record('Example.com', 'flast')
+    assert store.learned_pattern('example.com') is None
+
+    store.record('example.com', 'flast')
+    assert store.learned_pattern('example.com') == 'flast'
+
+    store.record('example.com', 'first.last')
+    assert store.learned_pattern('example.com') is None
+    assert store.rank('example.com', ['first.last', 'firstlast', 'flast']) == ['flast', 'first.last', 'firstlast']
+    assert store.rank('other.com', ['first.last', 'flast']) == ['first.last', 'flast']
@@ -0,0 +1,260 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from src.generators.description_enricher import DescriptionEnricher
+from src.generators.email_generator import EmailGenerator
+from src.generators.pattern_store import DomainPatternStore
+from src.pipeline import LeadPipeline, _iter_job_items
+from src.scrapers.google_search_scraper import GoogleSearchScraper
+from src.utils.cache import PersistentCache
+from src.utils.dns_cache import mx_cache
+from src.utils.job_store import CompanyCheckpoint, JobStore
+
+NAMES = ['Jane Doe', 'John Smith', 'Ann Lee']
+
+
+class StubLinkedInScraper:
+    def find_profiles(self, company_name, location=None, num_results=3):
+        return [{'profile_url': f'https://www.linkedin.com/in/{company_name.lower()}'}]
+
+
+@pytest.fixture
+def job_store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.sqlite3'))
+
+
+def _generator(monkeypatch, mode, pattern_store=None):
+    monkeypatch.setenv('EMAIL_PATTERN_LEARNING', mode)
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    return EmailGenerator(verification_cache=PersistentCache(':memory:', namespace='hunter'),
+                          names_cache=PersistentCache(':memory:', namespace='names'),
+                          pattern_store=pattern_store or DomainPatternStore(':memory:'))
+
+
+def _pipeline(email_generator, **options):
+    return LeadPipeline('Remote', '2024-01-01 00:00:00', StubLinkedInScraper(), email_generator,
+                        enricher=None, **options)
+
+
+def _process(pipeline, job_store, domain, idx=0):
+    mx_cache.store(domain, [f'mx.{domain}'], ttl=3600)
+    checkpoint = CompanyCheckpoint(job_store, job_store.create_job({}), idx)
+    checkpoint.save('sample_names', NAMES)
+    result = {'title': 'Acme', 'link': f'https://www.{domain}/', 'snippet': 'Acme builds widgets.'}
+    return pipeline.process_company(result, checkpoint)
+
+
+def test_verification_stops_once_a_pattern_is_confirmed(mock_api, monkeypatch, job_store):
+    lead = _process(_pipeline(_generator(monkeypatch, 'rank')), job_store, 'acme.test')
+
+    emails = [entry['email'] for entry in lead['emails']]
+    assert emails == ['jane.doe@acme.test', 'john.smith@acme.test', 'ann.lee@acme.test']
+    assert any(entry['verification_status'] == 'valid' for entry in lead['emails'])
+    assert mock_api.states['hunter'].requests == len(NAMES)
+
+
+def test_every_candidate_is_verified_with_learning_off(mock_api, monkeypatch, job_store):
+    lead = _process(_pipeline(_generator(monkeypatch, 'off')), job_store, 'acme.test')
+
+    assert len(lead['emails']) == 6 * len(NAMES)
+    assert mock_api.states['hunter'].requests == 6 * len(NAMES)
+
+
+def test_learned_pattern_is_verified_first(mock_api, monkeypatch, job_store):
+    store = DomainPatternStore(':memory:')
+    for _ in range(3):
+        store.record('acme.test', 'flast')
+    lead = _process(_pipeline(_generator(monkeypatch, 'rank', store)), job_store, 'acme.test')
+
+    assert [entry['email'] for entry in lead['emails']] == ['jdoe@acme.test', 'jsmith@acme.test', 'alee@acme.test']
+    assert mock_api.states['hunter'].requests == len(NAMES)
+
+
+class StubSearchClient:
+    """
+    Serves numbered companies, failing or skipping pages at the given offsets
+    """
+
+    def __init__(self, fail_at=(), skip_at=()):
+        self.fail_at = set(fail_at)
+        self.skip_at = set(skip_at)
+        self.calls = 0
+
+    def fetch(self, query, num=10, start=None, **kwargs):
+        self.calls += 1
+        start = start or 1
+        if start in self.fail_at:
+            raise requests.ConnectionError(f'page {start} failed')
+        if start in self.skip_at:
+            return {}
+        return {'items': [{'title': f'Company {index}', 'link': f'https://company{index}.bench.test/',
+                           'snippet': f'Company {index} builds software.'}
+                          for index in range(start - 1, start - 1 + num)]}
+
+
+def _scraper(search_client):
+    scraper = GoogleSearchScraper(api_key='test-key', cx='test-cx')
+    scraper.search_client = search_client
+    return scraper
+
+
+def _job(job_store, num_results=30):
+    job_id = job_store.create_job({'search_query': 'software', 'business_location': 'Remote',
+                                   'num_results': num_results})
+    return job_store.get_job(job_id)
+
+
+@pytest.mark.parametrize('failure', [{'fail_at': [11]}, {'skip_at': [11]}])
+def test_search_that_stops_early_is_searched_again_on_resume(job_store, failure):
+    job = _job(job_store)
+
+    items = list(_iter_job_items(job_store, job, _scraper(StubSearchClient(**failure))))
+
+    assert [result['title'] for result, _ in items] == [f'Company {index}' for index in range(10)]
+    assert not job_store.get_job(job['job_id'])['search_complete']
+    items[0][1].save('lead', {'company_name': 'Company 0'})
+
+    items = list(_iter_job_items(job_store, job_store.get_job(job['job_id']), _scraper(StubSearchClient())))
+
+    assert len(items) == 30
+    assert items[0][1].get('lead') == {'company_name': 'Company 0'}
+    assert not items[1][1].has('lead')
+    assert job_store.get_job(job['job_id'])['search_complete']
+
+    # A fully searched job replays its stored results without searching
+    client = StubSearchClient()
+    replayed = list(_iter_job_items(job_store, job_store.get_job(job['job_id']), _scraper(client)))
+    assert [result for result, _ in replayed] == [result for result, _ in items]
+    assert client.calls == 0
+
+
+def test_checkpoints_are_dropped_when_a_position_holds_another_company(job_store):
+    job = _job(job_store, num_results=10)
+    items = list(_iter_job_items(job_store, job, _scraper(StubSearchClient(fail_at=[1]))))
+    assert items == []
+
+    job_store.record_result(job['job_id'], 0, {'title': 'Other', 'link': 'https://other.test/'})
+    job_store.record_stage(job['job_id'], 0, 'lead', {'company_name': 'Other'})
+
+    items = list(_iter_job_items(job_store, job_store.get_job(job['job_id']), _scraper(StubSearchClient())))
+
+    assert not items[0][1].has('lead')
+    assert job_store.stage_outputs(job['job_id']) == {}
+
+
+def test_interrupted_job_resumes_without_repeating_finished_companies(mock_api, monkeypatch, job_store):
+    for index in range(5):
+        mx_cache.store(f'company{index}.bench.test', [f'mx.company{index}.bench.test'], ttl=3600)
+    email_generator = _generator(monkeypatch, 'rank')
+    enricher = DescriptionEnricher(batch_size=2, cache=PersistentCache(':memory:', namespace='descriptions'))
+    job = _job(job_store, num_results=5)
+    emitted = []
+
+    def on_lead(lead, checkpoint):
+        emitted.append(lead['company_name'])
+        if len(emitted) == 3:
+            raise KeyboardInterrupt
+
+    pipeline = LeadPipeline('Remote', '2024-01-01 00:00:00', StubLinkedInScraper(), email_generator, enricher,
+                            concurrent=False, on_lead=on_lead)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run(_iter_job_items(job_store, job, _scraper(StubSearchClient())))
+    hunter_calls = mock_api.states['hunter'].requests
+
+    resumed = LeadPipeline('Remote', '2024-01-01 00:00:00', StubLinkedInScraper(), email_generator, enricher,
+                           concurrent=False)
+    leads = resumed.run(_iter_job_items(job_store, job_store.get_job(job['job_id']), _scraper(StubSearchClient())))
+
+    assert [lead['company_name'] for lead in leads] == [f'Company {index}' for index in range(5)]
+    # Only the two unfinished companies were verified again
+    assert mock_api.states['hunter'].requests == hunter_calls * 5 // 3
+
+
+class StageTracker:
+    """
+    Records the highest number of calls in flight per stage
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+
+    def run(self, stage, seconds):
+        with self.lock:
+            self.running[stage] = self.running.get(stage, 0) + 1
+            self.peak[stage] = max(self.peak.get(stage, 0), self.running[stage])
+        time.sleep(seconds)
+        with self.lock:
+            self.running[stage] -= 1
+
+
+class TrackedEnricher:
+    batch_size = 2
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def enrich_many(self, results):
+        self.tracker.run('enrichment', 0.02)
+        return {}
+
+
+class TrackedEmailGenerator:
+    smtp_verifier = None
+    stops_at_confirmed_pattern = False
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def resolve_mx_bulk(self, domains):
+        pass
+
+    def generate_sample_names_bulk(self, company_names):
+        return {}
+
+    def generate_email_formats_by_pattern(self, company_name, domain, sample_names=None):
+        return [[f'{name}@{domain}' for name in ('info', 'sales', 'hello', 'team')]]
+
+    def advanced_email_verification(self, email):
+        # Later companies finish sooner, so completion order is the reverse of result order
+        index = int(email.split('@')[1].split('.')[0][len('company'):])
+        self.tracker.run('verification', 0.005 * (12 - index))
+        return {'format_valid': True, 'domain_valid': True, 'status': 'valid', 'score': 90}
+
+    def learn_email_patterns(self, company_name, validated_emails, sample_names=None):
+        pass
+
+
+class TrackedLinkedInScraper:
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def find_profiles(self, company_name, location=None, num_results=3):
+        self.tracker.run('linkedin', 0.01)
+        return []
+
+
+def test_concurrent_run_keeps_result_order_within_stage_limits(job_store):
+    tracker = StageTracker()
+    emitted = []
+    pipeline = LeadPipeline('Remote', '2024-01-01 00:00:00', TrackedLinkedInScraper(tracker),
+                            TrackedEmailGenerator(tracker), TrackedEnricher(tracker),
+                            max_workers=6, enrichment_concurrency=2, verification_concurrency=3,
+                            linkedin_concurrency=2,
+                            on_lead=lambda lead, checkpoint: emitted.append(lead['company_name']))
+    job_id = job_store.create_job({})
+    items = [({'title': f'Company {index}', 'link': f'https://company{index}.test/'},
+              CompanyCheckpoint(job_store, job_id, index)) for index in range(12)]
+
+    leads = pipeline.run(items)
+
+    names = [f'Company {index}' for index in range(12)]
+    assert [lead['company_name'] for lead in leads] == names
+    assert emitted == names
+    assert tracker.peak['verification'] == 3
+    assert 1 <= tracker.peak['linkedin'] <= 2
+    assert 1 <= tracker.peak['enrichment'] <= 2
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.rate_limiter import PriorityRateLimiter, QuotaExhaustedError, QuotaLedger
+
+
+def test_quota_shares_keep_calls_for_higher_priorities():
+    limiter = PriorityRateLimiter(rate=0, ledger=QuotaLedger(':memory:', daily_quota=4),
+                                  quota_shares={'fallback': 0.5})
+
+    assert limiter.acquire('fallback')
+    assert limiter.acquire('fallback')
+    with pytest.raises(QuotaExhaustedError):
+        limiter.acquire('fallback')
+    assert limiter.acquire('normal')
+    assert limiter.acquire('primary')
+    with pytest.raises(QuotaExhaustedError):
+        limiter.acquire('primary')
+    assert limiter.stats()['quota_remaining'] == 0
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        PriorityRateLimiter(rate=0).acquire('urgent')
+
+
+def test_waiting_callers_are_served_by_priority():
+    limiter = PriorityRateLimiter(rate=20, burst=1)
+    assert limiter.acquire()
+    order = []
+
+    def call(priority):
+        limiter.acquire(priority)
+        order.append(priority)
+
+    # Queue the callers while the bucket is empty, lowest priority first
+    threads = []
+    for priority in ('fallback', 'normal', 'primary'):
+        threads.append(threading.Thread(target=call, args=(priority,)))
+        threads[-1].start()
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+
+    assert order == ['primary', 'normal', 'fallback']
+
+
+def test_cancelled_caller_stops_waiting():
+    limiter = PriorityRateLimiter(rate=0.1, burst=1)
+    assert limiter.acquire()
+    cancel_event = threading.Event()
+    threading.Timer(0.05, cancel_event.set).start()
+
+    started = time.monotonic()
+    assert limiter.acquire(cancel_event=cancel_event) is False
+    assert time.monotonic() - started < 1
+    assert limiter.stats()['waiting'] == 0
+
+
+def test_throttle_holds_every_caller_back():
+    limiter = PriorityRateLimiter(rate=0)
+    limiter.throttle(0.2)
+
+    started = time.monotonic()
+    assert limiter.acquire()
+    assert time.monotonic() - started >= 0.15
+
+
+def test_ledger_persists_the_daily_count(tmp_path):
+    path = str(tmp_path / 'quota.db')
+    ledger = QuotaLedger(path, daily_quota=10)
+    assert ledger.try_spend()
+    assert ledger.try_spend()
+
+    assert QuotaLedger(path, daily_quota=10).used() == 2
+    assert QuotaLedger(path, daily_quota=10).remaining() == 8
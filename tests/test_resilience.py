@@ -0,0 +1,171 @@
+import threading
+
+import pytest
+import requests
+
+from src.utils import resilience
+from src.utils.resilience import CircuitOpenError, DeadlineExceededError, ResilientCaller
+
+URL = 'https://api.example.test/v1'
+
+
+class FakeClock:
+    """
+    Stands in for the time module; sleeping advances the clock instead of waiting
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, 'time', clock)
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: high)
+    return clock
+
+
+def _response(status):
+    response = requests.Response()
+    response.status_code = status
+    return response
+
+
+def _caller(**policy):
+    settings = {'retries': 0, 'backoff': 1.0, 'deadline': 60.0, 'breaker_failures': 2, 'breaker_reset': 30.0}
+    return ResilientCaller({'test': dict(settings, **policy)})
+
+
+def _failing(calls):
+    def send(timeout):
+        calls.append(timeout)
+        raise requests.ConnectionError('refused')
+    return send
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast(clock):
+    caller = _caller()
+    calls = []
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            caller.call('test', URL, _failing(calls))
+
+    with pytest.raises(CircuitOpenError):
+        caller.call('test', URL, _failing(calls))
+    assert len(calls) == 2
+    assert caller.stats() == {'test api.example.test': 'open'}
+
+
+def test_half_open_breaker_lets_one_trial_through(clock):
+    caller = _caller()
+    calls = []
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            caller.call('test', URL, _failing(calls))
+
+    clock.now += 30
+    assert caller.stats() == {'test api.example.test': 'half_open'}
+    # A failed trial opens the circuit again for another reset period
+    with pytest.raises(requests.ConnectionError):
+        caller.call('test', URL, _failing(calls))
+    assert len(calls) == 3
+    with pytest.raises(CircuitOpenError):
+        caller.call('test', URL, lambda timeout: _response(200))
+
+    clock.now += 30
+    assert caller.call('test', URL, lambda timeout: _response(200)).status_code == 200
+    assert caller.stats() == {'test api.example.test': 'closed'}
+
+
+def test_only_one_trial_runs_while_half_open(clock):
+    caller = _caller()
+    breaker = caller.breaker('test', 'api.example.test')
+    breaker.record(False)
+    breaker.record(False)
+    clock.now += 30
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.allow()
+
+
+def test_retries_back_off_until_success(clock):
+    caller = _caller(retries=2, breaker_failures=0)
+    answers = [_response(503), _response(502), _response(200)]
+
+    response = caller.call('test', URL, lambda timeout: answers.pop(0))
+
+    assert response.status_code == 200
+    assert clock.slept == [1.0, 2.0]
+
+
+def test_retry_after_header_sets_the_pause(clock):
+    caller = _caller(retries=1)
+    throttled = _response(429)
+    throttled.headers['Retry-After'] = '7'
+    answers = [throttled, _response(200)]
+
+    assert caller.call('test', URL, lambda timeout: answers.pop(0)).status_code == 200
+    assert clock.slept == [7.0]
+
+
+def test_deadline_stops_retrying(clock):
+    caller = _caller(retries=5, deadline=2.5, timeout=10.0, breaker_failures=0)
+    calls = []
+
+    with pytest.raises(DeadlineExceededError):
+        caller.call('test', URL, _failing(calls))
+
+    # Pauses of 1s and 2s do not both fit in 2.5s
+    assert len(calls) == 2
+    assert clock.slept == [1.0]
+    # Each attempt only gets the time the deadline has left
+    assert calls == [2.5, 1.5]
+
+
+def test_hedged_request_is_sent_once_the_first_is_slow(clock):
+    caller = _caller(hedge_after=0.05, timeout=10.0)
+    release = threading.Event()
+    lock = threading.Lock()
+    attempts = []
+
+    def send(timeout):
+        with lock:
+            attempts.append(timeout)
+            first = len(attempts) == 1
+        if first:
+            # The first request stalls until the test lets it finish
+            release.wait(5)
+            return _response(500)
+        return _response(200)
+
+    try:
+        response = caller.call('test', URL, send)
+    finally:
+        release.set()
+
+    assert response.status_code == 200
+    assert len(attempts) == 2
+
+
+def test_fast_request_is_not_hedged(clock):
+    caller = _caller(hedge_after=5.0, timeout=10.0)
+    attempts = []
+
+    def send(timeout):
+        attempts.append(timeout)
+        return _response(200)
+
+    assert caller.call('test', URL, send).status_code == 200
+    assert caller.call('test', URL, send, hedge=False).status_code == 200
+    assert attempts == [10.0, 10.0]
@@ -0,0 +1,145 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from aiosmtpd.controller import Controller
+
+from src.generators.smtp_verifier import ALL_HOSTS, SMTPVerifier, connection_slots
+
+DOMAIN = 'example.test'
+
+
+class RecipientHandler:
+    """
+    Stand-in mail server: the local part of each recipient decides the reply
+    """
+
+    def __init__(self):
+        self.sessions = 0
+        self.open_sessions = 0
+        self.max_open_sessions = 0
+        self._lock = threading.Lock()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        with self._lock:
+            self.sessions += 1
+            self.open_sessions += 1
+            self.max_open_sessions = max(self.max_open_sessions, self.open_sessions)
+        # Keep sessions open long enough to overlap
+        await asyncio.sleep(0.05)
+        return responses
+
+    async def handle_QUIT(self, server, session, envelope):
+        with self._lock:
+            self.open_sessions -= 1
+        return '221 Bye'
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        local_part = address.partition('@')[0]
+        if local_part.startswith('valid'):
+            envelope.rcpt_tos.append(address)
+            return '250 OK'
+        if local_part.startswith('greylisted'):
+            return '450 4.2.0 Greylisted, try again later'
+        if local_part.startswith('slow'):
+            await asyncio.sleep(2)
+            return '250 OK'
+        return '550 5.1.1 No such user'
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecipientHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    try:
+        yield handler, controller.port
+    finally:
+        controller.stop()
+
+
+def _verifier(port: int, **options) -> SMTPVerifier:
+    options.setdefault('timeout', 0.5)
+    options.setdefault('greylist_retries', 0)
+    return SMTPVerifier(helo_host='tests.local', mail_from='probe@tests.local',
+                        host_override='127.0.0.1', port=port, **options)
+
+
+def test_valid_and_invalid_recipients_share_one_session(smtp_server):
+    handler, port = smtp_server
+    emails = [f'valid{i}@{DOMAIN}' for i in range(3)] + [f'nobody{i}@{DOMAIN}' for i in range(3)]
+
+    results = _verifier(port).verify_many(emails, {})
+
+    assert {results[email]['status'] for email in emails[:3]} == {'valid'}
+    assert {results[email]['status'] for email in emails[3:]} == {'invalid'}
+    assert results[emails[3]]['smtp_code'] == 550
+    assert handler.sessions == 1
+
+
+def test_greylisted_recipient_is_unknown_without_waiting(smtp_server):
+    _, port = smtp_server
+    email = f'greylisted@{DOMAIN}'
+
+    results = _verifier(port, greylist_delay=30).verify_many([email], {})
+
+    assert results[email]['status'] == 'unknown'
+    assert results[email]['smtp_code'] == 450
+    assert 'temporary' not in results[email]
+
+
+def test_greylisted_recipient_is_retried_when_configured(smtp_server):
+    handler, port = smtp_server
+    email = f'greylisted@{DOMAIN}'
+
+    results = _verifier(port, greylist_retries=1, greylist_delay=0.01).verify_many([email], {})
+
+    assert results[email]['status'] == 'unknown'
+    assert handler.sessions == 2
+
+
+def test_recipient_timeout_leaves_the_batch_unknown(smtp_server):
+    _, port = smtp_server
+    emails = [f'valid@{DOMAIN}', f'slow@{DOMAIN}', f'valid2@{DOMAIN}']
+
+    results = _verifier(port).verify_many(emails, {})
+
+    assert results[emails[0]]['status'] == 'valid'
+    assert results[emails[1]]['status'] == 'unknown'
+    assert results[emails[2]]['status'] == 'unknown'
+
+
+def test_unreachable_host_is_unknown():
+    email = f'valid@{DOMAIN}'
+
+    results = _verifier(_free_port()).verify_many([email], {})
+
+    assert results[email]['status'] == 'unknown'
+
+
+def test_per_host_limit_holds_across_threads(smtp_server):
+    handler, port = smtp_server
+    verifier = _verifier(port, max_connections_per_host=2, recipients_per_session=1)
+
+    def verify(thread_index):
+        verifier.verify_many([f'valid{thread_index}-{i}@{DOMAIN}' for i in range(3)], {})
+
+    threads = [threading.Thread(target=verify, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handler.sessions == 12
+    assert handler.max_open_sessions <= 2
+    assert connection_slots.active('127.0.0.1') == 0
+    assert connection_slots.active(ALL_HOSTS) == 0
@@ -0,0 +1,108 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.utils.transport import CassetteMissError, HttpTransport
+
+PAGE_SIZE = 256 * 1024
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    requests_served = 0
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        if self.path.startswith('/large'):
+            body = b'x' * PAGE_SIZE
+            content_type = 'text/html'
+        else:
+            query = parse_qs(urlsplit(self.path).query)
+            body = json.dumps({'q': query.get('q', [''])[0]}).encode('utf-8')
+            content_type = 'application/json'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    PageHandler.requests_served = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_recorded_requests_replay_without_the_network(http_server, tmp_path):
+    cassette = str(tmp_path / 'cassette.jsonl')
+    recorded = HttpTransport('record', cassette).get(f'{http_server}/search',
+                                                     params={'q': 'acme', 'key': 'secret'})
+    assert recorded.json() == {'q': 'acme'}
+    served = PageHandler.requests_served
+
+    replayed = HttpTransport('replay', cassette).get(f'{http_server}/search',
+                                                     params={'key': 'other', 'q': 'acme'})
+
+    assert replayed.status_code == 200
+    assert replayed.json() == recorded.json()
+    assert PageHandler.requests_served == served
+    with open(cassette, encoding='utf-8') as file:
+        contents = file.read()
+    assert 'acme' in contents and 'key=' not in contents
+
+
+def test_replay_miss_raises(http_server, tmp_path):
+    cassette = str(tmp_path / 'cassette.jsonl')
+    HttpTransport('record', cassette).get(f'{http_server}/search', params={'q': 'acme'})
+
+    with pytest.raises(CassetteMissError):
+        HttpTransport('replay', cassette).get(f'{http_server}/search', params={'q': 'other'})
+
+
+def test_streamed_response_records_only_what_was_read(http_server, tmp_path):
+    cassette = str(tmp_path / 'cassette.jsonl')
+    response = HttpTransport('record', cassette).get(f'{http_server}/large', stream=True)
+    head = next(response.iter_content(1024))
+    response.close()
+
+    with open(cassette, encoding='utf-8') as file:
+        interaction = json.loads(file.readline())
+    assert interaction['response']['body']['text'].encode('utf-8') == head
+    assert len(head) < PAGE_SIZE
+
+    replayed = HttpTransport('replay', cassette).get(f'{http_server}/large', stream=True)
+    assert b''.join(replayed.iter_content(1024)) == head
+
+
+def test_call_results_are_recorded_and_replayed(tmp_path):
+    cassette = str(tmp_path / 'cassette.jsonl')
+    calls = []
+
+    def resolve():
+        calls.append(1)
+        return [['mx.example.com'], 300]
+
+    assert HttpTransport('record', cassette).call('dns', 'MX example.com', resolve) == [['mx.example.com'], 300]
+    replay = HttpTransport('replay', cassette)
+
+    assert replay.call('dns', 'MX example.com', resolve) == [['mx.example.com'], 300]
+    assert calls == [1]
+    with pytest.raises(CassetteMissError):
+        replay.call('dns', 'MX other.example', resolve)
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        HttpTransport('offline', str(tmp_path / 'cassette.jsonl'))
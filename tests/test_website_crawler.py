@@ -0,0 +1,76 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.scrapers.website_crawler import WebsiteCrawler, parse_head
+from src.utils.cache import PersistentCache
+
+PAGE = (b'<html><head><title>Acme Corp</title>'
+        b'<meta name="description" content="Widgets for everyone"></head><body>'
+        + b'x' * 512 * 1024 + b'</body></html>')
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    statuses = []
+
+    def do_GET(self):
+        if self.path == '/missing':
+            status, body = 404, b''
+        elif self.headers.get('If-None-Match') == '"v1"':
+            status, body = 304, b''
+        else:
+            status, body = 200, PAGE
+        type(self).statuses.append(status)
+        self.send_response(status)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except OSError:
+            # The crawler hangs up once it has the head
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    SiteHandler.statuses = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_parse_head_reads_title_and_description():
+    html = (b'<html><head><title> Acme Corp </title>'
+            b'<meta name="Description " content=" Widgets for everyone ">'
+            b'</head><body><meta name="description" content="body">')
+
+    assert parse_head(html) == {'title': 'Acme Corp', 'meta_description': 'Widgets for everyone'}
+
+
+def test_parse_head_handles_a_truncated_page():
+    assert parse_head(b'<html><head><title>Acme') == {'title': 'Acme', 'meta_description': ''}
+    assert parse_head(b'') == {'title': '', 'meta_description': ''}
+
+
+def test_crawl_revalidates_pages_through_the_given_cache(site):
+    cache = PersistentCache(':memory:', namespace='pages')
+    crawler = WebsiteCrawler(host_delay=0, max_bytes=4096, cache=cache)
+    expected = {'title': 'Acme Corp', 'meta_description': 'Widgets for everyone', 'url': f'{site}/'}
+
+    assert crawler.crawl([f'{site}/', f'{site}/missing', f'{site}/']) == {
+        f'{site}/': expected, f'{site}/missing': {}
+    }
+    assert len(cache) == 1
+
+    assert crawler.fetch(f'{site}/') == expected
+    assert sorted(SiteHandler.statuses[:2]) == [200, 404]
+    assert SiteHandler.statuses[2:] == [304]